@@ -0,0 +1,124 @@
+"""
+WSGI vs ASGI throughput for the read-heavy course views
+
+    python -m benchmarks.bench_asgi_vs_wsgi --requests 200 --concurrency 1 4 16 32
+
+Both modes run in-process against the same seeded SQLite database:
+  - wsgi: the V2 sync views driven by django.test.Client from a thread pool,
+    one thread per concurrent client (like a threaded gunicorn worker)
+  - asgi: the async views (ASYNC_VIEWS=True) driven by AsyncClient on a single
+    event loop (like one uvicorn/daphne worker)
+Numbers are relative; run against MySQL for figures that match production.
+"""
+
+import argparse
+import asyncio
+import importlib
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks import common
+
+
+def endpoints(course_name, part_id):
+    return {
+        'courses': '/counsellor-courses/',
+        'course': f'/counselor_enrolled_course/{course_name}/',
+        'part': f'/fetch_current_part/{course_name}/{part_id}/1/',
+    }
+
+
+def use_async_views(enabled):
+    """Swap the URLconf between the V2 and async views"""
+    from django.conf import settings
+    from django.urls import clear_url_caches
+
+    import counselor.urls
+    import benchmarks.urls
+
+    settings.ASYNC_VIEWS = enabled
+    importlib.reload(counselor.urls)
+    importlib.reload(benchmarks.urls)
+    clear_url_caches()
+
+
+def run_wsgi(url, cookies, total, concurrency):
+    from django.test import Client
+
+    def worker(count):
+        client = Client()
+        client.cookies = cookies
+        latencies = []
+        for _ in range(count):
+            start = common.timer()
+            response = client.get(url)
+            latencies.append(common.timer() - start)
+            assert response.status_code == 200, f'{url} -> {response.status_code}'
+        return latencies
+
+    per_worker = max(1, total // concurrency)
+    start = common.timer()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(worker, [per_worker] * concurrency))
+    elapsed = common.timer() - start
+    return [lat for latencies in results for lat in latencies], elapsed
+
+
+def run_asgi(url, cookies, total, concurrency):
+    from django.test import AsyncClient
+
+    async def worker(count):
+        client = AsyncClient()
+        client.cookies = cookies
+        latencies = []
+        for _ in range(count):
+            start = common.timer()
+            response = await client.get(url)
+            latencies.append(common.timer() - start)
+            assert response.status_code == 200, f'{url} -> {response.status_code}'
+        return latencies
+
+    async def main():
+        per_worker = max(1, total // concurrency)
+        start = common.timer()
+        results = await asyncio.gather(*(worker(per_worker) for _ in range(concurrency)))
+        return [lat for latencies in results for lat in latencies], common.timer() - start
+
+    return asyncio.run(main())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=200, help='requests per endpoint and concurrency level')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 16, 32])
+    parser.add_argument('--chapters', type=int, default=8)
+    parser.add_argument('--parts', type=int, default=6, help='parts per chapter')
+    args = parser.parse_args()
+
+    common.setup()
+    from django.test import Client
+
+    course = common.seed_course(chapters=args.chapters, parts_per_chapter=args.parts)
+    common.create_learner()
+    part_id = course.chapters.order_by('index').first().parts.order_by('index').first().id
+
+    client = Client()
+    cookies = common.login(client)
+    urls = endpoints(course.title, part_id)
+
+    rows = []
+    with common.quiet():
+        for mode, runner in (('wsgi', run_wsgi), ('asgi', run_asgi)):
+            use_async_views(mode == 'asgi')
+            for name, url in urls.items():
+                runner(url, cookies, args.concurrency[0], 1)  # warm up
+                for concurrency in args.concurrency:
+                    latencies, elapsed = runner(url, cookies, args.requests, concurrency)
+                    rps, p50, p95 = common.summarize(latencies, elapsed)
+                    rows.append((name, mode, concurrency, len(latencies), f'{rps:.1f}', f'{p50:.1f}', f'{p95:.1f}'))
+    use_async_views(False)
+
+    common.print_table(('endpoint', 'mode', 'concurrency', 'requests', 'req/s', 'p50 ms', 'p95 ms'), rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""
+Course content export, import, diff-based re-import and cloning
+
+    python -m benchmarks.bench_course_io --chapters 20 --parts 10 --questions 10
+
+Seeds one course, then times: exporting it as JSON and YAML, importing the
+document as a new course (bulk inserts level by level), re-importing it
+unchanged, re-importing it with a few edited rows, and the same edits saved
+one object at a time as the admin forms do, then cloning the course. Query
+counts are printed next to the timings.
+"""
+
+import argparse
+import json
+
+from benchmarks import common
+
+
+def timed(func):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    with CaptureQueriesContext(connection) as queries:
+        start = common.timer()
+        result = func()
+        elapsed = common.timer() - start
+    return result, elapsed * 1000, len(queries)
+
+
+def edit(document, every):
+    """Change every n-th question and part title in place; returns the number of edits"""
+    edits = 0
+    for chapter in document['courses'][0]['chapters']:
+        for part in chapter['parts']:
+            for quiz in part['quizzes']:
+                for question in quiz['questions'][::every]:
+                    question['question_text'] += ' (revised)'
+                    edits += 1
+        for part in chapter['parts'][::every]:
+            part['description'] += '<p>Updated for the new intake.</p>'
+            edits += 1
+    return edits
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--chapters', type=int, default=20)
+    parser.add_argument('--parts', type=int, default=10, help='Parts per chapter')
+    parser.add_argument('--questions', type=int, default=10, help='Questions per quiz')
+    parser.add_argument('--edit-every', type=int, default=10, help='Edit every n-th question and part')
+    args = parser.parse_args()
+
+    common.setup(fresh=True)
+    from counselor import course_io
+    from counselor.models import CounselorCourse, Part, Question
+
+    course = common.seed_course(chapters=args.chapters, parts_per_chapter=args.parts, questions_per_quiz=args.questions)
+    rows = sum(level.model.objects.filter(**{level.course_path: course}).count() for level in course_io.LEVELS)
+    print(f'Course with {rows} content rows\n')
+
+    results = []
+    text, ms, queries = timed(lambda: course_io.export_course_text([course], 'json'))
+    results.append(('export JSON', f'{ms:.0f}', queries, f'{len(text) / 1024:.0f} KB'))
+    if course_io.yaml is not None:
+        yaml_text, ms, queries = timed(lambda: course_io.export_course_text([course], 'yaml'))
+        results.append(('export YAML', f'{ms:.0f}', queries, f'{len(yaml_text) / 1024:.0f} KB'))
+
+    (_, counts), ms, queries = timed(lambda: course_io.import_course_text(text, title='UK copy'))
+    created = sum(count['created'] for count in counts.values())
+    results.append(('import as new course', f'{ms:.0f}', queries, f'{created} created'))
+
+    (_, counts), ms, queries = timed(lambda: course_io.import_course_text(text))
+    results.append(('re-import unchanged', f'{ms:.0f}', queries, f"{sum(c['updated'] for c in counts.values())} updated"))
+
+    document = json.loads(text)
+    edits = edit(document, args.edit_every)
+    edited = json.dumps(document)
+    (_, counts), ms, queries = timed(lambda: course_io.import_course_text(edited))
+    results.append(('re-import with edits', f'{ms:.0f}', queries, f"{sum(c['updated'] for c in counts.values())} updated"))
+
+    # The same edits through Model.save(), one form submission per row
+    def save_each():
+        for question in Question.objects.filter(quiz__quiz_part__chapter__course__title='UK copy')[::args.edit_every]:
+            question.question_text += ' (revised)'
+            question.save()
+        for part in Part.objects.filter(chapter__course__title='UK copy').order_by('chapter__index', 'index')[::args.edit_every]:
+            part.description += '<p>Updated for the new intake.</p>'
+            part.save()
+    _, ms, queries = timed(save_each)
+    results.append(('same edits, one save() each', f'{ms:.0f}', queries, f'{edits} rows'))
+
+    clone, ms, queries = timed(lambda: course_io.CourseClone.run(course))
+    results.append(('clone course', f'{ms:.0f}', queries, clone.title))
+
+    assert CounselorCourse.objects.filter(title='UK copy').count() == 1
+    common.print_table(['operation', 'ms', 'queries', ''], results)
+
+
+if __name__ == '__main__':
+    main()
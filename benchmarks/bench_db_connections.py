@@ -0,0 +1,109 @@
+"""
+Request latency with and without persistent database connections
+
+    python -m benchmarks.bench_db_connections --requests 300 --connect-latency 5
+
+Requests go through Django's WSGIHandler (not the test client, which keeps
+connections open), so request_started/request_finished close connections
+exactly as in production. Each mode runs against the seeded SQLite database:
+  - per-request: CONN_MAX_AGE=0, a new connection for every request
+  - persistent: CONN_MAX_AGE=60
+  - persistent+health: CONN_MAX_AGE=60 with CONN_HEALTH_CHECKS
+SQLite connects in microseconds, so --connect-latency adds a fixed delay to
+every new connection as a stand-in for the MySQL TCP + auth handshake
+(measure yours with `mysqlslap` or the connect time in the slow log).
+"""
+
+import argparse
+import time
+
+from benchmarks import common
+
+MODES = (
+    ('per-request', 0, False),
+    ('persistent', 60, False),
+    ('persistent+health', 60, True),
+)
+
+
+def count_connections(connection, latency):
+    """Wrap get_new_connection to add the handshake delay and count opens"""
+    opened = {'count': 0}
+    get_new_connection = connection.get_new_connection
+
+    def wrapped(conn_params):
+        opened['count'] += 1
+        if latency:
+            time.sleep(latency)
+        return get_new_connection(conn_params)
+
+    connection.get_new_connection = wrapped
+    return opened
+
+
+def run(handler, environs, total):
+    latencies = []
+    start = common.timer()
+    for index in range(total):
+        environ = environs[index % len(environs)]
+        request_start = common.timer()
+        response = handler(dict(environ), lambda status, headers: None)
+        b''.join(response)
+        response.close()  # Fires request_finished -> close_old_connections
+        latencies.append(common.timer() - request_start)
+        assert response.status_code == 200, f"{environ['PATH_INFO']} -> {response.status_code}"
+    return latencies, common.timer() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=300, help='Requests per mode')
+    parser.add_argument(
+        '--connect-latency', type=float, default=5.0,
+        help='Simulated connection setup time in ms (0 for raw SQLite)'
+    )
+    args = parser.parse_args()
+
+    common.setup(fresh=True)
+    from django.core.handlers.wsgi import WSGIHandler
+    from django.db import connection
+    from django.test import Client, RequestFactory
+
+    course = common.seed_course()
+    common.create_learner()
+    client = Client()
+    common.login(client)
+    part_id = course.chapters.order_by('index').first().parts.order_by('index')[1].id
+    connection.close()
+
+    cookie = '; '.join(f'{key}={morsel.value}' for key, morsel in client.cookies.items())
+    factory = RequestFactory(HTTP_COOKIE=cookie)
+    environs = [
+        factory.get(path).environ for path in (
+            '/counsellor-courses/',
+            f'/counselor_enrolled_course/{course.title}/',
+            f'/fetch_current_part/{course.title}/{part_id}/1/',
+        )
+    ]
+    handler = WSGIHandler()
+    opened = count_connections(connection, args.connect_latency / 1000)
+
+    rows = []
+    with common.quiet():
+        for name, max_age, health_checks in MODES:
+            connection.close()
+            connection.settings_dict['CONN_MAX_AGE'] = max_age
+            connection.settings_dict['CONN_HEALTH_CHECKS'] = health_checks
+            run(handler, environs, len(environs))  # Warm up templates and URL resolver
+            opened['count'] = 0
+            latencies, elapsed = run(handler, environs, args.requests)
+            rps, p50, p95 = common.summarize(latencies, elapsed)
+            rows.append((name, opened['count'], f'{rps:.1f}', f'{p50:.2f}', f'{p95:.2f}'))
+    connection.close()
+
+    print(f'{args.requests} requests per mode, simulated connect latency {args.connect_latency:g} ms\n')
+    common.print_table(['mode', 'connections', 'req/s', 'p50 ms', 'p95 ms'], rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""
+Streaming exports over a 1M-row CourseContentProgress table
+
+    python -m benchmarks.bench_exports --rows 1000000
+
+Seeds one course (8 chapters x 6 parts) and enough learners to reach --rows
+part completions, then streams each export into a sink that only counts
+bytes:
+  - part_progress CSV / XLSX through counselor.exports (export_progress command path)
+  - part_progress CSV through the admin action (StreamingHttpResponse, "select all")
+  - course_progress CSV (one grouped row per learner and course)
+and reports rows/s, output size and how much the process's peak RSS grew
+while exporting, which stays flat when the export streams.
+"""
+
+import argparse
+import resource
+
+from benchmarks import common
+
+
+def seed_progress(course, rows, batch_size=5000):
+    from counselor.models import CounselorUser, CourseContentProgress, Part
+
+    part_ids = list(Part.objects.filter(chapter__course=course).values_list('id', flat=True))
+    learners = -(-rows // len(part_ids))
+    for start in range(0, learners, batch_size // len(part_ids) + 1):
+        stop = min(learners, start + batch_size // len(part_ids) + 1)
+        users = CounselorUser.objects.bulk_create([
+            CounselorUser(username=f'learner{i}', email=f'learner{i}@example.com', password='x')
+            for i in range(start, stop)
+        ])
+        CourseContentProgress.objects.bulk_create([
+            CourseContentProgress(user=user, part_id_id=part_id, completed=True)
+            for user in users for part_id in part_ids
+        ])
+    return CourseContentProgress.objects.count()
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def drain(chunks):
+    size = 0
+    for chunk in chunks:
+        size += len(chunk)
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1000000, help='CourseContentProgress rows to seed')
+    args = parser.parse_args()
+
+    common.setup(fresh=True)
+    from django.contrib.auth.models import User
+    from django.test import Client
+
+    from counselor import exports
+    from counselor.models import CourseContentProgress
+
+    course = common.seed_course()
+    start = common.timer()
+    total = seed_progress(course, args.rows)
+    print(f'Seeded {total} part completions in {common.timer() - start:.1f}s\n')
+
+    User.objects.create_superuser('admin', 'admin@example.com', 'admin123')
+    admin_client = Client()
+    admin_client.login(username='admin', password='admin123')
+    first_id = CourseContentProgress.objects.values_list('id', flat=True).first()
+
+    def admin_action():
+        response = admin_client.post('/admin/counselor/coursecontentprogress/', {
+            'action': 'export_part_progress_csv', 'select_across': '1', '_selected_action': [first_id],
+        })
+        assert response.streaming, response.status_code
+        return response.streaming_content
+
+    runs = [
+        ('part_progress csv', total, lambda: exports.export_chunks('part_progress', 'csv')),
+        ('part_progress xlsx', total, lambda: exports.export_chunks('part_progress', 'xlsx')),
+        ('part_progress csv (admin action)', total, admin_action),
+        ('course_progress csv', None, lambda: exports.export_chunks('course_progress', 'csv')),
+    ]
+    rows = []
+    for name, row_count, chunks in runs:
+        rss_before = peak_rss_mb()
+        start = common.timer()
+        size = drain(chunks())
+        elapsed = common.timer() - start
+        rows.append((
+            name, row_count or '-', f'{elapsed:.1f}',
+            f'{row_count / elapsed:,.0f}' if row_count else '-',
+            f'{size / 2 ** 20:.1f}', f'{peak_rss_mb() - rss_before:.1f}',
+        ))
+    common.print_table(['export', 'rows', 'seconds', 'rows/s', 'output MB', 'peak RSS growth MB'], rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,136 @@
+"""
+Password hashing cost and login throughput during a login burst
+
+    python -m benchmarks.bench_login --iterations 260000 600000 870000 --logins 16 --burst 32
+
+Part 1 prints the cost of one PBKDF2-SHA256 hash per candidate work factor
+(pick PASSWORD_HASH_ITERATIONS from it). Part 2 runs a burst of concurrent
+logins through the real login view while other threads keep requesting the
+course list, once with hashing unbounded (LOGIN_HASH_WORKERS = burst size)
+and once with the configured pool, and reports login throughput next to the
+lesson-request latency the learners already signed in would see.
+"""
+
+import argparse
+import os
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks import common
+
+
+def hash_cost(iterations, samples=5):
+    from django.contrib.auth.hashers import PBKDF2PasswordHasher
+
+    hasher = PBKDF2PasswordHasher()
+    timings = []
+    for _ in range(samples):
+        start = common.timer()
+        hasher.encode('correct horse battery staple', hasher.salt(), iterations)
+        timings.append((common.timer() - start) * 1000)
+    return statistics.median(timings)
+
+
+def run_burst(users, burst, lesson_threads, lesson_cookies):
+    """Returns (logins/s, login p95 ms, lesson p50 ms, lesson p95 ms, busy responses)"""
+    from django.test import Client
+
+    done = threading.Event()
+    lesson_latencies = []
+
+    def lesson_worker():
+        client = Client()
+        client.cookies = lesson_cookies
+        while not done.is_set():
+            start = common.timer()
+            response = client.get('/counsellor-courses/')
+            lesson_latencies.append(common.timer() - start)
+            assert response.status_code == 200, response.status_code
+
+    def login(email):
+        start = common.timer()
+        response = Client().post('/login-page/', {'Username': email, 'password': 'learner123'})
+        return common.timer() - start, response.status_code
+
+    lesson_pool = [threading.Thread(target=lesson_worker) for _ in range(lesson_threads)]
+    for thread in lesson_pool:
+        thread.start()
+    time.sleep(0.2)  # Let the lesson clients reach a steady state first
+
+    start = common.timer()
+    with ThreadPoolExecutor(max_workers=burst) as pool:
+        results = list(pool.map(login, users))
+    elapsed = common.timer() - start
+    done.set()
+    for thread in lesson_pool:
+        thread.join()
+
+    login_latencies = [latency for latency, status in results if status == 302]
+    busy = sum(1 for _, status in results if status == 503)
+    logins_per_second, _, login_p95 = common.summarize(login_latencies or [0.0], elapsed)
+    _, lesson_p50, lesson_p95 = common.summarize(lesson_latencies or [0.0], elapsed)
+    return len(login_latencies) / elapsed, login_p95, lesson_p50, lesson_p95, busy
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument(
+        '--iterations', type=int, nargs='+', default=[260000, 600000, 870000],
+        help='Work factors to time'
+    )
+    parser.add_argument('--logins', type=int, default=48, help='Logins in each burst')
+    parser.add_argument('--burst', type=int, default=16, help='Concurrent logins')
+    parser.add_argument('--lesson-threads', type=int, default=2, help='Signed-in learners browsing meanwhile')
+    args = parser.parse_args()
+
+    common.setup(fresh=True)
+    from django.conf import settings
+    from django.contrib.auth.hashers import make_password
+    from django.test import Client
+
+    from counselor.models import CounselorUser
+    from counselor.passwords import PasswordService
+
+    print(f'Cost of one PBKDF2-SHA256 hash ({os.cpu_count()} CPUs)\n')
+    common.print_table(
+        ['iterations', 'ms per hash', 'hashes/s per core'],
+        [(n, f'{ms:.1f}', f'{1000 / ms:.1f}') for n, ms in ((n, hash_cost(n)) for n in args.iterations)]
+    )
+
+    common.seed_course(chapters=2, parts_per_chapter=3)
+    encoded = make_password('learner123')
+    CounselorUser.objects.bulk_create([
+        CounselorUser(username=f'learner{i}', email=f'learner{i}@example.com', password=encoded)
+        for i in range(args.logins)
+    ])
+    lesson_client = Client()
+    common.login(lesson_client, email='learner0@example.com')
+    users = [f'learner{i}@example.com' for i in range(args.logins)]
+
+    configured = settings.LOGIN_HASH_WORKERS
+    modes = [(f'unbounded ({args.burst} threads)', args.burst), (
+        f'LOGIN_HASH_WORKERS={configured}, LOGIN_HASH_QUEUE={settings.LOGIN_HASH_QUEUE}', configured
+    )]
+    rows = []
+    with common.quiet():
+        for name, workers in modes:
+            settings.LOGIN_HASH_WORKERS = workers
+            PasswordService.reset_executor()
+            logins_per_second, login_p95, lesson_p50, lesson_p95, busy = run_burst(
+                users, args.burst, args.lesson_threads, lesson_client.cookies
+            )
+            rows.append((name, f'{logins_per_second:.1f}', f'{login_p95:.0f}', f'{lesson_p50:.1f}', f'{lesson_p95:.1f}', busy))
+    settings.LOGIN_HASH_WORKERS = configured
+    PasswordService.reset_executor()
+
+    print(
+        f'\n{args.logins} logins, {args.burst} at a time, PASSWORD_HASH_ITERATIONS='
+        f'{settings.PASSWORD_HASH_ITERATIONS}, {args.lesson_threads} learners browsing\n'
+    )
+    common.print_table(['hashing', 'logins/s', 'login p95 ms', 'lesson p50 ms', 'lesson p95 ms', '503s'], rows)
+
+
+if __name__ == '__main__':
+    main()
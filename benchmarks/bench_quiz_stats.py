@@ -0,0 +1,108 @@
+"""
+aggregate_quiz_stats over a large QuizResults table
+
+    python -m benchmarks.bench_quiz_stats --learners 20000 --chunk-size 2000
+
+Seeds one course (8 chapters x 6 parts, 5 questions per quiz) and one
+QuizResults row per learner with a score entry for every quiz part, then
+times the streaming aggregation and the report write. --trace-memory adds a
+second aggregation pass under tracemalloc (several times slower) to report
+its peak Python memory, which should stay flat as --learners grows.
+"""
+
+import argparse
+import random
+import tracemalloc
+
+from benchmarks import common
+
+
+def seed_results(course, learners, batch_size=1000):
+    from counselor.models import CounselorUser, Part, QuizResults, UserQuizAttemptTrack
+
+    parts = list(
+        Part.objects.filter(chapter__course=course).exclude(title='Introduction')
+        .prefetch_related('quizzes__questions')
+    )
+    layout = [
+        (part.id, quiz.id, [question.id for question in quiz.questions.all()])
+        for part in parts for quiz in part.quizzes.all()
+    ]
+    rng = random.Random(42)
+    for start in range(0, learners, batch_size):
+        users = CounselorUser.objects.bulk_create([
+            CounselorUser(username=f'learner{i}', email=f'learner{i}@example.com', password='x')
+            for i in range(start, min(start + batch_size, learners))
+        ])
+        results = []
+        attempts = []
+        for user in users:
+            scores = []
+            for part_id, quiz_id, question_ids in layout:
+                correct_option = {}
+                correct_count = 0
+                for question_id in question_ids:
+                    # Later questions are harder, so the report has something to rank
+                    right = rng.random() > 0.1 + 0.15 * (question_id % 5)
+                    correct_count += right
+                    correct_option[f'ques_{question_id}'] = {
+                        'correct_ans': 'Answer 0', 'selected_ans': 'Answer 0' if right else 'Answer 1',
+                    }
+                scores.append({
+                    'part_id': part_id, 'quiz_id': quiz_id, 'total_questions_in_quiz': len(question_ids),
+                    'correct_option': correct_option,
+                    'quiz_result': {
+                        'correct_answers': correct_count, 'incorrect_answers': len(question_ids) - correct_count,
+                    },
+                })
+                if correct_count * 100 < 60 * len(question_ids):
+                    attempts.append(UserQuizAttemptTrack(
+                        user=user, course=course, part_id=part_id, no_of_attempt=rng.choice((1, 2, 3))
+                    ))
+            results.append(QuizResults(user=user, course=course, scores=scores))
+        QuizResults.objects.bulk_create(results)
+        UserQuizAttemptTrack.objects.bulk_create(attempts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--learners', type=int, default=20000, help='QuizResults rows to seed')
+    parser.add_argument('--chunk-size', type=int, default=2000, help='iterator() chunk size')
+    parser.add_argument('--trace-memory', action='store_true', help='Measure peak memory in an extra pass')
+    args = parser.parse_args()
+
+    common.setup(fresh=True)
+    from counselor.quiz_stats import QuizStatistics
+
+    course = common.seed_course()
+    start = common.timer()
+    seed_results(course, args.learners)
+    print(f'Seeded {args.learners} results in {common.timer() - start:.1f}s\n')
+
+    start = common.timer()
+    stats = QuizStatistics().collect(chunk_size=args.chunk_size)
+    collect_seconds = common.timer() - start
+
+    peak = None
+    if args.trace_memory:
+        tracemalloc.start()
+        QuizStatistics().collect(chunk_size=args.chunk_size)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    start = common.timer()
+    stats.save()
+    save_seconds = common.timer() - start
+
+    common.print_table(
+        ['results', 'score entries', 'answers', 'collect s', 'entries/s', 'peak MB', 'save s'],
+        [(
+            stats.rows, stats.entries, sum(stats.questions.counters['answered']),
+            f'{collect_seconds:.2f}', f'{stats.entries / collect_seconds:,.0f}',
+            f'{peak / 2 ** 20:.1f}' if peak else '-', f'{save_seconds:.2f}',
+        )]
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+"""
+Overhead of the login rate limiter, and what it saves under credential stuffing
+
+    python -m benchmarks.bench_rate_limit --requests 2000
+
+Part 1 times one rate_limit.check() (IP and account rule: two counters, each
+one incr and one get; POST already parsed) against the rate_limits LocMem cache, the file cache
+and the in-process fallback. Part 2 posts wrong credentials to /login-page/
+through the full middleware stack:
+  - off: RATE_LIMIT_ENABLED = False
+  - on, allowed: limits too high to trigger, so the only difference is the
+    check itself
+  - on, rejected: every attempt over the limit, answered with a 429
+and reports requests/s, median latency and database queries per request.
+"""
+
+import argparse
+import shutil
+import tempfile
+
+from benchmarks import common
+
+
+def time_checks(count, account):
+    from django.test import RequestFactory
+
+    from counselor.rate_limit import check
+
+    factory = RequestFactory()
+    requests = [
+        factory.post('/login-page/', {'Username': f'user{i % 500}@example.com'}, REMOTE_ADDR=f'10.0.{i % 250}.1')
+        for i in range(count)
+    ]
+    for request in requests:
+        request.POST  # Parsed by the view anyway; keep it out of the timing
+    start = common.timer()
+    for request in requests:
+        check('login', request, account)
+    return (common.timer() - start) / count * 1e6
+
+
+def post_logins(count, distinct_accounts):
+    from django.db import connection
+    from django.test import Client
+    from django.test.utils import CaptureQueriesContext
+
+    client = Client()
+    latencies = []
+    with CaptureQueriesContext(connection) as queries:
+        start = common.timer()
+        for i in range(count):
+            email = f'user{i}@example.com' if distinct_accounts else 'victim@example.com'
+            began = common.timer()
+            client.post('/login-page/', {'Username': email, 'password': 'guess'})
+            latencies.append(common.timer() - began)
+        elapsed = common.timer() - start
+    requests_per_second, p50, _ = common.summarize(latencies, elapsed)
+    return requests_per_second, p50, len(queries) / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--checks', type=int, default=20000, help='check() calls per backend')
+    parser.add_argument('--requests', type=int, default=2000, help='Login POSTs per mode')
+    args = parser.parse_args()
+
+    common.setup(fresh=True)
+    from django.conf import settings
+    from django.core.cache import caches
+    from django.test import override_settings
+
+    from counselor.cache import RATE_LIMITS
+    from counselor.rate_limit import SlidingWindowLimiter, post_field
+
+    account = post_field('Username')
+    cache_dir = tempfile.mkdtemp(prefix='counselor-rl-')
+    backends = [
+        ('locmem', {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}),
+        ('file', {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': cache_dir}),
+        ('in-process fallback', {'BACKEND': 'benchmarks.bench_rate_limit.BrokenCache'}),
+    ]
+    rows = []
+    try:
+        with common.quiet():
+            for name, config in backends:
+                with override_settings(CACHES={**settings.CACHES, RATE_LIMITS: config}):
+                    caches[RATE_LIMITS].clear() if name != 'in-process fallback' else SlidingWindowLimiter.local.clear()
+                    rows.append((name, f'{time_checks(args.checks, account):.1f}'))
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+    print('rate_limit.check() per login request (IP + account rule)\n')
+    common.print_table(['counter store', 'us per check'], rows)
+
+    unlimited = {scope: {kind: (10 ** 9, 300) for kind in rules} for scope, rules in settings.RATE_LIMIT_RULES.items()}
+    modes = [
+        ('off', {'RATE_LIMIT_ENABLED': False}, True),
+        ('on, allowed', {'RATE_LIMIT_ENABLED': True, 'RATE_LIMIT_RULES': unlimited}, True),
+        ('on, rejected', {'RATE_LIMIT_ENABLED': True}, False),
+    ]
+    rows = []
+    for name, overrides, distinct_accounts in modes:
+        caches[RATE_LIMITS].clear()
+        with override_settings(**overrides), common.quiet():
+            requests_per_second, p50, queries = post_logins(args.requests, distinct_accounts)
+        rows.append((name, f'{requests_per_second:.0f}', f'{p50:.2f}', f'{queries:.2f}'))
+    print(f'\n{args.requests} wrong-credential POSTs to /login-page/\n')
+    common.print_table(['limiter', 'requests/s', 'p50 ms', 'queries/request'], rows)
+
+
+class BrokenCache:
+    """Cache backend that is always down, to time the in-process fallback"""
+
+    def __init__(self, location, params):
+        pass
+
+    def incr(self, key, delta=1, version=None):
+        raise ConnectionError('cache down')
+
+    def close(self, **kwargs):
+        pass
+
+
+if __name__ == '__main__':
+    main()
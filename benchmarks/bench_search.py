@@ -0,0 +1,84 @@
+"""
+Full-text search over course content: FTS5 index against icontains scans
+
+    python -m benchmarks.bench_search --courses 5 --chapters 20 --parts 10
+
+Seeds several courses, builds the search index, then times a few queries
+against the index and the equivalent icontains filters over parts, overview
+points and questions. Also times saving one part (the signal handler rewrites
+its document after commit).
+"""
+
+import argparse
+import statistics
+
+from benchmarks import common
+
+QUERIES = ['part', 'question 3', 'visa financial requirements', 'answ']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--courses', type=int, default=5)
+    parser.add_argument('--chapters', type=int, default=20)
+    parser.add_argument('--parts', type=int, default=10, help='Parts per chapter')
+    parser.add_argument('--questions', type=int, default=5, help='Questions per quiz')
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    common.setup(fresh=True)
+    from django.db.models import Q
+    from counselor.models import CourseOverviewPoints, Part, Question
+    from counselor.search import SearchIndex
+
+    for number in range(args.courses):
+        common.seed_course(
+            title=f'Course {number}', chapters=args.chapters,
+            parts_per_chapter=args.parts, questions_per_quiz=args.questions
+        )
+
+    start = common.timer()
+    documents = SearchIndex.rebuild()
+    print(f'Indexed {documents} documents in {(common.timer() - start) * 1000:.0f} ms\n')
+
+    def scan(query):
+        words = query.split()
+        part_filter, point_filter, question_filter = Q(), Q(), Q()
+        for word in words:
+            part_filter |= Q(title__icontains=word) | Q(description__icontains=word)
+            point_filter |= Q(points__icontains=word)
+            question_filter |= Q(question_text__icontains=word) | Q(answers__answer_text__icontains=word)
+        return (
+            list(Part.objects.filter(part_filter).values_list('id', flat=True)[:20])
+            + list(CourseOverviewPoints.objects.filter(point_filter).values_list('id', flat=True)[:20])
+            + list(Question.objects.filter(question_filter).distinct().values_list('id', flat=True)[:20])
+        )
+
+    def median_ms(func):
+        samples = []
+        for _ in range(args.repeat):
+            start = common.timer()
+            func()
+            samples.append((common.timer() - start) * 1000)
+        return statistics.median(samples)
+
+    results = []
+    for query in QUERIES:
+        hits = len(SearchIndex.search(query))
+        results.append((
+            query, hits,
+            f'{median_ms(lambda: SearchIndex.search(query)):.2f}',
+            f'{median_ms(lambda: scan(query)):.2f}',
+        ))
+    common.print_table(['query', 'hits', 'index ms', 'icontains ms'], results)
+
+    part = Part.objects.order_by('id').first()
+    start = common.timer()
+    part.description += '<p>Visa financial requirements</p>'
+    part.save()
+    print(f'\nSaving one part with its index update: {(common.timer() - start) * 1000:.1f} ms')
+    assert any(result['id'] == part.id for result in SearchIndex.search('visa financial requirements'))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+"""
+Worker cold-start time: full settings vs the learner-only profile
+
+    python -m benchmarks.bench_startup --runs 7 --importtime-log /tmp/importtime
+
+Each run is a fresh interpreter that does what a gunicorn worker does on
+boot and on its first request:
+  - boot: get_wsgi_application() (settings, app registry, models, admin
+    autodiscovery, middleware)
+  - first request: URLconf load plus GET / (login page) through the handler
+Profiles:
+  - full: benchmarks.settings (admin, nested_admin, ckeditor installed)
+  - learner: benchmarks.settings_learner (counselor_project.settings_learner app list)
+The median of --runs is reported, with a `python -X importtime` breakdown of
+the boot imports by top-level package. --importtime-log keeps the raw logs.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+from benchmarks import common
+
+PROFILES = {
+    'full': 'benchmarks.settings',
+    'learner': 'benchmarks.settings_learner',
+}
+
+WORKER_SCRIPT = '''
+import json, time
+start = time.perf_counter()
+from django.core.wsgi import get_wsgi_application
+application = get_wsgi_application()
+booted = time.perf_counter()
+from django.test import RequestFactory
+environ = RequestFactory().get('/').environ
+response = application(environ, lambda status, headers: None)
+b''.join(response)
+response.close()
+served = time.perf_counter()
+import sys
+print(json.dumps({
+    'boot_ms': (booted - start) * 1000,
+    'first_request_ms': (served - booted) * 1000,
+    'modules': len(sys.modules),
+}))
+'''
+
+
+def run_worker(settings_module, importtime=False):
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE=settings_module)
+    command = [sys.executable]
+    if importtime:
+        command += ['-X', 'importtime']
+    command += ['-c', WORKER_SCRIPT]
+    start = common.timer()
+    result = subprocess.run(command, env=env, capture_output=True, text=True, check=True)
+    wall_ms = (common.timer() - start) * 1000
+    stats = json.loads(result.stdout.strip().splitlines()[-1])
+    stats['process_ms'] = wall_ms
+    return stats, result.stderr
+
+
+def imports_by_package(log):
+    """Self import time (ms) grouped by top-level package"""
+    totals = defaultdict(float)
+    for line in log.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        fields = line[len('import time:'):].split('|')
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # Header line
+        totals[fields[2].strip().split('.')[0]] += int(fields[0]) / 1000
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=7, help='Fresh interpreters per profile')
+    parser.add_argument('--top', type=int, default=12, help='Packages shown in the import breakdown')
+    parser.add_argument('--importtime-log', help='Directory to write the raw -X importtime logs to')
+    args = parser.parse_args()
+
+    # Migrate the benchmark database once so GET / finds its tables
+    common.setup(fresh=True)
+
+    rows = []
+    breakdowns = {}
+    for profile, settings_module in PROFILES.items():
+        runs = [run_worker(settings_module)[0] for _ in range(args.runs)]
+        _, log = run_worker(settings_module, importtime=True)
+        breakdowns[profile] = imports_by_package(log)
+        if args.importtime_log:
+            os.makedirs(args.importtime_log, exist_ok=True)
+            with open(os.path.join(args.importtime_log, f'{profile}.txt'), 'w') as handle:
+                handle.write(log)
+        rows.append((
+            profile,
+            f"{statistics.median(r['boot_ms'] for r in runs):.1f}",
+            f"{statistics.median(r['first_request_ms'] for r in runs):.1f}",
+            f"{statistics.median(r['process_ms'] for r in runs):.1f}",
+            runs[0]['modules'],
+        ))
+
+    print(f'Median of {args.runs} cold starts per profile\n')
+    common.print_table(['profile', 'boot ms', 'first request ms', 'process ms', 'modules'], rows)
+
+    packages = sorted(breakdowns['full'], key=breakdowns['full'].get, reverse=True)[:args.top]
+    print('\nImport time by top-level package (ms, self time, one -X importtime run)\n')
+    common.print_table(
+        ['package', *PROFILES],
+        [(package, *(f"{breakdowns[p].get(package, 0.0):.1f}" for p in PROFILES)) for package in packages]
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""
+Shared helpers for the benchmark scripts
+Run every benchmark from the repository root, e.g.
+    python -m benchmarks.bench_asgi_vs_wsgi
+"""
+
+import contextlib
+import os
+import statistics
+import time
+
+import django
+
+
+def setup(fresh=True):
+    """Configure Django against the benchmark database (recreated when fresh)"""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'benchmarks.settings')
+    django.setup()
+    from django.conf import settings
+    from django.core.management import call_command
+
+    if fresh:
+        name = settings.DATABASES['default']['NAME']
+        for path in (name, settings.SEARCH_INDEX_PATH):
+            for suffix in ('', '-wal', '-shm'):
+                if path and os.path.exists(path + suffix):
+                    os.remove(path + suffix)
+        call_command('migrate', verbosity=0)
+
+
+def seed_course(title='UK', chapters=8, parts_per_chapter=6, questions_per_quiz=5, answers_per_question=4):
+    """Create a course shaped like the country courses: Introduction first, one quiz per part"""
+    from counselor.models import (
+        Chapter, CounselorCourse, CourseOverviewPoints, CourseOverviewSummary,
+        Part, Question, Quiz, QuizAnswers
+    )
+
+    course = CounselorCourse.objects.create(title=title)
+    CourseOverviewSummary.objects.create(course=course, title1='Introduction', title2='Conclusion')
+    for chapter_index in range(chapters):
+        chapter = Chapter.objects.create(course=course, title=f'Chapter {chapter_index + 1}', index=chapter_index)
+        CourseOverviewPoints.objects.create(chapter=chapter, points=f'Key points for chapter {chapter_index + 1}')
+        for part_index in range(parts_per_chapter):
+            is_intro = chapter_index == 0 and part_index == 0
+            part = Part.objects.create(
+                chapter=chapter,
+                title='Introduction' if is_intro else f'Part {chapter_index + 1}.{part_index + 1}',
+                index=part_index,
+                description='<p>' + 'Lesson content. ' * 200 + '</p>',
+            )
+            if is_intro:
+                continue
+            quiz = Quiz.objects.create(title=f'Quiz {part.title}', quiz_part=part)
+            for question_index in range(questions_per_quiz):
+                question = Question.objects.create(quiz=quiz, question_text=f'Question {question_index + 1}')
+                QuizAnswers.objects.bulk_create([
+                    QuizAnswers(question=question, answer_text=f'Answer {a}', is_correct=(a == 0))
+                    for a in range(answers_per_question)
+                ])
+    return course
+
+
+def create_learner(email='learner@example.com', password='learner123', username='learner'):
+    from counselor.models import CounselorUser
+    return CounselorUser.objects.create(username=username, email=email, password=password)
+
+
+def login(client, email='learner@example.com', password='learner123'):
+    """Log in through the real login view so sessions match production"""
+    response = client.post('/login-page/', {'Username': email, 'password': password})
+    assert response.status_code == 302, f'login failed: {response.status_code}'
+    return client.cookies
+
+
+@contextlib.contextmanager
+def quiet():
+    """Silence the views' console logging while timing"""
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+def summarize(latencies, elapsed):
+    """Return (requests/s, p50 ms, p95 ms) for a run"""
+    latencies = sorted(latencies)
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+    return len(latencies) / elapsed, statistics.median(latencies) * 1000, p95 * 1000
+
+
+def print_table(headers, rows):
+    widths = [max(len(str(h)), *(len(str(r[i])) for r in rows)) for i, h in enumerate(headers)]
+    print('  '.join(str(h).ljust(w) for h, w in zip(headers, widths)))
+    print('  '.join('-' * w for w in widths))
+    for row in rows:
+        print('  '.join(str(c).ljust(w) for c, w in zip(row, widths)))
+
+
+def timer():
+    return time.perf_counter()
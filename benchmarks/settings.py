@@ -0,0 +1,36 @@
+"""
+Settings for the benchmark scripts in this package
+Project settings pointed at a throwaway local SQLite database
+"""
+
+import os
+import tempfile
+
+from counselor_project.settings import *  # noqa: F401,F403
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.environ.get(
+            'BENCH_DB', os.path.join(tempfile.gettempdir(), 'counselor_bench.sqlite3')
+        ),
+        # The course views write on GET; WAL + immediate transactions keep
+        # concurrent clients from failing with "database is locked"
+        'OPTIONS': {
+            'timeout': 30,
+            'transaction_mode': 'IMMEDIATE',
+            'init_command': 'PRAGMA journal_mode=WAL;',
+        },
+    }
+}
+
+ROOT_URLCONF = 'benchmarks.urls'
+DEBUG = False
+ALLOWED_HOSTS = ['*']
+SILENCED_SYSTEM_CHECKS = ['ckeditor.W001']
+
+# Every benchmark client logs in from 127.0.0.1; bench_rate_limit enables it itself
+RATE_LIMIT_ENABLED = False
+
+# Search index next to the throwaway database; setup(fresh=True) starts a new one
+SEARCH_INDEX_PATH = os.path.join(tempfile.gettempdir(), 'counselor_bench_search.sqlite3')
@@ -0,0 +1,9 @@
+"""
+Benchmark settings with the learner-only app list (counselor_project.settings_learner)
+"""
+
+from benchmarks.settings import *  # noqa: F401,F403
+from benchmarks.settings import INSTALLED_APPS
+from counselor_project.settings_learner import ADMIN_ONLY_APPS
+
+INSTALLED_APPS = [app for app in INSTALLED_APPS if app not in ADMIN_ONLY_APPS]
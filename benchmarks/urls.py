@@ -0,0 +1,12 @@
+from django.apps import apps
+from django.urls import include, path
+
+urlpatterns = [
+    path('', include('counselor.urls')),
+]
+
+# Route the admin like the project URLconf when it is installed (not in the learner profile)
+if apps.is_installed('django.contrib.admin'):
+    from django.contrib import admin
+
+    urlpatterns.append(path('admin/', admin.site.urls))
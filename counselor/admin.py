@@ -1,11 +1,15 @@
 from django import forms
 from django.contrib import admin
 from django.contrib import messages
+from django.http import HttpResponse
 from django.shortcuts import redirect
+from django.utils.text import slugify
 from django.db import models
 import nested_admin
-from .models import CounselorCertification, CounselorCourse, Chapter, CounselorUser, CourseContentProgress, CourseOverviewPoints, CourseOverviewSummary, Part, Quiz, Question, QuizAnswers, QuizResults, UserProgressTrack, UserQuizAttemptTrack
+from .models import CounselorCertification, CounselorCourse, Chapter, CounselorUser, CourseContentProgress, CourseOverviewPoints, CourseOverviewSummary, Part, PendingPartCompletion, Quiz, Question, QuizAnswers, QuizResults, UserProgressTrack, UserQuizAttemptTrack
 from ckeditor.widgets import CKEditorWidget
+from . import course_io, exports
+from .paginators import EstimatedCountPaginator
 
 class PartAdminForm(forms.ModelForm):
     description = forms.CharField(widget=CKEditorWidget(), required=False)
@@ -14,6 +18,81 @@ class PartAdminForm(forms.ModelForm):
         model = Chapter
         fields = '__all__'
 
+def export_action(export_name, fmt, description, by_course=False):
+    """
+    Admin action streaming an export of the selected rows (or, with by_course,
+    of everything in the selected courses) as CSV or XLSX
+    """
+    def action(modeladmin, request, queryset):
+        if by_course:
+            return exports.streaming_response(
+                export_name, fmt, course_ids=list(queryset.values_list('id', flat=True))
+            )
+        return exports.streaming_response(export_name, fmt, queryset)
+
+    action.__name__ = f'export_{export_name}_{fmt}'
+    action.short_description = description
+    action.allowed_permissions = ('view',)
+    return action
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """
+    Changelist settings for the per-learner tables (millions of rows): no
+    second COUNT(*) for the unfiltered total and an estimated page count
+    """
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
+
+class UserEmailFilter(admin.SimpleListFilter):
+    """
+    Learner filter typed as an exact e-mail address; a list filter on the user
+    field would render a link for every learner
+    """
+    title = 'learner'
+    parameter_name = 'user_email'
+    template = 'admin/counselor/input_filter.html'
+
+    def lookups(self, request, model_admin):
+        return ()
+
+    def has_output(self):
+        return True
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(user__email__iexact=self.value().strip())
+        return queryset
+
+    def choices(self, changelist):
+        # Submitting the box keeps the other filters and the search term
+        hidden_params = [
+            (name, value)
+            for name, values in changelist.params.items()
+            if name not in (self.parameter_name, 'p')
+            for value in (values if isinstance(values, list) else [values])
+        ]
+        yield {
+            'parameter_name': self.parameter_name,
+            'value': self.value(),
+            'placeholder': 'E-mail address',
+            'hidden_params': hidden_params,
+            'reset_query_string': changelist.get_query_string(remove=[self.parameter_name]),
+        }
+
+def export_content_action(fmt, description):
+    """Admin action downloading the content tree of the selected courses"""
+    def action(modeladmin, request, queryset):
+        text = course_io.export_course_text(queryset.order_by('title'), fmt)
+        response = HttpResponse(text, content_type='application/json' if fmt == 'json' else 'application/x-yaml')
+        titles = '-'.join(slugify(title) for title in queryset.order_by('title').values_list('title', flat=True))
+        response['Content-Disposition'] = f'attachment; filename="course-{titles[:80]}.{fmt}"'
+        return response
+
+    action.__name__ = f'export_course_content_{fmt}'
+    action.short_description = description
+    action.allowed_permissions = ('view',)
+    return action
+
 def reset_user_course_data(user, course):
     """
     Utility function to reset all course-related data for a specific user and course.
@@ -26,6 +105,7 @@ def reset_user_course_data(user, course):
     
     # Delete CourseContentProgress for parts in this course
     CourseContentProgress.objects.filter(user=user, part_id__in=parts_in_course).delete()
+    PendingPartCompletion.objects.filter(user=user, part__in=parts_in_course).delete()
     
     # Delete UserProgressTrack for this user and course
     UserProgressTrack.objects.filter(user=user, course=course).delete()
@@ -39,10 +119,10 @@ def reset_user_course_data(user, course):
     return True
 
 @admin.register(CounselorUser)
-class CounselorUserAdmin(admin.ModelAdmin):
+class CounselorUserAdmin(LargeTableAdmin):
     list_display=('id','username','email','password')
-    search_fields=('username','email','password')
-    list_filter=('username',)
+    search_fields=('^email','^username')
+    ordering=('id',)
     actions = ['reset_course_data']
     
     def reset_course_data(self, request, queryset):
@@ -142,7 +222,16 @@ class CourseAdmin(admin.ModelAdmin):
     inlines = [ChapterInline]
     list_filter = ('created_at',)
     ordering = ('-created_at',)
-    actions = ['reset_all_users_course_data']
+    actions = [
+        'reset_all_users_course_data',
+        'import_course_content',
+        'clone_courses',
+        export_content_action('json', "Export course content (JSON)"),
+        export_content_action('yaml', "Export course content (YAML)"),
+        export_action('course_progress', 'csv', "Export learner progress of selected courses (CSV)", by_course=True),
+        export_action('course_progress', 'xlsx', "Export learner progress of selected courses (Excel)", by_course=True),
+        export_action('certificates', 'csv', "Export certificates of selected courses (CSV)", by_course=True),
+    ]
     
     def reset_all_users_course_data(self, request, queryset):
         """
@@ -175,6 +264,64 @@ class CourseAdmin(admin.ModelAdmin):
     
     reset_all_users_course_data.short_description = "Reset all users' data for selected courses"
 
+    def import_course_content(self, request, queryset):
+        """
+        Admin action to import a content document into the selected course.
+        """
+        if queryset.count() != 1:
+            self.message_user(request, "Select exactly one course to import into.", level=messages.ERROR)
+            return None
+        course = queryset.get()
+
+        if 'apply' in request.POST:
+            upload = request.FILES.get('document')
+            if upload is None:
+                self.message_user(request, "Please choose a document to import.", level=messages.ERROR)
+                return redirect(request.get_full_path())
+            try:
+                _, counts = course_io.import_course_text(
+                    upload.read().decode('utf-8'), course_io.document_format(upload.name), title=course.title,
+                    prune=bool(request.POST.get('prune')), dry_run=bool(request.POST.get('dry_run'))
+                )
+            except (course_io.CourseDocumentError, UnicodeDecodeError) as e:
+                self.message_user(request, f"Import failed: {e}", level=messages.ERROR)
+                return redirect(request.get_full_path())
+
+            summary = ', '.join(
+                f"{level}: {count['created']} created, {count['updated']} updated, {count['deleted']} deleted"
+                for level, count in counts.items() if count['created'] or count['updated'] or count['deleted']
+            ) or "no changes"
+            stale = sum(count['stale'] for count in counts.values())
+            if stale:
+                summary += f" ({stale} rows not in the document were kept)"
+            prefix = "Dry run, nothing saved" if request.POST.get('dry_run') else f"Imported into {course.title}"
+            self.message_user(request, f"{prefix}: {summary}.", level=messages.SUCCESS)
+            return redirect(request.get_full_path())
+
+        from django.template.response import TemplateResponse
+        return TemplateResponse(request, 'admin/counselor/counselorcourse/import_content.html', {
+            'course': course,
+            'action_checkbox_name': admin.helpers.ACTION_CHECKBOX_NAME,
+            'opts': self.model._meta,
+        })
+
+    import_course_content.short_description = "Import course content from a JSON/YAML document"
+    import_course_content.allowed_permissions = ('change',)
+
+    def clone_courses(self, request, queryset):
+        """
+        Admin action to copy the selected courses with all their content (learner data is not copied).
+        """
+        titles = []
+        for course in queryset.order_by('title'):
+            titles.append(course_io.CourseClone.run(course).title)
+        self.message_user(
+            request, f"Created {len(titles)} course copy(ies): {', '.join(titles)}.", level=messages.SUCCESS
+        )
+
+    clone_courses.short_description = "Clone selected courses (content only)"
+    clone_courses.allowed_permissions = ('add',)
+
 class ChapterAdmin(admin.ModelAdmin):
     list_display = ('title','course','index')
     search_fields = ('title', 'course__title')
@@ -183,16 +330,38 @@ class ChapterAdmin(admin.ModelAdmin):
     
 
 @admin.register(QuizResults)
-class QuizResultsAdmin(admin.ModelAdmin):
-    list_display = ('user','course', 'scores')
-    list_filter = ('modified',)
-    actions = ['reset_user_course_from_results']
+class QuizResultsAdmin(LargeTableAdmin):
+    list_display = ('user','course', 'score_summary', 'modified')
+    list_select_related = ('user', 'course')
+    list_filter = ('modified', 'course', UserEmailFilter)
+    search_fields = ('=user__email', '^user__username')
+    autocomplete_fields = ('user', 'course')
+    actions = [
+        'reset_user_course_from_results',
+        export_action('quiz_scores', 'csv', "Export quiz scores of selected results (CSV)"),
+        export_action('quiz_scores', 'xlsx', "Export quiz scores of selected results (Excel)"),
+    ]
 
     def pretty_scores(self, obj):
         import json
         return json.dumps(obj.scores, indent=2)
     
     pretty_scores.short_description = 'Scores (Pretty Format)'
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        if request.resolver_match and request.resolver_match.url_name.endswith('_changelist'):
+            # The list shows the summary columns; the scores JSON is the bulk of each row
+            queryset = queryset.defer('scores')
+        return queryset
+
+    def score_summary(self, obj):
+        if not obj.quizzes_taken:
+            return '-'
+        return f"{obj.quizzes_passed}/{obj.quizzes_taken} parts passed, average {obj.average_percent}%"
+
+    score_summary.short_description = 'Scores'
+    score_summary.admin_order_field = 'average_percent'
     
     def reset_user_course_from_results(self, request, queryset):
         """
@@ -218,17 +387,37 @@ class QuizResultsAdmin(admin.ModelAdmin):
     reset_user_course_from_results.short_description = "Reset all course data for selected quiz results"
 
 @admin.register(CourseContentProgress)
-class ContentProgressAdmin(admin.ModelAdmin):
+class ContentProgressAdmin(LargeTableAdmin):
     list_display = ('user','part_id', 'completed')
-    list_filter = ('completed',)
-    search_fields = ('part_id',)
+    list_select_related = ('user', 'part_id')
+    list_filter = ('completed', UserEmailFilter)
+    search_fields = ('=user__email', '^user__username')
+    autocomplete_fields = ('user', 'part_id')
     ordering = ('part_id',)
+    actions = [
+        export_action('course_progress', 'csv', "Export per-course progress of selected rows (CSV)"),
+        export_action('course_progress', 'xlsx', "Export per-course progress of selected rows (Excel)"),
+        export_action('part_progress', 'csv', "Export selected part completions (CSV)"),
+        export_action('part_progress', 'xlsx', "Export selected part completions (Excel)"),
+    ]
+
+@admin.register(PendingPartCompletion)
+class PendingPartCompletionAdmin(admin.ModelAdmin):
+    list_display = ('user', 'part', 'created_at')
+    list_select_related = ('user', 'part')
+    ordering = ('id',)
 
 @admin.register(CounselorCertification)
-class CounselorCertificationAdmin(admin.ModelAdmin):
+class CounselorCertificationAdmin(LargeTableAdmin):
     list_display=('user','course','certificate_code','grade','created_at')
-    list_filter=('grade','course')
-    search_fields=('user','grade')
+    list_select_related=('user','course')
+    list_filter=('grade','course', UserEmailFilter)
+    search_fields=('=user__email','^user__username','=certificate_code')
+    autocomplete_fields=('user','course')
+    actions = [
+        export_action('certificates', 'csv', "Export selected certificates (CSV)"),
+        export_action('certificates', 'xlsx', "Export selected certificates (Excel)"),
+    ]
 
 @admin.register(CourseOverviewPoints)
 class CourseOverviewPointsAdmin(admin.ModelAdmin):
@@ -243,16 +432,20 @@ class CourseOverviewSummaryAdmin(admin.ModelAdmin):
     list_filter=('course',)
 
 @admin.register(UserProgressTrack)
-class UserProgressTrackAdmin(admin.ModelAdmin):
+class UserProgressTrackAdmin(LargeTableAdmin):
     list_display=('user','resume_part','course')
-    search_fields=('user','resume_part','course')
-    list_filter=('course',)
+    list_select_related=('user','resume_part','course')
+    search_fields=('=user__email','^user__username')
+    list_filter=('course', UserEmailFilter)
+    autocomplete_fields=('user','resume_part','course')
 
 @admin.register(UserQuizAttemptTrack)
-class UserQuizAttemptTrackAdmin(admin.ModelAdmin):
+class UserQuizAttemptTrackAdmin(LargeTableAdmin):
     list_display = ('user','course','part','no_of_attempt','window_closed_time')
-    search_fields = ('user','course','part')
-    list_filter = ('user','course','part')
+    list_select_related = ('user','course','part')
+    search_fields = ('=user__email', '^user__username')
+    list_filter = ('course', 'no_of_attempt', UserEmailFilter)
+    autocomplete_fields = ('user','course','part')
     
 # Registering models
 # admin.site.register(CourseOverviewPoints, CourseOverviewPointsAdmin)
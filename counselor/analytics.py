@@ -0,0 +1,167 @@
+"""
+Learner analytics event stream
+Views call EventLog.emit(...) for part views and completions, quiz
+submissions, attempt lockouts, failed quizzes and certificates. emit()
+only appends a tuple to an in-process buffer (after the surrounding
+transaction commits, so rolled-back work is never logged); a background
+thread in each worker flushes the buffer into the append-only LearnerEvent
+table with bulk INSERTs every ANALYTICS_FLUSH_INTERVAL seconds or as soon as
+ANALYTICS_BATCH_SIZE events are waiting. Learner requests never wait on an
+analytics write.
+Events still buffered when a worker is killed are lost; when the database
+is unreachable the buffer is kept up to ANALYTICS_BUFFER_MAX events and the
+oldest ones are dropped beyond that.
+"""
+
+import atexit
+import logging
+import os
+import threading
+from collections import deque
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.utils import timezone
+
+from .cache import record
+from .models import LearnerEvent, Part
+
+logger = logging.getLogger(__name__)
+
+PART_VIEWED = LearnerEvent.PART_VIEWED
+PART_COMPLETED = LearnerEvent.PART_COMPLETED
+QUIZ_SUBMITTED = LearnerEvent.QUIZ_SUBMITTED
+ATTEMPT_LOCKED = LearnerEvent.ATTEMPT_LOCKED
+CERTIFICATE_ISSUED = LearnerEvent.CERTIFICATE_ISSUED
+QUIZ_FAILED = LearnerEvent.QUIZ_FAILED
+
+
+def score_percent(part_scores):
+    """Percent of correct answers over score entries in the QuizResults.scores format"""
+    total = sum(score['total_questions_in_quiz'] for score in part_scores)
+    correct = sum(score['quiz_result']['correct_answers'] for score in part_scores)
+    return int(correct / total * 100) if total else 0
+
+
+class EventLog:
+    """Per-process buffer of learner events and the thread that flushes it"""
+
+    _buffer = deque()
+    _lock = threading.Lock()
+    _wakeup = threading.Event()
+    _flusher = None
+    _flusher_pid = None
+
+    @staticmethod
+    def enabled():
+        return getattr(settings, 'ANALYTICS_ENABLED', True)
+
+    @staticmethod
+    def batch_size():
+        return getattr(settings, 'ANALYTICS_BATCH_SIZE', 500)
+
+    @classmethod
+    def emit(cls, event, user_id, course_id=None, part_id=None, value=None):
+        """Record an event; course_id may be left out for part events"""
+        if not cls.enabled():
+            return
+        row = (event, user_id, course_id, part_id, value, timezone.now())
+        transaction.on_commit(lambda: cls._append([row]))
+
+    @classmethod
+    def emit_many(cls, event, user_id, part_ids, course_id=None):
+        if not cls.enabled() or not part_ids:
+            return
+        now = timezone.now()
+        rows = [(event, user_id, course_id, part_id, None, now) for part_id in part_ids]
+        transaction.on_commit(lambda: cls._append(rows))
+
+    @classmethod
+    def _append(cls, rows):
+        with cls._lock:
+            cls._buffer.extend(rows)
+            overflow = len(cls._buffer) - getattr(settings, 'ANALYTICS_BUFFER_MAX', 50000)
+            for _ in range(max(0, overflow)):
+                cls._buffer.popleft()
+            pending = len(cls._buffer)
+        if overflow > 0:
+            record('analytics', 'dropped', overflow)
+        cls._ensure_flusher()
+        if pending >= cls.batch_size():
+            cls._wakeup.set()
+
+    @classmethod
+    def _ensure_flusher(cls):
+        # A forked worker inherits the buffer but not the thread
+        if cls._flusher is not None and cls._flusher_pid == os.getpid() and cls._flusher.is_alive():
+            return
+        with cls._lock:
+            if cls._flusher is not None and cls._flusher_pid == os.getpid() and cls._flusher.is_alive():
+                return
+            cls._flusher_pid = os.getpid()
+            cls._flusher = threading.Thread(target=cls._run, name='analytics-flush', daemon=True)
+            cls._flusher.start()
+
+    @classmethod
+    def _run(cls):
+        while True:
+            cls._wakeup.wait(getattr(settings, 'ANALYTICS_FLUSH_INTERVAL', 5))
+            cls._wakeup.clear()
+            try:
+                close_old_connections()
+                while cls.flush() >= cls.batch_size():
+                    pass
+            except Exception:
+                logger.exception('Flushing analytics events failed')
+
+    @classmethod
+    def pending(cls):
+        return len(cls._buffer)
+
+    @classmethod
+    def flush(cls):
+        """Write up to one batch of buffered events; returns how many were written"""
+        with cls._lock:
+            count = min(len(cls._buffer), cls.batch_size())
+            rows = [cls._buffer.popleft() for _ in range(count)]
+        if not rows:
+            return 0
+        try:
+            # Part events are emitted without their course; resolve them here, off the request path
+            missing = {part_id for _, _, course_id, part_id, _, _ in rows if course_id is None and part_id}
+            part_courses = dict(
+                Part.objects.filter(id__in=missing).values_list('id', 'chapter__course_id')
+            ) if missing else {}
+            LearnerEvent.objects.bulk_create([
+                LearnerEvent(
+                    event=event, user_id=user_id,
+                    course_id=course_id if course_id is not None else part_courses.get(part_id),
+                    part_id=part_id, value=value, created_at=created_at
+                )
+                for event, user_id, course_id, part_id, value, created_at in rows
+            ])
+        except Exception:
+            # Put the batch back for the next attempt (subject to ANALYTICS_BUFFER_MAX)
+            with cls._lock:
+                cls._buffer.extendleft(reversed(rows))
+            raise
+        record('analytics', 'flushed', len(rows))
+        return len(rows)
+
+    @classmethod
+    def flush_all(cls):
+        """Write every buffered event (worker shutdown, management commands, tests)"""
+        total = 0
+        while cls._buffer:
+            total += cls.flush()
+        return total
+
+
+@atexit.register
+def _flush_at_exit():
+    if EventLog.pending():
+        try:
+            EventLog.flush_all()
+            connection.close()
+        except Exception:
+            logger.exception('Could not flush analytics events at exit')
@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class CounselorConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'counselor'
+
+    def ready(self):
+        from .attempt_state import QuizAttemptState
+        from .course_tree import CourseTree
+        from .search import SearchIndex
+        QuizAttemptState.connect_signals()
+        CourseTree.connect_signals()
+        SearchIndex.connect_signals()
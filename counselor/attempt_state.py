@@ -0,0 +1,124 @@
+"""
+Cached quiz attempt state for a user in a course
+Replaces per-render UserQuizAttemptTrack queries with a compact snapshot
+that is only rebuilt after the user's attempt tracks change: a quiz
+submission, or any save/delete of a track (admin edits, resets, cascades)
+"""
+
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.utils import timezone
+
+from .cache import USER_PROGRESS, get_cache
+from .models import UserQuizAttemptTrack
+
+
+class QuizAttemptState:
+    """Compact per-user-course snapshot of quiz attempt tracks"""
+
+    # Quiz is locked for this long after the second failed attempt
+    LOCKOUT_WINDOW = timedelta(minutes=5)
+    CACHE_TIMEOUT = 60 * 60 * 24
+    CACHE_PREFIX = 'quiz_attempt_state'
+
+    def __init__(self, attempts=None):
+        # part_id -> (no_of_attempt, window_closed_time)
+        self.attempts = attempts or {}
+
+    @staticmethod
+    def _pk(obj):
+        return getattr(obj, 'pk', obj)
+
+    @classmethod
+    def cache_key(cls, user, course):
+        return f'{cls.CACHE_PREFIX}:{cls._pk(user)}:{cls._pk(course)}'
+
+    @classmethod
+    def load(cls, user, course):
+        """Return cached state, building it with a single query on a miss"""
+        key = cls.cache_key(user, course)
+        cache = get_cache(USER_PROGRESS)
+        attempts = cache.get(key)
+        if attempts is None:
+            attempts = {
+                part_id: (no_of_attempt, window_closed_time)
+                for part_id, no_of_attempt, window_closed_time in
+                UserQuizAttemptTrack.objects.filter(
+                    user=cls._pk(user), course=cls._pk(course)
+                ).values_list('part_id', 'no_of_attempt', 'window_closed_time')
+            }
+            cache.set(key, attempts, cls.CACHE_TIMEOUT)
+        return cls(attempts)
+
+    @classmethod
+    async def aload(cls, user, course):
+        """Async counterpart of load() for the ASGI views"""
+        key = cls.cache_key(user, course)
+        cache = get_cache(USER_PROGRESS)
+        attempts = await cache.aget(key)
+        if attempts is None:
+            attempts = {
+                part_id: (no_of_attempt, window_closed_time)
+                async for part_id, no_of_attempt, window_closed_time in
+                UserQuizAttemptTrack.objects.filter(
+                    user=cls._pk(user), course=cls._pk(course)
+                ).values_list('part_id', 'no_of_attempt', 'window_closed_time')
+            }
+            await cache.aset(key, attempts, cls.CACHE_TIMEOUT)
+        return cls(attempts)
+
+    @classmethod
+    def invalidate(cls, user, course):
+        """Drop cached state; saves and deletes of tracks do this through signals"""
+        get_cache(USER_PROGRESS).delete(cls.cache_key(user, course))
+
+    @classmethod
+    def track_changed(cls, sender, instance, **kwargs):
+        cls.invalidate(instance.user_id, instance.course_id)
+        # Again after commit, in case a request rebuilt the state from the old rows meanwhile
+        transaction.on_commit(lambda: cls.invalidate(instance.user_id, instance.course_id))
+
+    @classmethod
+    def connect_signals(cls):
+        """Bulk writes send no signals: callers using them still call invalidate()"""
+        post_save.connect(cls.track_changed, sender=UserQuizAttemptTrack, dispatch_uid='attempt_state_save')
+        post_delete.connect(cls.track_changed, sender=UserQuizAttemptTrack, dispatch_uid='attempt_state_delete')
+
+    @classmethod
+    def unlock_time(cls, window_closed_time):
+        if window_closed_time is None:
+            return None
+        return window_closed_time + cls.LOCKOUT_WINDOW
+
+    def attempt_count(self, part_id):
+        attempt = self.attempts.get(part_id)
+        return attempt[0] if attempt else 0
+
+    def unlock_at(self, part_id):
+        attempt = self.attempts.get(part_id)
+        return self.unlock_time(attempt[1]) if attempt else None
+
+    def locked_parts(self, now=None):
+        """Parts still inside their lockout window, mapped to unlock time"""
+        now = now or timezone.now()
+        locked = {}
+        for part_id, (no_of_attempt, window_closed_time) in self.attempts.items():
+            unlock_at = self.unlock_time(window_closed_time)
+            if no_of_attempt == 2 and unlock_at and unlock_at > now:
+                locked[part_id] = unlock_at
+        return locked
+
+    def as_dict(self, now=None):
+        """JSON-friendly state so the client can run its own countdown"""
+        return {
+            'attempts': {
+                str(part_id): no_of_attempt
+                for part_id, (no_of_attempt, _) in self.attempts.items()
+            },
+            'locked': {
+                str(part_id): unlock_at.isoformat()
+                for part_id, unlock_at in self.locked_parts(now).items()
+            },
+        }
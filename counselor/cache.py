@@ -0,0 +1,232 @@
+"""
+Named caches and the helpers around them
+settings.CACHES defines one cache per kind of data (course content, user
+progress, rendered fragments, rate limits). NamespacedCache adds versioned
+keys (bump() drops a whole namespace at once), a stampede-protected
+get_or_set (one caller recomputes under a lock, hot keys are recomputed
+shortly before they expire, and after a bump the previous value can be
+served for a grace period while the new one is built) and per-process
+hit/miss counters and compute timings.
+Locks and version bumps rely on an atomic add/incr, so several workers must
+share Redis (see CACHE_BACKEND in settings); LocMem is per process and the
+file backend is for a single process only.
+"""
+
+import math
+import random
+import threading
+import time
+from collections import Counter
+
+from django.core.cache import InvalidCacheBackendError, caches
+
+COURSE_CONTENT = 'course_content'
+USER_PROGRESS = 'user_progress'
+FRAGMENTS = 'fragments'
+RATE_LIMITS = 'rate_limits'
+
+_counters = Counter()
+_counters_lock = threading.Lock()
+
+
+def get_cache(alias):
+    """Named cache, or the default cache when the alias is not configured"""
+    try:
+        return caches[alias]
+    except InvalidCacheBackendError:
+        return caches['default']
+
+
+def record(namespace, event, count=1):
+    with _counters_lock:
+        _counters[(namespace, event)] += count
+
+
+def record_duration(namespace, event, seconds):
+    """Count an event and accumulate its duration (reported as avg/max ms)"""
+    with _counters_lock:
+        _counters[(namespace, event)] += 1
+        _counters[(namespace, f'{event}_ms')] += seconds * 1000
+        key = (namespace, f'{event}_max_ms')
+        _counters[key] = max(_counters[key], seconds * 1000)
+
+
+def stats():
+    """Counters of this process: {namespace: {'hit': n, 'miss': n, ..., 'hit_rate': x}}"""
+    with _counters_lock:
+        counters = dict(_counters)
+    result = {}
+    for (namespace, event), count in sorted(counters.items()):
+        result.setdefault(namespace, {})[event] = count
+    for events in result.values():
+        lookups = events.get('hit', 0) + events.get('miss', 0)
+        events['hit_rate'] = round(events.get('hit', 0) / lookups, 3) if lookups else None
+        for event in [name for name in events if f'{name}_ms' in events]:
+            total_ms = events.pop(f'{event}_ms')
+            events[f'{event}_avg_ms'] = round(total_ms / events[event], 2) if events[event] else None
+            events[f'{event}_max_ms'] = round(events[f'{event}_max_ms'], 2)
+    return result
+
+
+def reset_stats():
+    with _counters_lock:
+        _counters.clear()
+
+
+class NamespacedCache:
+    """
+    Versioned keys for one kind of data in a named cache
+    Values are stored as (value, expires_at, compute_seconds) so get_or_set can
+    recompute ahead of expiry; read them through this class only.
+    """
+
+    LOCK_TIMEOUT = 10
+    LOCK_POLL_INTERVAL = 0.05
+    # Higher values recompute earlier; 1.0 is the usual probabilistic early expiration
+    EARLY_RECOMPUTE_BETA = 1.0
+
+    def __init__(self, namespace, alias='default', timeout=300):
+        self.namespace = namespace
+        self.alias = alias
+        self.timeout = timeout
+
+    @property
+    def cache(self):
+        # caches[alias] is per-thread, so look it up on every use
+        return get_cache(self.alias)
+
+    @property
+    def version_key(self):
+        return f'{self.namespace}:version'
+
+    @property
+    def bumped_at_key(self):
+        return f'{self.namespace}:bumped_at'
+
+    @staticmethod
+    def initial_version():
+        # Time-based rather than 1: if the version key is evicted or culled, the
+        # new version cannot match entries still cached under an older one
+        return int(time.time() * 1000)
+
+    def _reset_version(self):
+        initial = self.initial_version()
+        self.cache.add(self.version_key, initial, None)
+        return self.cache.get(self.version_key, initial)
+
+    def version(self):
+        version = self.cache.get(self.version_key)
+        if version is None:
+            version = self._reset_version()
+        return version
+
+    def bump(self):
+        """Invalidate every key in the namespace"""
+        self.cache.set(self.bumped_at_key, time.time(), None)
+        try:
+            return self.cache.incr(self.version_key)
+        except ValueError:
+            # No version yet (or it was evicted): a fresh one is already new
+            return self._reset_version()
+
+    @staticmethod
+    def _parts(parts):
+        return tuple(parts) if isinstance(parts, (tuple, list)) else (parts,)
+
+    def key(self, parts):
+        return ':'.join([self.namespace, f'v{self.version()}', *map(str, self._parts(parts))])
+
+    def latest_key(self, parts):
+        """Version-independent key holding the last value computed by get_or_set"""
+        return ':'.join([self.namespace, 'latest', *map(str, self._parts(parts))])
+
+    def stale_value(self, parts, stale_grace):
+        """
+        Last computed value from an older version, if the namespace was bumped
+        no more than stale_grace seconds ago
+        """
+        bumped_at = self.cache.get(self.bumped_at_key)
+        if not stale_grace or bumped_at is None or time.time() - bumped_at > stale_grace:
+            return None
+        return self.cache.get(self.latest_key(parts))
+
+    def _entry(self, key):
+        entry = self.cache.get(key)
+        record(self.namespace, 'miss' if entry is None else 'hit')
+        return entry
+
+    def _store(self, key, value, timeout, compute_seconds=0.0):
+        timeout = self.timeout if timeout is None else timeout
+        expires_at = time.time() + timeout if timeout else None
+        self.cache.set(key, (value, expires_at, compute_seconds), timeout or None)
+
+    def get(self, parts, default=None):
+        entry = self._entry(self.key(parts))
+        return default if entry is None else entry[0]
+
+    def contains(self, parts):
+        """Whether the current version holds a value (not counted as a hit or miss)"""
+        return self.cache.get(self.key(parts)) is not None
+
+    def set(self, parts, value, timeout=None):
+        self._store(self.key(parts), value, timeout)
+
+    def delete(self, parts):
+        self.cache.delete(self.key(parts))
+
+    def should_recompute_early(self, expires_at, compute_seconds):
+        """Probabilistic early expiration: the closer to expiry, the likelier"""
+        if not expires_at or not compute_seconds:
+            return False
+        jitter = -compute_seconds * self.EARLY_RECOMPUTE_BETA * math.log(1.0 - random.random())
+        return time.time() + jitter >= expires_at
+
+    def get_or_set(self, parts, compute, timeout=None, stale_grace=0):
+        """
+        Cached value, computed by compute() on a miss
+        Only the caller holding the key's lock recomputes; the others keep
+        serving the current value, the previous version's value for
+        stale_grace seconds after a bump(), or wait up to LOCK_TIMEOUT.
+        """
+        key = self.key(parts)
+        entry = self._entry(key)
+        if entry is not None:
+            value, expires_at, compute_seconds = entry
+            if not self.should_recompute_early(expires_at, compute_seconds):
+                return value
+            record(self.namespace, 'early_recompute')
+
+        lock_key = f'{key}:lock'
+        locked = self.cache.add(lock_key, 1, self.LOCK_TIMEOUT)
+        if not locked:
+            if entry is not None:
+                return entry[0]  # Someone else is refreshing it
+            stale = self.stale_value(parts, stale_grace)
+            if stale is not None:
+                record(self.namespace, 'stale')
+                return stale[0]
+            record(self.namespace, 'lock_wait')
+            deadline = time.monotonic() + self.LOCK_TIMEOUT
+            while time.monotonic() < deadline:
+                time.sleep(self.LOCK_POLL_INTERVAL)
+                entry = self.cache.get(key)
+                if entry is not None:
+                    return entry[0]
+            # The lock holder died or is very slow: compute without the lock
+
+        try:
+            start = time.perf_counter()
+            value = compute()
+            elapsed = time.perf_counter() - start
+            record_duration(self.namespace, 'compute', elapsed)
+            self._store(key, value, timeout, elapsed)
+            if stale_grace:
+                stored_timeout = self.timeout if timeout is None else timeout
+                self.cache.set(
+                    self.latest_key(parts), (value,),
+                    stored_timeout + stale_grace if stored_timeout else None
+                )
+        finally:
+            if locked:
+                self.cache.delete(lock_key)
+        return value
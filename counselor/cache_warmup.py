@@ -0,0 +1,96 @@
+"""
+Cache warm-up for deploys
+Preloads, for every course, the prefetched course tree (the chapter/part
+index), the rendered lesson HTML of each part and the question bank (questions
+and answer key, see quiz_variants) of each part with a quiz, so the first
+learners after a deploy hit warm caches for pages and quiz grading. Used by
+`manage.py warm_caches` and, with WARM_CACHES_ON_STARTUP, by the WSGI/ASGI
+entry points to warm each worker's own (LocMem) caches.
+The course outline itself is not cached: it is rendered from the cached tree
+with each learner's progress and lock state.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import connection
+
+from .course_tree import CourseTree
+from .lesson_html import LessonHTML
+from .models import CounselorCourse, Part
+from .quiz_variants import QuestionBank
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = 4
+
+
+def warm_course(course_name, lessons=True, quizzes=True):
+    """
+    Load one course into the caches (runs in a worker thread)
+    Returns: {'course', 'found', 'parts', 'quizzes', 'tree_ms', 'lessons_ms', 'quizzes_ms',
+    'built': {'trees', 'lessons', 'quizzes'}}, built counting the entries that were not cached yet
+    """
+    result = {
+        'course': course_name, 'found': False, 'parts': 0, 'quizzes': 0,
+        'tree_ms': 0.0, 'lessons_ms': 0.0, 'quizzes_ms': 0.0,
+        'built': {'trees': 0, 'lessons': 0, 'quizzes': 0},
+    }
+    try:
+        start = time.perf_counter()
+        result['built']['trees'] += not CourseTree.cache.contains(course_name)
+        course = CourseTree.get(course_name)
+        result['tree_ms'] = (time.perf_counter() - start) * 1000
+        if course is None:
+            return result
+        result['found'] = True
+
+        if lessons:
+            start = time.perf_counter()
+            rows = Part.objects.filter(chapter__course=course).values_list(
+                'id', 'description_hash', 'rendered_description'
+            )
+            result['parts'], result['built']['lessons'] = LessonHTML.warm(rows.iterator())
+            result['lessons_ms'] = (time.perf_counter() - start) * 1000
+
+        if quizzes:
+            start = time.perf_counter()
+            part_ids = Part.objects.filter(
+                chapter__course=course, quizzes__isnull=False
+            ).values_list('id', flat=True).distinct()
+            for part_id in part_ids:
+                result['built']['quizzes'] += not QuestionBank.cached(part_id)
+                QuestionBank.get(part_id)
+                result['quizzes'] += 1
+            result['quizzes_ms'] = (time.perf_counter() - start) * 1000
+        return result
+    finally:
+        # Worker threads must not leave their connection open
+        connection.close()
+
+
+def warm_caches(course_names=None, workers=DEFAULT_WORKERS, lessons=True, quizzes=True):
+    """Warm every course (or the given ones) in parallel; returns the per-course results"""
+    if course_names is None:
+        course_names = list(CounselorCourse.objects.order_by('title').values_list('title', flat=True))
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        return list(pool.map(lambda name: warm_course(name, lessons, quizzes), course_names))
+
+
+def warm_caches_in_background():
+    """Startup hook: warm this process's caches without delaying the first request"""
+    def run():
+        start = time.perf_counter()
+        try:
+            results = warm_caches()
+        except Exception:
+            logger.exception('Cache warm-up failed')
+            return
+        logger.info(
+            f'Warmed {len(results)} courses, {sum(r["parts"] for r in results)} lessons, '
+            f'{sum(r["quizzes"] for r in results)} quiz parts in {time.perf_counter() - start:.2f}s'
+        )
+
+    threading.Thread(target=run, name='warm-caches', daemon=True).start()
@@ -0,0 +1,365 @@
+"""
+Course content import/export and cloning (manage.py export_course / import_course, CourseAdmin)
+A course tree -- overview summaries, chapters with their overview points and
+parts, quizzes, questions and answers -- is exported as one JSON or YAML
+document in which every row carries its id. Importing walks the document one
+level at a time in dependency order: rows whose id belongs to the target
+course are compared field by field and only the changed ones are written
+(bulk_update), new rows are inserted with one bulk_create per level, and
+rows of the course missing from the document are deleted only on request
+(prune; deleting a part also deletes the learner progress recorded on it).
+Everything runs in one transaction; the course tree cache and the search
+index are refreshed after commit, since bulk writes send no model signals.
+CourseClone copies a course for a new intake the same way: one SELECT and
+one bulk INSERT per level, with new parent ids looked up by old id.
+"""
+
+import json
+import os
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from .course_tree import CourseTree
+from .lesson_html import prepare_part
+from .models import (
+    Chapter, CounselorCourse, CourseOverviewPoints, CourseOverviewSummary, Part, Question, Quiz, QuizAnswers
+)
+from .search import SearchIndex
+
+try:
+    import yaml
+except ImportError:  # YAML documents need PyYAML; JSON always works
+    yaml = None
+
+FORMAT_VERSION = 1
+BATCH_SIZE = 500
+FORMATS = ('json', 'yaml')
+
+
+class CourseDocumentError(ValueError):
+    """The document cannot be imported; the message names the offending row"""
+
+
+class Level:
+    """One row type of the course tree and where it hangs"""
+
+    def __init__(self, key, model, parent, fields, children=(), ordering=('id',)):
+        self.key = key
+        self.model = model
+        self.parent = parent
+        self.parent_attname = model._meta.get_field(parent).attname
+        self.fields = fields
+        self.children = children
+        self.ordering = ordering
+        self.course_path = None
+
+    def bind(self, course_path):
+        """Set the lookup from this level to its course, e.g. 'quiz__quiz_part__chapter__course'"""
+        self.course_path = course_path
+        for child in self.children:
+            child.bind(f'{child.parent}__{course_path}')
+        return self
+
+    def walk(self):
+        yield self
+        for child in self.children:
+            yield from child.walk()
+
+
+ANSWERS = Level('answers', QuizAnswers, 'question', ('answer_text', 'is_correct'))
+QUESTIONS = Level('questions', Question, 'quiz', ('question_text',), (ANSWERS,))
+QUIZZES = Level('quizzes', Quiz, 'quiz_part', ('title',), (QUESTIONS,))
+PARTS = Level('parts', Part, 'chapter', ('title', 'index', 'description'), (QUIZZES,), ordering=('index', 'id'))
+POINTS = Level('points', CourseOverviewPoints, 'chapter', ('points',))
+CHAPTERS = Level('chapters', Chapter, 'course', ('title', 'index'), (POINTS, PARTS), ordering=('index', 'id'))
+SUMMARIES = Level('summaries', CourseOverviewSummary, 'course', ('title1', 'title2'))
+# Children of the course itself, in dependency order
+COURSE_LEVELS = tuple(level.bind('course') for level in (SUMMARIES, CHAPTERS))
+LEVELS = tuple(level for top in COURSE_LEVELS for level in top.walk())
+
+
+class CourseExport:
+    """Course tree -> document"""
+
+    @staticmethod
+    def rows(level, course_ids):
+        """values() rows of a level for the courses, grouped by parent id"""
+        grouped = {}
+        rows = level.model.objects.filter(**{f'{level.course_path}__in': course_ids}).order_by(
+            *level.ordering
+        ).values('id', level.parent_attname, *level.fields)
+        for row in rows:
+            grouped.setdefault(row.pop(level.parent_attname), []).append(row)
+        return grouped
+
+    @classmethod
+    def document(cls, courses):
+        """Document for the given courses (a queryset or list of CounselorCourse)"""
+        courses = list(courses)
+        course_ids = [course.id for course in courses]
+        # One query per level; children are attached to their parent rows in memory
+        grouped = {level: cls.rows(level, course_ids) for level in LEVELS}
+
+        def attach(level, parent_id):
+            nodes = grouped[level].get(parent_id, [])
+            for node in nodes:
+                for child in level.children:
+                    node[child.key] = attach(child, node['id'])
+            return nodes
+
+        return {
+            'format': FORMAT_VERSION,
+            'courses': [
+                {'title': course.title, **{level.key: attach(level, course.id) for level in COURSE_LEVELS}}
+                for course in courses
+            ],
+        }
+
+    @staticmethod
+    def dumps(document, fmt='json'):
+        if fmt == 'yaml':
+            if yaml is None:
+                raise CourseDocumentError('YAML needs PyYAML (pip install pyyaml); use JSON instead')
+            return yaml.dump(
+                document, Dumper=getattr(yaml, 'CSafeDumper', yaml.SafeDumper), sort_keys=False, allow_unicode=True
+            )
+        return json.dumps(document, indent=2, ensure_ascii=False)
+
+
+class CourseImport:
+    """
+    Diff-based import of a document
+    Returns per-level counts: {'parts': {'created': n, 'updated': n, 'unchanged': n, 'stale': n, 'deleted': n}, ...}
+    """
+
+    def __init__(self, prune=False):
+        self.prune = prune
+        self.counts = {level.key: dict.fromkeys(('created', 'updated', 'unchanged', 'stale', 'deleted'), 0) for level in LEVELS}
+        self.courses = []
+
+    @staticmethod
+    def loads(text, fmt='json'):
+        if fmt == 'yaml' and yaml is None:
+            raise CourseDocumentError('YAML needs PyYAML (pip install pyyaml); use JSON instead')
+        try:
+            if fmt == 'yaml':
+                document = yaml.load(text, Loader=getattr(yaml, 'CSafeLoader', yaml.SafeLoader))
+            else:
+                document = json.loads(text)
+        except (ValueError, getattr(yaml, 'YAMLError', ValueError)) as exc:
+            raise CourseDocumentError(f'Not a valid {fmt.upper()} document: {exc}') from exc
+        if not isinstance(document, dict) or not isinstance(document.get('courses'), list):
+            raise CourseDocumentError("Expected a document with a 'courses' list")
+        if document.get('format', FORMAT_VERSION) != FORMAT_VERSION:
+            raise CourseDocumentError(f"Unsupported document format {document.get('format')!r}")
+        return document
+
+    @staticmethod
+    def clean(level, node, path):
+        """Validated field values of a document node"""
+        if not isinstance(node, dict):
+            raise CourseDocumentError(f'{path}: expected an object')
+        values = {}
+        for name in level.fields:
+            field = level.model._meta.get_field(name)
+            value = node.get(name, field.get_default())
+            try:
+                values[name] = field.clean(value, None)
+            except ValidationError as exc:
+                raise CourseDocumentError(f"{path}.{name}: {' '.join(exc.messages)}") from exc
+        return values
+
+    @staticmethod
+    def assign_ids(level, created, parent_ids, known_ids):
+        """
+        Primary keys for rows the backend did not return from bulk_create (MySQL):
+        a session's inserts get ascending auto-increment ids, so the new rows of
+        these parents, in id order, are the created objects in insertion order
+        """
+        ids = list(
+            level.model.objects.filter(**{f'{level.parent_attname}__in': parent_ids})
+            .exclude(id__in=known_ids).order_by('id').values_list('id', flat=True)
+        )
+        if len(ids) != len(created):
+            raise CourseDocumentError(f'Could not match the ids of {len(created)} new {level.key}')
+        for obj, pk in zip(created, ids):
+            obj.pk = pk
+
+    def import_level(self, level, items, existing):
+        """
+        Write one level; items are (node, path, parent_id)
+        Returns the (node, path, obj) of every row, for the next level
+        """
+        counts = self.counts[level.key]
+        created, updated, rows = [], [], []
+        update_fields = {level.parent_attname, *level.fields}
+        for node, path, parent_id in items:
+            values = self.clean(level, node, path)
+            obj = existing.pop(node.get('id'), None) if isinstance(node.get('id'), int) else None
+            if obj is None:
+                obj = level.model(**values, **{level.parent_attname: parent_id})
+                created.append(obj)
+            else:
+                values[level.parent_attname] = parent_id
+                changed = [name for name, value in values.items() if getattr(obj, name) != value]
+                for name in changed:
+                    setattr(obj, name, values[name])
+                if changed:
+                    updated.append(obj)
+                    if level.model is Part and 'description' in changed:
+                        prepare_part(obj)
+                else:
+                    counts['unchanged'] += 1
+            rows.append((node, path, obj))
+
+        if level.model is Part:
+            # bulk_create skips Part.save(), which fills the rendering fields
+            for obj in created:
+                prepare_part(obj)
+            update_fields |= {'rendered_description', 'description_hash'}
+        if created:
+            known_ids = {obj.pk for _, _, obj in rows if obj.pk is not None}
+            level.model.objects.bulk_create(created, batch_size=BATCH_SIZE)
+            if created[0].pk is None:
+                parent_ids = {getattr(obj, level.parent_attname) for obj in created}
+                self.assign_ids(level, created, parent_ids, known_ids | set(existing))
+        if updated:
+            level.model.objects.bulk_update(updated, sorted(update_fields), batch_size=BATCH_SIZE)
+        counts['created'] += len(created)
+        counts['updated'] += len(updated)
+        return rows
+
+    def import_course(self, data, index, title=None):
+        path = f'courses[{index}]'
+        if not isinstance(data, dict):
+            raise CourseDocumentError(f'{path}: expected an object')
+        title = title or data.get('title')
+        if not title:
+            raise CourseDocumentError(f'{path}.title: a course title is required')
+        course = CounselorCourse.objects.filter(title=title).order_by('id').first()
+        if course is None:
+            course = CounselorCourse.objects.create(title=title)
+        self.courses.append(course)
+
+        # Existing rows of the course by level, so ids from elsewhere never match
+        existing = {
+            level: {obj.pk: obj for obj in level.model.objects.filter(**{level.course_path: course})}
+            for level in LEVELS
+        }
+        pending = {level: [] for level in LEVELS}
+        for level in COURSE_LEVELS:
+            nodes = data.get(level.key) or []
+            if not isinstance(nodes, list):
+                raise CourseDocumentError(f'{path}.{level.key}: expected a list')
+            pending[level] = [(node, f'{path}.{level.key}[{i}]', course.pk) for i, node in enumerate(nodes)]
+
+        for level in LEVELS:  # Parents always come before their children
+            for node, node_path, obj in self.import_level(level, pending[level], existing[level]):
+                for child in level.children:
+                    nodes = node.get(child.key) or []
+                    if not isinstance(nodes, list):
+                        raise CourseDocumentError(f'{node_path}.{child.key}: expected a list')
+                    pending[child].extend(
+                        (child_node, f'{node_path}.{child.key}[{i}]', obj.pk) for i, child_node in enumerate(nodes)
+                    )
+
+        # Rows of the course the document no longer has
+        for level in reversed(LEVELS):
+            stale = existing[level]
+            if not stale:
+                continue
+            if self.prune:
+                level.model.objects.filter(pk__in=list(stale)).delete()
+                self.counts[level.key]['deleted'] += len(stale)
+            else:
+                self.counts[level.key]['stale'] += len(stale)
+        return course
+
+    def run(self, document, title=None, dry_run=False):
+        """Import every course of the document; title renames a single-course import"""
+        courses = document['courses']
+        if title and len(courses) != 1:
+            raise CourseDocumentError('A title can only be given for a single-course document')
+        with transaction.atomic():
+            for index, data in enumerate(courses):
+                self.import_course(data, index, title)
+            if dry_run:
+                transaction.set_rollback(True)
+            else:
+                transaction.on_commit(CourseTree.invalidate)
+                SearchIndex.schedule_courses([course.pk for course in self.courses])
+        return self.counts
+
+
+class CourseClone:
+    """
+    Deep copy of a course: one SELECT and one bulk INSERT per level, parents
+    resolved through an old id -> new id table filled as each level is inserted
+    """
+
+    @staticmethod
+    def copy_fields(level):
+        # Parts carry their stored rendering, so nothing needs re-sanitizing
+        if level.model is Part:
+            return (*level.fields, 'rendered_description', 'description_hash')
+        return level.fields
+
+    @staticmethod
+    def available_title(title):
+        """'<title> - Copy', numbered when that course already exists"""
+        candidate = f'{title} - Copy'
+        number = 2
+        while CounselorCourse.objects.filter(title=candidate).exists():
+            candidate = f'{title} - Copy {number}'
+            number += 1
+        return candidate
+
+    @classmethod
+    def run(cls, course, title=None):
+        """Copy course under title (default: the next free '<title> - Copy'); returns the new course"""
+        with transaction.atomic():
+            clone = CounselorCourse.objects.create(title=title or cls.available_title(course.title))
+            # Old id -> new id, per level; the course level maps the source to the clone
+            new_ids = {None: {course.pk: clone.pk}}
+            for level in LEVELS:
+                parent_ids = new_ids[cls.parent_level(level)]
+                fields = cls.copy_fields(level)
+                rows = list(
+                    level.model.objects.filter(**{level.course_path: course})
+                    .order_by('id').values_list('id', level.parent_attname, *fields)
+                )
+                created = [
+                    level.model(**{level.parent_attname: parent_ids[row[1]]}, **dict(zip(fields, row[2:])))
+                    for row in rows
+                ]
+                level.model.objects.bulk_create(created, batch_size=BATCH_SIZE)
+                if created and created[0].pk is None:
+                    CourseImport.assign_ids(level, created, set(parent_ids.values()), ())
+                new_ids[level] = {row[0]: obj.pk for row, obj in zip(rows, created)}
+            transaction.on_commit(CourseTree.invalidate)
+            SearchIndex.schedule_courses([clone.pk])
+        return clone
+
+    @staticmethod
+    def parent_level(level):
+        for candidate in LEVELS:
+            if level in candidate.children:
+                return candidate
+        return None  # Hangs off the course
+
+
+def document_format(path):
+    """'yaml' for .yaml/.yml paths, else 'json'"""
+    return 'yaml' if path and os.path.splitext(path)[1].lower() in ('.yaml', '.yml') else 'json'
+
+
+def export_course_text(courses, fmt='json'):
+    return CourseExport.dumps(CourseExport.document(courses), fmt)
+
+
+def import_course_text(text, fmt='json', title=None, prune=False, dry_run=False):
+    """Import a JSON/YAML document; returns (courses, per-level counts)"""
+    importer = CourseImport(prune=prune)
+    counts = importer.run(CourseImport.loads(text, fmt), title=title, dry_run=dry_run)
+    return importer.courses, counts
@@ -0,0 +1,90 @@
+"""
+Cached course content tree (chapters -> parts -> quizzes -> questions -> answers)
+Every course page reads the whole tree, so it is built once per content
+version and shared through the course_content cache. Saving or deleting any
+content model in the admin bumps the version (after the transaction
+commits); the first request for the new version rebuilds the tree under a
+lock while concurrent requests keep serving the previous tree for up to
+STALE_GRACE seconds, so an edit never triggers a rebuild on every worker.
+"""
+
+import logging
+
+from django.db import transaction
+from django.db.models import Prefetch
+from django.db.models.signals import post_delete, post_save
+
+from .cache import COURSE_CONTENT, NamespacedCache, stats
+from .models import Chapter, CounselorCourse, Part, Question, Quiz, QuizAnswers
+
+logger = logging.getLogger(__name__)
+
+
+class CourseTree:
+    """Versioned, single-flight cache of the prefetched course tree"""
+
+    TIMEOUT = 60 * 60
+    STALE_GRACE = 60
+    CONTENT_MODELS = (CounselorCourse, Chapter, Part, Quiz, Question, QuizAnswers)
+
+    cache = NamespacedCache('course_tree', COURSE_CONTENT, timeout=TIMEOUT)
+
+    @staticmethod
+    def queryset(course_name):
+        """Queryset for a course with its full chapter/part/quiz tree prefetched"""
+        return CounselorCourse.objects.prefetch_related(
+            Prefetch(
+                'chapters',
+                queryset=Chapter.objects.order_by('index')
+            ),
+            Prefetch(
+                'chapters__parts',
+                queryset=Part.objects.only('id', 'title', 'index', 'chapter_id')
+            ),
+            Prefetch(
+                'chapters__parts__quizzes',
+                queryset=Quiz.objects.all()
+            ),
+            Prefetch(
+                'chapters__parts__quizzes__questions',
+                queryset=Question.objects.all()
+            ),
+            Prefetch(
+                'chapters__parts__quizzes__questions__answers',
+                queryset=QuizAnswers.objects.all()
+            )
+        ).only('id', 'title').filter(title=course_name)
+
+    @classmethod
+    def build(cls, course_name):
+        course = cls.queryset(course_name).first()
+        logger.info(f"Rebuilt course tree '{course_name}' (version {cls.cache.version()})")
+        return course
+
+    @classmethod
+    def get(cls, course_name):
+        """Course with its prefetched tree, or None when there is no such course"""
+        return cls.cache.get_or_set(
+            course_name, lambda: cls.build(course_name), stale_grace=cls.STALE_GRACE
+        )
+
+    @classmethod
+    def invalidate(cls):
+        """Start a new content version; call after bulk changes that skip signals"""
+        cls.cache.bump()
+
+    @staticmethod
+    def stats():
+        """Hits, misses, stale reads and rebuild timings of this process"""
+        return stats().get('course_tree', {})
+
+    @classmethod
+    def content_changed(cls, sender, **kwargs):
+        # Bump after commit so a concurrent rebuild cannot cache the old rows
+        transaction.on_commit(cls.invalidate)
+
+    @classmethod
+    def connect_signals(cls):
+        for model in cls.CONTENT_MODELS:
+            post_save.connect(cls.content_changed, sender=model, dispatch_uid=f'course_tree_save_{model.__name__}')
+            post_delete.connect(cls.content_changed, sender=model, dispatch_uid=f'course_tree_delete_{model.__name__}')
@@ -0,0 +1,344 @@
+"""
+Streaming cohort exports (admin actions and `manage.py export_progress`)
+Each export reads plain value tuples (values_list, no model instances) chunk
+by chunk and the CSV / XLSX writers turn them into byte chunks as they go,
+so a StreamingHttpResponse or an output file receives the data while it is
+being read and memory does not grow with the number of rows.
+Chunking uses QuerySet.iterator(chunk_size) where the driver streams
+results; mysqlclient buffers whole result sets, so on MySQL the row exports
+page through the table by primary key (grouped exports by their group keys)
+instead.
+XLSX is written as a minimal SpreadsheetML package with zipfile (stdlib),
+streamed the same way; cells are numbers or inline strings.
+Text starting like a formula (usernames and e-mails come from the signup
+form) gets a leading apostrophe, so spreadsheets show it instead of running it.
+"""
+
+import csv
+import io
+import re
+import zipfile
+from datetime import datetime
+from xml.sax.saxutils import escape
+
+from django.db import connection
+from django.db.models import Count, OuterRef, Q, Subquery
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+from .models import CounselorCertification, CourseContentProgress, Part, QuizResults
+
+CHUNK_SIZE = 2000
+# Bytes collected before a chunk is handed to the response / file
+FLUSH_BYTES = 64 * 1024
+
+FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+
+def stream_values(queryset, fields, chunk_size=CHUNK_SIZE):
+    """values_list(*fields) rows of queryset, fetched chunk_size at a time"""
+    if connection.vendor != 'mysql':
+        yield from queryset.values_list(*fields).iterator(chunk_size=chunk_size)
+        return
+    # Keyset pagination: every chunk is its own small, fully buffered query
+    queryset = queryset.order_by('pk')
+    last_pk = None
+    while True:
+        page = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+        rows = list(page.values_list('pk', *fields)[:chunk_size])
+        for row in rows:
+            yield row[1:]
+        if len(rows) < chunk_size:
+            return
+        last_pk = rows[-1][0]
+
+
+def _after(keys, values):
+    """Rows ordered after values by keys (lexicographic)"""
+    condition = Q()
+    for index, key in enumerate(keys):
+        condition |= Q(**dict(zip(keys[:index], values[:index])), **{f'{key}__gt': values[index]})
+    return condition
+
+
+def stream_grouped(queryset, keys, fields, chunk_size=CHUNK_SIZE):
+    """values_list(*fields) rows of a queryset grouped by keys (.values(*keys).annotate(...)), chunk by chunk"""
+    queryset = queryset.order_by(*keys)
+    if connection.vendor != 'mysql':
+        yield from queryset.values_list(*fields).iterator(chunk_size=chunk_size)
+        return
+    # Keyset pagination over the group keys, as stream_values does by primary key
+    last = None
+    while True:
+        page = queryset if last is None else queryset.filter(_after(keys, last))
+        rows = list(page.values_list(*keys, *fields)[:chunk_size])
+        for row in rows:
+            yield row[len(keys):]
+        if len(rows) < chunk_size:
+            return
+        last = rows[-1][:len(keys)]
+
+
+# Leading characters that make spreadsheet applications evaluate a cell
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def format_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        if timezone.is_aware(value):
+            value = timezone.localtime(value)
+        return value.strftime('%Y-%m-%d %H:%M')
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+class CertificateExport:
+    """One row per issued certificate"""
+    name = 'certificates'
+    model = CounselorCertification
+    headers = ('Username', 'Email', 'Course', 'Certificate code', 'Grade', 'Issued')
+
+    @classmethod
+    def queryset(cls, course_ids=None):
+        queryset = CounselorCertification.objects.all()
+        return queryset.filter(course_id__in=course_ids) if course_ids is not None else queryset
+
+    @classmethod
+    def rows(cls, queryset):
+        return stream_values(queryset, (
+            'user__username', 'user__email', 'course__title', 'certificate_code', 'grade', 'created_at'
+        ))
+
+
+class PartProgressExport:
+    """One row per part completion record"""
+    name = 'part_progress'
+    model = CourseContentProgress
+    headers = ('Username', 'Email', 'Course', 'Chapter', 'Part', 'Completed')
+
+    @classmethod
+    def queryset(cls, course_ids=None):
+        queryset = CourseContentProgress.objects.all()
+        return queryset.filter(part_id__chapter__course_id__in=course_ids) if course_ids is not None else queryset
+
+    @classmethod
+    def rows(cls, queryset):
+        for username, email, course, chapter, part, completed in stream_values(queryset, (
+            'user__username', 'user__email', 'part_id__chapter__course__title',
+            'part_id__chapter__title', 'part_id__title', 'completed'
+        )):
+            yield username, email, course, chapter, part, 'yes' if completed else 'no'
+
+
+class CourseProgressExport:
+    """One row per learner and course: completed parts, percent and certificate"""
+    name = 'course_progress'
+    model = CourseContentProgress
+    headers = (
+        'Username', 'Email', 'Course', 'Completed parts', 'Total parts', 'Percent complete',
+        'Grade', 'Certificate code', 'Issued',
+    )
+
+    @classmethod
+    def queryset(cls, course_ids=None):
+        return PartProgressExport.queryset(course_ids)
+
+    @classmethod
+    def rows(cls, queryset):
+        # Introduction parts are not counted, as on the course page
+        total_parts = dict(
+            Part.objects.exclude(title='Introduction').values('chapter__course_id')
+            .annotate(total=Count('id')).values_list('chapter__course_id', 'total')
+        )
+        certificates = CounselorCertification.objects.filter(
+            user_id=OuterRef('user_id'), course_id=OuterRef('part_id__chapter__course_id')
+        )
+        # One grouped row per (user, course); the database does the counting
+        keys = ('user_id', 'part_id__chapter__course_id')
+        grouped = (
+            queryset.filter(completed=True).exclude(part_id__title='Introduction')
+            .values(*keys)
+            .annotate(
+                completed_parts=Count('id'),
+                grade=Subquery(certificates.values('grade')[:1]),
+                certificate_code=Subquery(certificates.values('certificate_code')[:1]),
+                issued=Subquery(certificates.values('created_at')[:1]),
+            )
+        )
+        for username, email, course_id, course, completed, grade, code, issued in stream_grouped(grouped, keys, (
+            'user__username', 'user__email', 'part_id__chapter__course_id', 'part_id__chapter__course__title',
+            'completed_parts', 'grade', 'certificate_code', 'issued'
+        )):
+            total = total_parts.get(course_id, 0)
+            percent = int(completed / total * 100) if total else 0
+            yield username, email, course, completed, total, percent, grade, code, issued
+
+
+class QuizScoreExport:
+    """One row per saved quiz score (QuizResults.scores entry)"""
+    name = 'quiz_scores'
+    model = QuizResults
+    headers = ('Username', 'Email', 'Course', 'Part', 'Quiz', 'Correct', 'Questions', 'Percent', 'Last modified')
+
+    @classmethod
+    def queryset(cls, course_ids=None):
+        queryset = QuizResults.objects.all()
+        return queryset.filter(course_id__in=course_ids) if course_ids is not None else queryset
+
+    @classmethod
+    def rows(cls, queryset):
+        part_titles = dict(Part.objects.values_list('id', 'title'))
+        for username, email, course, modified, scores in stream_values(queryset, (
+            'user__username', 'user__email', 'course__title', 'modified', 'scores'
+        )):
+            if not isinstance(scores, list):
+                continue
+            for score in scores:
+                try:
+                    correct = score['quiz_result']['correct_answers']
+                    total = score['total_questions_in_quiz']
+                except (KeyError, TypeError):
+                    continue
+                percent = int(correct / total * 100) if total else 0
+                yield (
+                    username, email, course, part_titles.get(score.get('part_id'), score.get('part_id')),
+                    score.get('quiz_id'), correct, total, percent, modified
+                )
+
+
+EXPORTS = {
+    export.name: export
+    for export in (CertificateExport, CourseProgressExport, PartProgressExport, QuizScoreExport)
+}
+
+
+class _Buffer:
+    """Write-only sink whose contents are taken out chunk by chunk"""
+
+    def __init__(self):
+        self.parts = []
+        self.size = 0
+
+    def write(self, data):
+        self.parts.append(data)
+        self.size += len(data)
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def take(self):
+        data = b''.join(self.parts)
+        self.parts = []
+        self.size = 0
+        return data
+
+
+def csv_chunks(headers, rows):
+    """CSV (UTF-8 with BOM, so Excel detects the encoding) as byte chunks"""
+    text = io.StringIO()
+    writer = csv.writer(text)
+    text.write('\ufeff')
+    writer.writerow(headers)
+    for row in rows:
+        writer.writerow([format_value(value) for value in row])
+        if text.tell() >= FLUSH_BYTES:
+            yield text.getvalue().encode()
+            text.seek(0)
+            text.truncate()
+    yield text.getvalue().encode()
+
+
+# Characters XML 1.0 does not allow, even escaped
+_INVALID_XML = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+_XLSX_PARTS = {
+    '[Content_Types].xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    '_rels/.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Target="xl/workbook.xml" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"/>'
+        '</Relationships>'
+    ),
+    'xl/workbook.xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Export" sheetId="1" r:id="rId1"/></sheets></workbook>'
+    ),
+    'xl/_rels/workbook.xml.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Target="worksheets/sheet1.xml" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet"/>'
+        '</Relationships>'
+    ),
+}
+
+
+def _xlsx_cell(value):
+    value = format_value(value)
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        text = escape(_INVALID_XML.sub('', str(value)))
+        return f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+    return f'<c><v>{value}</v></c>'
+
+
+def xlsx_chunks(headers, rows):
+    """Single-sheet XLSX workbook as byte chunks"""
+    buffer = _Buffer()
+    with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_DEFLATED) as package:
+        for name, content in _XLSX_PARTS.items():
+            package.writestr(name, content)
+        with package.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as sheet:
+            sheet.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+            )
+            sheet.write(('<row>' + ''.join(map(_xlsx_cell, headers)) + '</row>').encode())
+            for row in rows:
+                sheet.write(('<row>' + ''.join(map(_xlsx_cell, row)) + '</row>').encode())
+                if buffer.size >= FLUSH_BYTES:
+                    yield buffer.take()
+            sheet.write(b'</sheetData></worksheet>')
+    yield buffer.take()
+
+
+WRITERS = {'csv': csv_chunks, 'xlsx': xlsx_chunks}
+
+
+def export_chunks(export_name, fmt, queryset=None, course_ids=None):
+    """Byte chunks of an export; queryset narrows the export's model (admin selection)"""
+    export = EXPORTS[export_name]
+    if queryset is None:
+        queryset = export.queryset(course_ids)
+    return WRITERS[fmt](export.headers, export.rows(queryset))
+
+
+def filename(export_name, fmt):
+    return f'{export_name}-{timezone.localdate():%Y%m%d}.{fmt}'
+
+
+def streaming_response(export_name, fmt, queryset=None, course_ids=None):
+    response = StreamingHttpResponse(
+        export_chunks(export_name, fmt, queryset, course_ids), content_type=FORMATS[fmt]
+    )
+    response['Content-Disposition'] = f'attachment; filename="{filename(export_name, fmt)}"'
+    return response
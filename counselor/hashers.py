@@ -0,0 +1,18 @@
+"""
+Password hasher for CounselorUser (and the admin's auth users)
+Standard Django PBKDF2-SHA256 hashes whose work factor comes from
+settings.PASSWORD_HASH_ITERATIONS, so it can be tuned per deployment
+(`python -m benchmarks.bench_login` prints the cost per hash). Stored hashes
+with a different iteration count are upgraded on the next successful login.
+"""
+
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+
+
+class CounselorPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """PBKDF2-SHA256 with a configurable iteration count"""
+
+    @property
+    def iterations(self):
+        return getattr(settings, 'PASSWORD_HASH_ITERATIONS', 600000)
@@ -0,0 +1,215 @@
+"""
+Responsive derivatives for the course slide images under static/
+`manage.py build_image_derivatives` writes resized JPEG/PNG and WebP variants
+of every slide into static/derivatives/ and records them in a manifest keyed
+by the slide's static path; the `responsive_images` template filter uses the
+manifest to rewrite <img> tags in lesson HTML to <picture>/srcset (and
+to fingerprinted URLs once the hashed static build is in place).
+"""
+
+import hashlib
+import json
+import os
+import re
+from urllib.parse import unquote, urlsplit
+
+from django.conf import settings
+from django.templatetags.static import static
+
+# Target widths (px); images narrower than a target are not upscaled
+DERIVATIVE_WIDTHS = (480, 960, 1600)
+DERIVATIVES_DIR = 'derivatives'
+MANIFEST_NAME = 'manifest.json'
+SOURCE_EXTENSIONS = ('.jpg', '.jpeg', '.jfif', '.png')
+JPEG_QUALITY = 80
+WEBP_QUALITY = 78
+# Lesson content is full width on phones and roughly 3/4 of the viewport on desktop
+IMAGE_SIZES = '(max-width: 768px) 100vw, 75vw'
+
+
+def static_root_dir():
+    """Source static directory (first STATICFILES_DIRS entry)"""
+    return str(settings.STATICFILES_DIRS[0])
+
+
+def manifest_path():
+    return os.path.join(static_root_dir(), DERIVATIVES_DIR, MANIFEST_NAME)
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as handle:
+        for chunk in iter(lambda: handle.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def derivative_name(relative_path, width, extension):
+    stem, _ = os.path.splitext(relative_path)
+    return f'{DERIVATIVES_DIR}/{stem}-{width}w.{extension}'
+
+
+def build_derivatives(static_dir, relative_path, widths):
+    """
+    Write the variants of one image (runs in a worker process)
+    Returns: (relative_path, manifest entry without the hash)
+    """
+    # Pillow is only needed by the build command, not by every worker that rewrites HTML
+    from PIL import Image, ImageOps
+
+    with Image.open(os.path.join(static_dir, relative_path)) as source:
+        image = ImageOps.exif_transpose(source)
+        has_alpha = image.mode in ('RGBA', 'LA', 'P') and (
+            image.mode != 'P' or 'transparency' in image.info
+        )
+        image = image.convert('RGBA' if has_alpha else 'RGB')
+    width, height = image.size
+    fallback_extension = 'png' if has_alpha else 'jpg'
+
+    entry = {'width': width, 'height': height, 'webp': {}, 'fallback': {}}
+    for target in sorted({w for w in widths if w < width} | {width}):
+        resized = image if target == width else image.resize(
+            (target, max(1, round(height * target / width))), Image.Resampling.LANCZOS
+        )
+        webp_name = derivative_name(relative_path, target, 'webp')
+        os.makedirs(os.path.dirname(os.path.join(static_dir, webp_name)), exist_ok=True)
+        resized.save(os.path.join(static_dir, webp_name), 'WEBP', quality=WEBP_QUALITY, method=4)
+        entry['webp'][str(target)] = webp_name
+
+        if target == width:
+            # The original file is the full-size fallback
+            entry['fallback'][str(target)] = relative_path
+            continue
+        fallback_name = derivative_name(relative_path, target, fallback_extension)
+        if has_alpha:
+            resized.save(os.path.join(static_dir, fallback_name), 'PNG', optimize=True)
+        else:
+            resized.save(
+                os.path.join(static_dir, fallback_name), 'JPEG',
+                quality=JPEG_QUALITY, optimize=True, progressive=True
+            )
+        entry['fallback'][str(target)] = fallback_name
+    return relative_path, entry
+
+
+def remove_derivatives(static_dir, entry):
+    for variants in (entry.get('webp', {}), entry.get('fallback', {})):
+        for name in variants.values():
+            if name.startswith(f'{DERIVATIVES_DIR}/'):
+                try:
+                    os.remove(os.path.join(static_dir, name))
+                except FileNotFoundError:
+                    pass
+
+
+def read_manifest(path=None):
+    try:
+        with open(path or manifest_path(), encoding='utf-8') as handle:
+            return json.load(handle)
+    except (FileNotFoundError, ValueError):
+        return {'widths': [], 'images': {}}
+
+
+def write_manifest(manifest, path=None):
+    path = path or manifest_path()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as handle:
+        json.dump(manifest, handle, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+# ============================================================================
+# HTML REWRITING
+# ============================================================================
+
+_manifest_cache = {'mtime': None, 'images': {}}
+
+IMG_TAG_RE = re.compile(r'<img\b[^>]*>', re.IGNORECASE)
+SRC_ATTR_RE = re.compile(r'\ssrc\s*=\s*(["\'])(.*?)\1', re.IGNORECASE | re.DOTALL)
+
+
+def manifest_images():
+    """Manifest images, re-read only when the manifest file changes"""
+    try:
+        mtime = os.path.getmtime(manifest_path())
+    except OSError:
+        return {}
+    if mtime != _manifest_cache['mtime']:
+        _manifest_cache['images'] = read_manifest().get('images', {})
+        _manifest_cache['mtime'] = mtime
+    return _manifest_cache['images']
+
+
+def static_relative_path(src):
+    """Map a same-site <img> src to its path under static/ (None for other URLs)"""
+    url = urlsplit(src)
+    if url.netloc:
+        return None
+    path = unquote(url.path)
+    static_url = urlsplit(settings.STATIC_URL).path
+    if static_url and path.startswith(static_url):
+        return path[len(static_url):]
+    if '/static/' in path:
+        return path.split('/static/', 1)[1]
+    return None
+
+
+def srcset(variants):
+    return ', '.join(
+        f'{static(name)} {width}w'
+        for width, name in sorted(variants.items(), key=lambda item: int(item[0]))
+    )
+
+
+def hashed_static_url(relative_path):
+    """Fingerprinted URL for a collected static file (None when it was not collected)"""
+    try:
+        return static(relative_path)
+    except ValueError:
+        # Manifest storage raises for files missing from the static build
+        return None
+
+
+def rewrite_img_tag(tag, images):
+    src_match = SRC_ATTR_RE.search(tag)
+    if not src_match:
+        return tag
+    relative_path = static_relative_path(src_match.group(2))
+    if not relative_path:
+        return tag
+    src_url = hashed_static_url(relative_path)
+    if not src_url:
+        return tag
+
+    # Point src at the fingerprinted (immutable-cached) name
+    quote = src_match.group(1)
+    img = f'{tag[:src_match.start()]} src={quote}{src_url}{quote}'
+    entry = images.get(relative_path)
+    if not entry or 'srcset' in tag.lower():
+        return img + tag[src_match.end():]
+
+    try:
+        webp_srcset = srcset(entry['webp'])
+        fallback_srcset = srcset(entry['fallback'])
+    except ValueError:
+        return img + tag[src_match.end():]
+    img += f' srcset="{fallback_srcset}" sizes="{IMAGE_SIZES}"'
+    if 'loading=' not in tag.lower():
+        img += ' loading="lazy" decoding="async"'
+    img += tag[src_match.end():]
+    return (
+        f'<picture><source type="image/webp" srcset="{webp_srcset}" '
+        f'sizes="{IMAGE_SIZES}">{img}</picture>'
+    )
+
+
+def rewrite_images(html):
+    """
+    Point every static <img> in the HTML at its fingerprinted URL and, for
+    slides with derivatives, at its WebP/resized variants
+    """
+    if not html or '<img' not in html.lower():
+        return html
+    images = manifest_images()
+    return IMG_TAG_RE.sub(lambda match: rewrite_img_tag(match.group(0), images), html)
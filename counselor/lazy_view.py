@@ -0,0 +1,42 @@
+"""
+Lazily imported URLconf callbacks
+LazyView('counselor.views_v2.FetchCurrentPartViewV2', as_view=True) stands in
+for the view in urlpatterns and imports its module on first use, so loading
+the URLconf does not import every view module (and their dependencies) up
+front. Attribute lookups such as `csrf_exempt` from CsrfViewMiddleware are
+forwarded to the real view, which resolves it at that point.
+Only for synchronous views: Django decides sync/async from the callback
+itself, before it is resolved.
+"""
+
+from django.utils.module_loading import import_string
+
+
+class LazyView:
+    """URLconf callback that imports the view it names when first used"""
+
+    def __init__(self, dotted_path, as_view=False):
+        self.dotted_path = dotted_path
+        self.as_view = as_view
+        self._view = None
+        # URLPattern.lookup_str reads these; keep them from resolving the view
+        self.__module__, self.__qualname__ = dotted_path.rsplit('.', 1)
+        self.__name__ = self.__qualname__
+
+    def resolve(self):
+        if self._view is None:
+            view = import_string(self.dotted_path)
+            self._view = view.as_view() if self.as_view else view
+        return self._view
+
+    def __call__(self, request, *args, **kwargs):
+        return self.resolve()(request, *args, **kwargs)
+
+    def __getattr__(self, name):
+        # Only called for attributes missing on LazyView itself
+        if name.startswith('__') or name == 'view_class':
+            raise AttributeError(name)
+        return getattr(self.resolve(), name)
+
+    def __repr__(self):
+        return f'<LazyView {self.dotted_path}>'
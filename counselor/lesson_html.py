@@ -0,0 +1,164 @@
+"""
+Pre-rendered lesson HTML for Part.description
+Part.save() stores a sanitized copy of the ckeditor HTML plus its content
+hash; pages render LessonHTML.get(), a cache read keyed by that hash and the
+current static build, instead of loading and rewriting the raw description
+on every request.
+"""
+
+import hashlib
+import os
+from html import escape
+from html.parser import HTMLParser
+
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.utils.safestring import mark_safe
+
+from .cache import FRAGMENTS, NamespacedCache
+from .image_derivatives import manifest_path, rewrite_images
+
+# Elements removed together with their content
+DROPPED_TAGS = {'script', 'noscript', 'object', 'embed', 'applet', 'base', 'meta', 'link'}
+URL_ATTRIBUTES = {'href', 'src', 'action', 'formaction', 'xlink:href', 'poster', 'background'}
+UNSAFE_SCHEMES = ('javascript:', 'vbscript:', 'data:text/html')
+# Part of the lesson cache key: bump it whenever sanitize_html's output changes
+# (stored rendered_description rows need a data migration as well)
+RENDER_VERSION = 2
+
+
+class LessonSanitizer(HTMLParser):
+    """Re-serializes HTML without scripts, event handlers or script URLs"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=False)
+        self.output = []
+        self.dropped_depth = 0
+
+    @staticmethod
+    def is_safe_attribute(name, value):
+        if name.startswith('on') or name == 'srcdoc':
+            return False
+        if name in URL_ATTRIBUTES and value:
+            compact = ''.join(ch for ch in value if ch > ' ').lower()
+            return not compact.startswith(UNSAFE_SCHEMES)
+        return True
+
+    def render_tag(self, tag, attrs, self_closing=False):
+        parts = [tag]
+        for name, value in attrs:
+            if not self.is_safe_attribute(name, value):
+                continue
+            parts.append(name if value is None else f'{name}="{escape(value, quote=True)}"')
+        return f'<{" ".join(parts)}{" /" if self_closing else ""}>'
+
+    def handle_starttag(self, tag, attrs):
+        if tag in DROPPED_TAGS:
+            self.dropped_depth += 1
+        elif not self.dropped_depth:
+            self.output.append(self.render_tag(tag, attrs))
+
+    def handle_startendtag(self, tag, attrs):
+        if tag not in DROPPED_TAGS and not self.dropped_depth:
+            self.output.append(self.render_tag(tag, attrs, self_closing=True))
+
+    def handle_endtag(self, tag):
+        if tag in DROPPED_TAGS:
+            self.dropped_depth = max(0, self.dropped_depth - 1)
+        elif not self.dropped_depth:
+            self.output.append(f'</{tag}>')
+
+    def handle_data(self, data):
+        if self.dropped_depth:
+            return
+        # <style> is raw text: entities are not decoded there, so escaping would
+        # turn `ul > li` into `ul &gt; li`. The parser ends it at the first </style
+        self.output.append(data if self.cdata_elem == 'style' else escape(data, quote=False))
+
+    def handle_entityref(self, name):
+        if not self.dropped_depth:
+            self.output.append(f'&{name};')
+
+    def handle_charref(self, name):
+        if not self.dropped_depth:
+            self.output.append(f'&#{name};')
+
+    # Comments, doctypes and processing instructions are dropped
+
+
+def sanitize_html(html):
+    """Sanitized copy of trusted-but-edited rich text"""
+    if not html:
+        return ''
+    sanitizer = LessonSanitizer()
+    sanitizer.feed(html)
+    sanitizer.close()
+    return ''.join(sanitizer.output)
+
+
+def content_hash(html):
+    return hashlib.sha256(html.encode('utf-8')).hexdigest() if html else ''
+
+
+def prepare_part(part):
+    """Fill the stored rendering fields of a Part from its description"""
+    part.rendered_description = sanitize_html(part.description)
+    part.description_hash = content_hash(part.description)
+
+
+def static_version():
+    """Changes whenever the image derivatives or the hashed static build change"""
+    try:
+        derivatives = str(os.path.getmtime(manifest_path()))
+    except OSError:
+        derivatives = ''
+    return f"{derivatives}:{getattr(staticfiles_storage, 'manifest_hash', '')}"
+
+
+class LessonHTML:
+    """Cache of rendered (sanitized + image-rewritten) lesson HTML"""
+
+    cache = NamespacedCache('lesson_html', FRAGMENTS, timeout=60 * 60 * 24)
+
+    @classmethod
+    def cache_key_parts(cls, part_id, description_hash):
+        version = hashlib.md5(f'{RENDER_VERSION}:{static_version()}'.encode()).hexdigest()[:12]
+        return (part_id, description_hash[:16], version)
+
+    @staticmethod
+    def render(part_id):
+        from .models import Part  # models imports this module for Part.save()
+        stored = Part.objects.filter(id=part_id).values_list('rendered_description', flat=True).first()
+        return rewrite_images(stored or '')
+
+    @classmethod
+    def get(cls, part_id, description_hash):
+        """Lesson HTML for a part; the stored column is only read on a cache miss"""
+        if not description_hash:
+            return mark_safe('')
+        html = cls.cache.get_or_set(
+            cls.cache_key_parts(part_id, description_hash), lambda: cls.render(part_id)
+        )
+        return mark_safe(html)
+
+    @classmethod
+    def warm(cls, rows):
+        """
+        Fill the cache from (part_id, description_hash, rendered_description)
+        rows already loaded by the caller
+        Returns (lessons, lessons that were not cached yet)
+        """
+        count = built = 0
+        for part_id, description_hash, rendered in rows:
+            if description_hash:
+                key_parts = cls.cache_key_parts(part_id, description_hash)
+                built += not cls.cache.contains(key_parts)
+                cls.cache.get_or_set(key_parts, lambda rendered=rendered: rewrite_images(rendered))
+                count += 1
+        return count, built
+
+    @classmethod
+    def for_part(cls, part):
+        """Lesson HTML for a Part instance loaded with at least id and description_hash"""
+        if part is None:
+            return mark_safe('')
+        return cls.get(part.id, part.description_hash)
@@ -0,0 +1,98 @@
+"""
+Management command to rebuild the per-question and per-part quiz statistics
+Usage: python manage.py aggregate_quiz_stats [--course UK] [--chunk-size 2000] [--top 15] [--dry-run]
+Streams every QuizResults row once (see counselor.quiz_stats), stores the
+result in QuestionStatistic / PartStatistic and prints the most failed
+questions and the per-part pass rates. Meant to run nightly from cron.
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from counselor.models import CounselorCourse, Part, Question
+from counselor.quiz_stats import DEFAULT_CHUNK_SIZE, QuizStatistics
+
+
+class Command(BaseCommand):
+    help = 'Aggregates QuizResults into per-question and per-part statistics'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--course', action='append', dest='courses',
+            help='Course title to aggregate (repeatable); default: all courses'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+            help='QuizResults rows fetched per database round trip'
+        )
+        parser.add_argument('--top', type=int, default=15, help='Most failed questions to print')
+        parser.add_argument('--dry-run', action='store_true', help='Print the report without storing it')
+
+    def handle(self, *args, **options):
+        course_ids = None
+        if options['courses']:
+            courses = dict(
+                CounselorCourse.objects.filter(title__in=options['courses']).values_list('title', 'id')
+            )
+            for title in set(options['courses']) - set(courses):
+                self.stdout.write(self.style.WARNING(f'⊘ Course "{title}" not found'))
+            if not courses:
+                return
+            course_ids = list(courses.values())
+
+        start = time.perf_counter()
+        stats = QuizStatistics().collect(course_ids, options['chunk_size'])
+        elapsed = time.perf_counter() - start
+        self.stdout.write(
+            f'Read {stats.rows} results with {stats.entries} score entries in {elapsed:.2f}s '
+            f'({len(stats.questions)} questions, {len(stats.parts)} parts)'
+        )
+
+        self.print_questions(stats, options['top'])
+        self.print_parts(stats)
+
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING('⊘ Dry run, report not stored'))
+            return
+        stats.save(course_ids)
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ Stored {len(stats.questions)} question and {len(stats.parts)} part statistics'
+        ))
+
+    def print_questions(self, stats, top):
+        answered = stats.questions.counters['answered']
+        correct = stats.questions.counters['correct']
+        slots = sorted(
+            (slot for slot in range(len(stats.questions)) if answered[slot]),
+            key=lambda slot: (correct[slot] / answered[slot], -answered[slot])
+        )[:top]
+        if not slots:
+            return
+        texts = Question.objects.in_bulk([stats.questions.ids[slot] for slot in slots])
+        self.stdout.write('\nMost failed questions')
+        self.stdout.write(f"{'question':>9}  {'part':>6}  {'answered':>8}  {'correct':>7}  text")
+        for slot in slots:
+            question_id = stats.questions.ids[slot]
+            question = texts.get(question_id)
+            text = question.question_text[:60] if question else '(deleted)'
+            self.stdout.write(
+                f'{question_id:>9}  {stats.question_parents[slot][1] or "":>6}  {answered[slot]:>8}  '
+                f'{correct[slot] / answered[slot]:>7.0%}  {text}'
+            )
+
+    def print_parts(self, stats):
+        if not len(stats.parts):
+            return
+        counters = stats.parts.counters
+        titles = dict(Part.objects.filter(id__in=list(stats.parts.ids)).values_list('id', 'title'))
+        self.stdout.write('\nPass rate per part')
+        self.stdout.write(
+            f"{'part':>6}  {'learners':>8}  {'passed':>6}  {'failed 1x':>9}  {'locked':>6}  {'failed 3x':>9}  title"
+        )
+        for slot in sorted(range(len(stats.parts)), key=lambda slot: stats.parts.ids[slot]):
+            learners = counters['learners'][slot]
+            rate = f"{counters['passed'][slot] / learners:.0%}" if learners else '-'
+            self.stdout.write(
+                f'{stats.parts.ids[slot]:>6}  {learners:>8}  {rate:>6}  {counters["failed_once"][slot]:>9}  '
+                f'{counters["locked"][slot]:>6}  {counters["failed_thrice"][slot]:>9}  '
+                f'{titles.get(stats.parts.ids[slot], "(deleted)")[:50]}'
+            )
@@ -0,0 +1,114 @@
+"""
+Management command to build responsive WebP/resized variants of the slide images
+Usage: python manage.py build_image_derivatives [--source topteenfrontend/assets/images]
+                                                [--workers 4] [--force]
+Unchanged images (same content hash and widths) are skipped; run it before
+collectstatic whenever slides are added or replaced.
+"""
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from counselor import image_derivatives
+
+
+class Command(BaseCommand):
+    help = 'Builds resized and WebP derivatives of course images plus their manifest'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--source', default='topteenfrontend/assets/images',
+            help='Directory under static/ to scan'
+        )
+        parser.add_argument(
+            '--widths', type=int, nargs='+', default=list(image_derivatives.DERIVATIVE_WIDTHS),
+            help='Target widths in pixels'
+        )
+        parser.add_argument('--workers', type=int, default=os.cpu_count(), help='Worker processes')
+        parser.add_argument(
+            '--exclude', nargs='*', default=list(getattr(settings, 'STATICFILES_EXCLUDE_DIRS', [])),
+            help='Directory names to skip (defaults to STATICFILES_EXCLUDE_DIRS)'
+        )
+        parser.add_argument('--force', action='store_true', help='Rebuild even unchanged images')
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        static_dir = image_derivatives.static_root_dir()
+        widths = sorted(set(options['widths']))
+        manifest = image_derivatives.read_manifest()
+        images = manifest.get('images', {})
+        if manifest.get('widths') != widths:
+            options['force'] = True
+
+        # Hash every source; only new or changed files go to the pool
+        sources = {}
+        for relative_path in self.find_sources(static_dir, options['source'], set(options['exclude'])):
+            sources[relative_path] = image_derivatives.file_hash(os.path.join(static_dir, relative_path))
+        pending = [
+            path for path, digest in sources.items()
+            if options['force'] or images.get(path, {}).get('hash') != digest
+        ]
+
+        # Forget (and delete) derivatives of images that no longer exist under the source dir
+        source_prefix = options['source'].strip('/') + '/'
+        removed = [
+            path for path in images
+            if path.startswith(source_prefix) and path not in sources
+        ]
+        for path in removed:
+            image_derivatives.remove_derivatives(static_dir, images.pop(path))
+
+        # Changed images drop their old variants (names differ when widths change)
+        for path in pending:
+            if path in images:
+                image_derivatives.remove_derivatives(static_dir, images.pop(path))
+
+        failed = 0
+        if pending:
+            with ProcessPoolExecutor(max_workers=options['workers']) as pool:
+                futures = {
+                    pool.submit(image_derivatives.build_derivatives, static_dir, path, widths): path
+                    for path in pending
+                }
+                for future in as_completed(futures):
+                    path = futures[future]
+                    try:
+                        _, entry = future.result()
+                    except Exception as e:
+                        failed += 1
+                        self.stdout.write(self.style.ERROR(f'✗ {path}: {str(e)}'))
+                        continue
+                    entry['hash'] = sources[path]
+                    images[path] = entry
+
+        manifest = {'widths': widths, 'images': images}
+        image_derivatives.write_manifest(manifest)
+
+        source_bytes = sum(os.path.getsize(os.path.join(static_dir, path)) for path in sources)
+        webp_bytes = sum(
+            os.path.getsize(os.path.join(static_dir, name))
+            for path in sources if path in images
+            for name in images[path]['webp'].values()
+            if os.path.exists(os.path.join(static_dir, name))
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ {len(sources)} images: {len(pending) - failed} built, '
+            f'{len(sources) - len(pending)} unchanged, {len(removed)} removed '
+            f'in {time.perf_counter() - start:.1f}s'
+        ))
+        self.stdout.write(
+            f'  originals {source_bytes / 1024 / 1024:.1f} MB, '
+            f'all WebP variants {webp_bytes / 1024 / 1024:.1f} MB'
+        )
+        if failed:
+            self.stdout.write(self.style.WARNING(f'⊘ {failed} images failed'))
+
+    @staticmethod
+    def find_sources(static_dir, source, exclude):
+        for root, dirs, files in os.walk(os.path.join(static_dir, source)):
+            dirs[:] = sorted(d for d in dirs if d not in exclude)
+            for name in sorted(files):
+                if name.lower().endswith(image_derivatives.SOURCE_EXTENSIONS):
+                    yield os.path.relpath(os.path.join(root, name), static_dir).replace(os.sep, '/')
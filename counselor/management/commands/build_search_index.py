@@ -0,0 +1,49 @@
+"""
+Management command to (re)build the full-text search index of course content
+Usage: python manage.py build_search_index [--course UK] [--query "visa financial requirements"]
+Indexes every part, overview point and quiz question (see counselor.search)
+into SEARCH_INDEX_PATH. Saves keep the index current afterwards; run it after
+deploying to a new host or when content was changed on another host.
+--query prints the top matches once the index is built.
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from counselor.models import CounselorCourse
+from counselor.search import SearchIndex
+
+
+class Command(BaseCommand):
+    help = 'Builds the full-text search index of course content'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--course', action='append', dest='courses',
+            help='Only reindex this course (repeatable); default: rebuild everything'
+        )
+        parser.add_argument('--query', help='Search the index afterwards')
+
+    def handle(self, *args, **options):
+        if not SearchIndex.enabled():
+            raise CommandError('SEARCH_INDEX_PATH is not set')
+
+        start = time.perf_counter()
+        if options['courses']:
+            courses = dict(
+                CounselorCourse.objects.filter(title__in=options['courses']).values_list('title', 'id')
+            )
+            for title in set(options['courses']) - set(courses):
+                self.stdout.write(self.style.WARNING(f'⊘ Course "{title}" not found'))
+            count = SearchIndex.reindex_courses(courses.values()) if courses else 0
+        else:
+            count = SearchIndex.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ Indexed {count} documents into {SearchIndex.path()} in {time.perf_counter() - start:.2f}s'
+        ))
+
+        if options['query']:
+            start = time.perf_counter()
+            results = SearchIndex.search(options['query'], limit=10)
+            self.stdout.write(f'{len(results)} matches in {(time.perf_counter() - start) * 1000:.1f} ms')
+            for result in results:
+                self.stdout.write(f'  [{result["kind"]} {result["id"]}] {result["title"]}: {result["snippet"]}')
@@ -2,6 +2,7 @@
 Management command to create dummy users for testing
 Usage: python manage.py create_dummy_users
 """
+from django.contrib.auth.hashers import make_password
 from django.core.management.base import BaseCommand
 from counselor.models import CounselorUser
 
@@ -43,7 +44,7 @@ class Command(BaseCommand):
                     email=user_data['email'],
                     defaults={
                         'username': user_data['username'],
-                        'password': user_data['password']
+                        'password': make_password(user_data['password'])
                     }
                 )
                 if created:
@@ -0,0 +1,45 @@
+"""
+Management command to export course content as a JSON or YAML document
+Usage: python manage.py export_course UK [UK2 ...] [--output uk.yaml] [--format yaml]
+The document holds the whole tree of each course (summaries, chapters,
+overview points, parts, quizzes, questions, answers) with row ids, so it can
+be edited and re-imported with import_course. The format follows the
+--output extension unless given; without --output it is written to stdout.
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from counselor.course_io import FORMATS, CourseDocumentError, CourseExport, document_format
+from counselor.models import CounselorCourse
+
+
+class Command(BaseCommand):
+    help = 'Exports the content tree of courses as a JSON or YAML document'
+
+    def add_arguments(self, parser):
+        parser.add_argument('courses', nargs='+', help='Course titles to export')
+        parser.add_argument('--format', choices=FORMATS, help='Document format (default: from --output, else json)')
+        parser.add_argument('--output', help='File to write (default: stdout)')
+
+    def handle(self, *args, **options):
+        courses = {course.title: course for course in CounselorCourse.objects.filter(title__in=options['courses'])}
+        missing = set(options['courses']) - set(courses)
+        if missing:
+            raise CommandError(f'Course not found: {", ".join(sorted(missing))}')
+
+        fmt = options['format'] or document_format(options['output'])
+        start = time.perf_counter()
+        try:
+            document = CourseExport.document([courses[title] for title in options['courses']])
+            text = CourseExport.dumps(document, fmt)
+        except CourseDocumentError as exc:
+            raise CommandError(str(exc))
+
+        if not options['output']:
+            self.stdout.write(text)
+            return
+        with open(options['output'], 'w', encoding='utf-8') as output:
+            output.write(text)
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ Exported {len(courses)} course(s) to {options["output"]} in {time.perf_counter() - start:.2f}s'
+        ))
@@ -0,0 +1,44 @@
+"""
+Management command to flush queued part completions into CourseContentProgress
+Usage: python manage.py flush_progress_queue [--batch-size 500] [--interval 2]
+Without --interval the queue is drained once (e.g. from cron); with it the
+command keeps running as the write-behind worker.
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from counselor.progress_queue import ProgressQueue
+
+
+class Command(BaseCommand):
+    help = 'Flushes write-behind part completions into CourseContentProgress'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=ProgressQueue.BATCH_SIZE,
+            help='Queue rows upserted per transaction'
+        )
+        parser.add_argument(
+            '--interval', type=float, default=0,
+            help='Seconds to sleep between drains; 0 drains once and exits'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        interval = options['interval']
+
+        while True:
+            start = time.perf_counter()
+            flushed = ProgressQueue.drain(batch_size)
+            if flushed or not interval:
+                self.stdout.write(
+                    self.style.SUCCESS(
+                        f'✓ Flushed {flushed} queued completions in {time.perf_counter() - start:.2f}s'
+                    )
+                )
+            if not interval:
+                return
+            try:
+                time.sleep(interval)
+            except KeyboardInterrupt:
+                return
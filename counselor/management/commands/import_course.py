@@ -0,0 +1,58 @@
+"""
+Management command to import course content from a JSON or YAML document
+Usage: python manage.py import_course uk.yaml [--title "UK 2025"] [--prune] [--dry-run]
+Courses are matched by title (created when missing; --title imports a
+single-course document under another title). Rows are matched by id within
+the course: only changed rows are updated and rows without a known id are
+created. Rows of the course the document no longer has are kept unless
+--prune is given; pruning a part also deletes learner progress on it.
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from counselor.course_io import FORMATS, LEVELS, CourseDocumentError, document_format, import_course_text
+
+
+class Command(BaseCommand):
+    help = 'Imports course content from a JSON or YAML document, writing only what changed'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Document to import')
+        parser.add_argument('--format', choices=FORMATS, help='Document format (default: from the file extension)')
+        parser.add_argument('--title', help='Import a single-course document under this course title')
+        parser.add_argument('--prune', action='store_true', help='Delete course rows missing from the document')
+        parser.add_argument('--dry-run', action='store_true', help='Report the changes without keeping them')
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['path'], encoding='utf-8') as source:
+                text = source.read()
+        except OSError as exc:
+            raise CommandError(str(exc))
+
+        start = time.perf_counter()
+        try:
+            courses, counts = import_course_text(
+                text, options['format'] or document_format(options['path']),
+                title=options['title'], prune=options['prune'], dry_run=options['dry_run']
+            )
+        except CourseDocumentError as exc:
+            raise CommandError(str(exc))
+        elapsed = time.perf_counter() - start
+
+        for level in LEVELS:
+            count = counts[level.key]
+            self.stdout.write(
+                f'  {level.key:<10} {count["created"]:>6} created {count["updated"]:>6} updated '
+                f'{count["unchanged"]:>6} unchanged {count["deleted"]:>6} deleted'
+            )
+            if count['stale']:
+                self.stdout.write(self.style.WARNING(
+                    f'⊘ {count["stale"]} {level.key} not in the document were kept (--prune deletes them)'
+                ))
+
+        titles = ', '.join(course.title for course in courses)
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING(f'⊘ Dry run, nothing written ({titles})'))
+            return
+        self.stdout.write(self.style.SUCCESS(f'✓ Imported {titles} in {elapsed:.2f}s'))
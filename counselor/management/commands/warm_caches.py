@@ -0,0 +1,65 @@
+"""
+Management command to warm the course caches after a deploy
+Usage: python manage.py warm_caches [--courses UK Germany] [--workers 4] [--skip-lessons] [--skip-quizzes]
+Loads every course tree, its rendered lessons and its question banks
+(quiz questions and answer keys) in parallel and reports
+how long each course took. With the Redis cache backend the warm entries
+are shared by all workers; LocMem caches are per process, so use
+WARM_CACHES_ON_STARTUP to warm those inside each worker instead.
+"""
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from counselor import cache_warmup
+
+
+class Command(BaseCommand):
+    help = 'Preloads course trees, rendered lesson HTML and quiz question banks for every course'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--courses', nargs='+', help='Course titles to warm (default: all)')
+        parser.add_argument(
+            '--workers', type=int, default=cache_warmup.DEFAULT_WORKERS,
+            help='Courses warmed in parallel'
+        )
+        parser.add_argument('--skip-lessons', action='store_true', help='Do not warm the rendered lessons')
+        parser.add_argument('--skip-quizzes', action='store_true', help='Do not warm the quiz question banks')
+
+    def handle(self, *args, **options):
+        if getattr(settings, 'CACHE_BACKEND', 'locmem') == 'locmem':
+            self.stdout.write(self.style.WARNING(
+                '⊘ CACHE_BACKEND is locmem: this only warms the caches of this command\'s process'
+            ))
+
+        start = time.perf_counter()
+        results = cache_warmup.warm_caches(
+            options['courses'], options['workers'],
+            lessons=not options['skip_lessons'], quizzes=not options['skip_quizzes']
+        )
+        elapsed = time.perf_counter() - start
+
+        for result in results:
+            if not result['found']:
+                self.stdout.write(f"  {result['course']:<16} not found")
+                continue
+            self.stdout.write(
+                f"  {result['course']:<16} tree {result['tree_ms']:>8.1f} ms   "
+                f"{result['parts']:>4} lessons {result['lessons_ms']:>8.1f} ms   "
+                f"{result['quizzes']:>4} quizzes {result['quizzes_ms']:>8.1f} ms   "
+                f"total {result['tree_ms'] + result['lessons_ms'] + result['quizzes_ms']:>8.1f} ms"
+            )
+
+        missing = [result['course'] for result in results if not result['found']]
+        found = [result for result in results if result['found']]
+        counts = [
+            ('course trees', len(found), sum(result['built']['trees'] for result in found)),
+            ('lessons', sum(result['parts'] for result in found), sum(result['built']['lessons'] for result in found)),
+            ('question banks', sum(result['quizzes'] for result in found),
+             sum(result['built']['quizzes'] for result in found)),
+        ]
+        self.stdout.write(self.style.SUCCESS(f'✓ Warmed {len(found)} courses in {elapsed:.2f}s'))
+        for label, total, built in counts:
+            self.stdout.write(f'  {label:<16} {built:>6} built   {total - built:>6} already cached')
+        if missing:
+            self.stdout.write(self.style.WARNING(f'⊘ Not found: {", ".join(missing)}'))
@@ -0,0 +1,42 @@
+# Generated by Django 5.1.5 on 2026-10-19 16:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def remove_duplicate_progress(apps, schema_editor):
+    """Keep one CourseContentProgress row per (user, part) before adding the unique constraint"""
+    CourseContentProgress = apps.get_model('counselor', 'CourseContentProgress')
+    duplicates = (
+        CourseContentProgress.objects.values('user', 'part_id')
+        .annotate(keep_id=models.Max('id'), rows=models.Count('id'))
+        .filter(rows__gt=1)
+    )
+    for row in duplicates:
+        CourseContentProgress.objects.filter(
+            user=row['user'], part_id=row['part_id']
+        ).exclude(id=row['keep_id']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('counselor', '0016_alter_counselorcertification_unique_together'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_progress, migrations.RunPython.noop),
+        migrations.AlterUniqueTogether(
+            name='coursecontentprogress',
+            unique_together={('user', 'part_id')},
+        ),
+        migrations.CreateModel(
+            name='PendingPartCompletion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('part', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='counselor.part')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='counselor.counseloruser')),
+            ],
+        ),
+    ]
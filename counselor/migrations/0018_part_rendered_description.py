@@ -0,0 +1,110 @@
+# Generated by Django 5.1.5 on 2026-10-19 17:06
+
+import hashlib
+from html import escape
+from html.parser import HTMLParser
+
+from django.db import migrations, models
+
+# Frozen copy of counselor.lesson_html as of this migration, so the backfill
+# does not change (or break) when the live sanitizer does
+
+DROPPED_TAGS = {'script', 'noscript', 'object', 'embed', 'applet', 'base', 'meta', 'link'}
+URL_ATTRIBUTES = {'href', 'src', 'action', 'formaction', 'xlink:href', 'poster', 'background'}
+UNSAFE_SCHEMES = ('javascript:', 'vbscript:', 'data:text/html')
+
+
+class LessonSanitizer(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=False)
+        self.output = []
+        self.dropped_depth = 0
+
+    @staticmethod
+    def is_safe_attribute(name, value):
+        if name.startswith('on') or name == 'srcdoc':
+            return False
+        if name in URL_ATTRIBUTES and value:
+            compact = ''.join(ch for ch in value if ch > ' ').lower()
+            return not compact.startswith(UNSAFE_SCHEMES)
+        return True
+
+    def render_tag(self, tag, attrs, self_closing=False):
+        parts = [tag]
+        for name, value in attrs:
+            if not self.is_safe_attribute(name, value):
+                continue
+            parts.append(name if value is None else f'{name}="{escape(value, quote=True)}"')
+        return f'<{" ".join(parts)}{" /" if self_closing else ""}>'
+
+    def handle_starttag(self, tag, attrs):
+        if tag in DROPPED_TAGS:
+            self.dropped_depth += 1
+        elif not self.dropped_depth:
+            self.output.append(self.render_tag(tag, attrs))
+
+    def handle_startendtag(self, tag, attrs):
+        if tag not in DROPPED_TAGS and not self.dropped_depth:
+            self.output.append(self.render_tag(tag, attrs, self_closing=True))
+
+    def handle_endtag(self, tag):
+        if tag in DROPPED_TAGS:
+            self.dropped_depth = max(0, self.dropped_depth - 1)
+        elif not self.dropped_depth:
+            self.output.append(f'</{tag}>')
+
+    def handle_data(self, data):
+        if not self.dropped_depth:
+            self.output.append(escape(data, quote=False))
+
+    def handle_entityref(self, name):
+        if not self.dropped_depth:
+            self.output.append(f'&{name};')
+
+    def handle_charref(self, name):
+        if not self.dropped_depth:
+            self.output.append(f'&#{name};')
+
+
+def sanitize_html(html):
+    if not html:
+        return ''
+    sanitizer = LessonSanitizer()
+    sanitizer.feed(html)
+    sanitizer.close()
+    return ''.join(sanitizer.output)
+
+
+def content_hash(html):
+    return hashlib.sha256(html.encode('utf-8')).hexdigest() if html else ''
+
+
+def render_descriptions(apps, schema_editor):
+    """Pre-render the sanitized description of every existing part"""
+    Part = apps.get_model('counselor', 'Part')
+    parts = list(Part.objects.only('id', 'description'))
+    for part in parts:
+        part.rendered_description = sanitize_html(part.description)
+        part.description_hash = content_hash(part.description)
+    Part.objects.bulk_update(parts, ['rendered_description', 'description_hash'], batch_size=200)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('counselor', '0017_pendingpartcompletion_coursecontentprogress_unique'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='part',
+            name='description_hash',
+            field=models.CharField(blank=True, default='', editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='part',
+            name='rendered_description',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.RunPython(render_descriptions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.1.5 on 2026-10-19 17:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('counselor', '0018_part_rendered_description'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LearnerEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event', models.PositiveSmallIntegerField(choices=[(1, 'part_viewed'), (2, 'part_completed'), (3, 'quiz_submitted'), (4, 'attempt_locked'), (5, 'certificate_issued')])),
+                ('user_id', models.IntegerField()),
+                ('course_id', models.IntegerField(blank=True, null=True)),
+                ('part_id', models.IntegerField(blank=True, null=True)),
+                ('value', models.SmallIntegerField(blank=True, null=True)),
+                ('created_at', models.DateTimeField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['course_id', 'event', 'created_at'], name='counselor_l_course__7a027c_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.1.5 on 2026-10-19 17:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('counselor', '0019_learnerevent'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PartStatistic',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('part_id', models.IntegerField(unique=True)),
+                ('course_id', models.IntegerField(blank=True, null=True)),
+                ('learners', models.PositiveIntegerField(default=0)),
+                ('passed', models.PositiveIntegerField(default=0)),
+                ('failed_once', models.PositiveIntegerField(default=0)),
+                ('locked', models.PositiveIntegerField(default=0)),
+                ('failed_thrice', models.PositiveIntegerField(default=0)),
+                ('computed_at', models.DateTimeField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='QuestionStatistic',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('question_id', models.IntegerField(unique=True)),
+                ('quiz_id', models.IntegerField(blank=True, null=True)),
+                ('part_id', models.IntegerField(blank=True, null=True)),
+                ('course_id', models.IntegerField(blank=True, null=True)),
+                ('answered', models.PositiveIntegerField(default=0)),
+                ('correct', models.PositiveIntegerField(default=0)),
+                ('computed_at', models.DateTimeField()),
+            ],
+        ),
+    ]
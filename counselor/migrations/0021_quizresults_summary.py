@@ -0,0 +1,62 @@
+# Generated by Django 5.1.5 on 2026-10-19 17:45
+
+from django.db import migrations, models
+
+# Frozen copies of QuizResults.PASS_PERCENT and counselor.models.summarize_scores
+# as of this migration
+PASS_PERCENT = 60
+
+
+def summarize_scores(scores, pass_percent):
+    percents = []
+    passed = {}
+    for score in scores if isinstance(scores, list) else []:
+        try:
+            total = score['total_questions_in_quiz']
+            percent = int(score['quiz_result']['correct_answers'] / total * 100) if total else 0
+        except (KeyError, TypeError):
+            continue
+        percents.append(percent)
+        passed.setdefault(score.get('part_id'), percent >= pass_percent)
+    return len(passed), sum(passed.values()), sum(percents) // len(percents) if percents else None
+
+
+def summarize_existing_scores(apps, schema_editor):
+    """Fill the score summary of every existing QuizResults row"""
+    QuizResults = apps.get_model('counselor', 'QuizResults')
+    batch = []
+    for result in QuizResults.objects.only('id', 'scores').iterator(chunk_size=500):
+        result.quizzes_taken, result.quizzes_passed, result.average_percent = summarize_scores(
+            result.scores, PASS_PERCENT
+        )
+        batch.append(result)
+        if len(batch) == 500:
+            QuizResults.objects.bulk_update(batch, ['quizzes_taken', 'quizzes_passed', 'average_percent'])
+            batch = []
+    QuizResults.objects.bulk_update(batch, ['quizzes_taken', 'quizzes_passed', 'average_percent'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('counselor', '0020_quiz_statistics'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quizresults',
+            name='average_percent',
+            field=models.PositiveSmallIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='quizresults',
+            name='quizzes_passed',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='quizresults',
+            name='quizzes_taken',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(summarize_existing_scores, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.5 on 2026-10-19 18:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('counselor', '0021_quizresults_summary'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='learnerevent',
+            name='event',
+            field=models.PositiveSmallIntegerField(choices=[(1, 'part_viewed'), (2, 'part_completed'), (3, 'quiz_submitted'), (4, 'attempt_locked'), (5, 'certificate_issued'), (6, 'quiz_failed')]),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.1.5 on 2026-10-19 18:40
+
+import re
+
+from django.db import migrations
+
+# Stored descriptions had their <style> contents HTML-escaped, which is
+# exactly reversible: escape() only rewrote &, < and >, and the parser passes
+# raw text through without decoding entities
+STYLE_CONTENT = re.compile(r'(<style\b[^>]*>)([^<]*)(</style>)')
+
+
+def unescape_style(match):
+    css = match.group(2).replace('&lt;', '<').replace('&gt;', '>').replace('&amp;', '&')
+    return f'{match.group(1)}{css}{match.group(3)}'
+
+
+def unescape_stored_styles(apps, schema_editor):
+    """Undo the escaping of <style> contents in pre-rendered descriptions"""
+    Part = apps.get_model('counselor', 'Part')
+    parts = list(Part.objects.filter(rendered_description__contains='<style').only('id', 'rendered_description'))
+    for part in parts:
+        part.rendered_description = STYLE_CONTENT.sub(unescape_style, part.rendered_description)
+    Part.objects.bulk_update(parts, ['rendered_description'], batch_size=200)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('counselor', '0022_learnerevent_quiz_failed'),
+    ]
+
+    operations = [
+        migrations.RunPython(unescape_stored_styles, migrations.RunPython.noop),
+    ]
@@ -6,6 +6,8 @@ from django.db import models
 from django.conf import settings
 from django.utils.timezone import localtime
 
+from .lesson_html import prepare_part
+
 
 
 # from core import choices
@@ -47,12 +49,22 @@ class Part(models.Model):
     title = models.CharField(max_length=100)
     description = models.TextField(blank=True, null=True)
     index =models.IntegerField(default=0)
+    # Sanitized description and its content hash, kept in sync by save()
+    rendered_description = models.TextField(blank=True, default='', editable=False)
+    description_hash = models.CharField(max_length=64, blank=True, default='', editable=False)
     class Meta:
         verbose_name_plural = "Course Parts"
 
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        prepare_part(self)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'description' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'rendered_description', 'description_hash'}
+        super().save(*args, **kwargs)
+
 class Quiz(models.Model):
     title = models.CharField(max_length=200, blank=True, null=True)
     quiz_part = models.ForeignKey(Part, related_name='quizzes', on_delete=models.CASCADE,blank=True, null=True)
@@ -84,27 +96,151 @@ class QuizAnswers(models.Model):
     def __str__(self):
         return f"Answer {self.id} for Question {self.question.id}"
 
+def score_percent(score):
+    """Percent correct of one QuizResults.scores entry (KeyError/TypeError when malformed)"""
+    total = score['total_questions_in_quiz']
+    return int(score['quiz_result']['correct_answers'] / total * 100) if total else 0
+
+def summarize_scores(scores, pass_percent):
+    """
+    (parts taken, parts passed, average percent) of a QuizResults.scores list
+    A part is passed when the first of its quiz entries is, the rule of
+    QuizSubmissionService.has_passed and the quiz statistics report
+    """
+    percents = []
+    passed = {}
+    for score in scores if isinstance(scores, list) else []:
+        try:
+            percent = score_percent(score)
+        except (KeyError, TypeError):
+            continue
+        percents.append(percent)
+        passed.setdefault(score.get('part_id'), percent >= pass_percent)
+    return len(passed), sum(passed.values()), sum(percents) // len(percents) if percents else None
+
 class QuizResults(models.Model):
+    PASS_PERCENT = 60
+
     user = models.ForeignKey(CounselorUser, on_delete=models.CASCADE, blank=True, null=True
     )
     course=models.ForeignKey(CounselorCourse, on_delete=models.CASCADE, blank=True, null=True)
     scores = models.JSONField(default=dict)
     modified = models.DateTimeField(auto_now=True)
+    # Summary of scores, kept in sync by save() so lists never load the JSON;
+    # "quizzes" are counted per part (see summarize_scores)
+    quizzes_taken = models.PositiveSmallIntegerField(default=0, editable=False)
+    quizzes_passed = models.PositiveSmallIntegerField(default=0, editable=False)
+    average_percent = models.PositiveSmallIntegerField(null=True, blank=True, editable=False)
 
     def __str__(self):
         user_info = self.user.username if self.user else "Anonymous User"
         modified_time = localtime(self.modified).strftime("%Y-%m-%d %H:%M:%S")
         return f"Scores for {user_info} | Last Modified: {modified_time}"
 
+    def save(self, *args, **kwargs):
+        self.quizzes_taken, self.quizzes_passed, self.average_percent = summarize_scores(
+            self.scores, self.PASS_PERCENT
+        )
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'scores' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'quizzes_taken', 'quizzes_passed', 'average_percent'}
+        super().save(*args, **kwargs)
+
 class CourseContentProgress(models.Model):
     user = models.ForeignKey(
         CounselorUser, on_delete=models.CASCADE, blank=True, null=True
     )
     part_id = models.ForeignKey(Part,on_delete=models.CASCADE, blank=True, null=True)
     completed = models.BooleanField(default=False)
+
+    class Meta:
+        unique_together = ('user', 'part_id')  # Lets completions be upserted in bulk
     
     def __str__(self):
         return f"{self.part_id}: {self.completed}%"
+
+
+class PendingPartCompletion(models.Model):
+    """Write-behind queue of part completions waiting to be flushed into CourseContentProgress"""
+    user = models.ForeignKey(CounselorUser, on_delete=models.CASCADE)
+    part = models.ForeignKey(Part, on_delete=models.CASCADE)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.user_id} - {self.part_id} (queued {self.created_at})"
+
+
+class LearnerEvent(models.Model):
+    """Append-only learner analytics log, written in batches by counselor.analytics"""
+    PART_VIEWED = 1
+    PART_COMPLETED = 2
+    QUIZ_SUBMITTED = 3
+    ATTEMPT_LOCKED = 4
+    CERTIFICATE_ISSUED = 5
+    QUIZ_FAILED = 6
+    EVENT_CHOICES = [
+        (PART_VIEWED, 'part_viewed'),
+        (PART_COMPLETED, 'part_completed'),
+        (QUIZ_SUBMITTED, 'quiz_submitted'),
+        (ATTEMPT_LOCKED, 'attempt_locked'),
+        (CERTIFICATE_ISSUED, 'certificate_issued'),
+        (QUIZ_FAILED, 'quiz_failed'),
+    ]
+
+    event = models.PositiveSmallIntegerField(choices=EVENT_CHOICES)
+    # Plain ids instead of foreign keys: no constraint checks on insert, and the
+    # history outlives deleted users and content
+    user_id = models.IntegerField()
+    course_id = models.IntegerField(null=True, blank=True)
+    part_id = models.IntegerField(null=True, blank=True)
+    # Score percent for quiz_submitted / certificate_issued, attempt number for attempt_locked / quiz_failed
+    value = models.SmallIntegerField(null=True, blank=True)
+    created_at = models.DateTimeField()  # When it happened, not when it was flushed
+
+    class Meta:
+        indexes = [models.Index(fields=['course_id', 'event', 'created_at'])]
+
+    def __str__(self):
+        return f"{self.get_event_display()} user={self.user_id} part={self.part_id} ({self.created_at})"
+
+
+class QuestionStatistic(models.Model):
+    """Answer counts per question, rebuilt by `manage.py aggregate_quiz_stats`"""
+    # Plain ids like LearnerEvent: the report is replaced wholesale on every run
+    question_id = models.IntegerField(unique=True)
+    quiz_id = models.IntegerField(null=True, blank=True)
+    part_id = models.IntegerField(null=True, blank=True)
+    course_id = models.IntegerField(null=True, blank=True)
+    answered = models.PositiveIntegerField(default=0)
+    correct = models.PositiveIntegerField(default=0)
+    computed_at = models.DateTimeField()
+
+    @property
+    def correct_rate(self):
+        return self.correct / self.answered if self.answered else None
+
+    def __str__(self):
+        return f"Question {self.question_id}: {self.correct}/{self.answered} correct"
+
+
+class PartStatistic(models.Model):
+    """Quiz pass rate and attempt distribution per part, rebuilt by `manage.py aggregate_quiz_stats`"""
+    part_id = models.IntegerField(unique=True)
+    course_id = models.IntegerField(null=True, blank=True)
+    learners = models.PositiveIntegerField(default=0)  # Learners with a saved score for the part
+    passed = models.PositiveIntegerField(default=0)
+    # Current UserQuizAttemptTrack.no_of_attempt counts (the track is removed on a pass)
+    failed_once = models.PositiveIntegerField(default=0)
+    locked = models.PositiveIntegerField(default=0)
+    failed_thrice = models.PositiveIntegerField(default=0)
+    computed_at = models.DateTimeField()
+
+    @property
+    def pass_rate(self):
+        return self.passed / self.learners if self.learners else None
+
+    def __str__(self):
+        return f"Part {self.part_id}: {self.passed}/{self.learners} passed"
     
 class CounselorCertification(models.Model):
     user = models.ForeignKey(CounselorUser, on_delete=models.CASCADE, null=True, blank=True)
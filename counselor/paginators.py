@@ -0,0 +1,45 @@
+"""
+Admin changelist paginator for large tables
+COUNT(*) over an unfiltered InnoDB table with millions of rows scans a
+whole index on every changelist page. When nothing narrows the queryset the
+paginator reads the table statistics instead (MySQL information_schema,
+PostgreSQL pg_class) and only counts exactly below
+ADMIN_ESTIMATED_COUNT_THRESHOLD rows, where the estimate is too coarse and
+an exact count is cheap anyway. Filtered querysets are always counted.
+"""
+
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+
+def estimated_row_count(model, using='default'):
+    """Row count from the table statistics, or None when the backend keeps none"""
+    connection = connections[using]
+    table = model._meta.db_table
+    if connection.vendor == 'mysql':
+        sql = 'SELECT TABLE_ROWS FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s'
+    elif connection.vendor == 'postgresql':
+        sql = 'SELECT reltuples::bigint FROM pg_class WHERE relname = %s'
+    else:
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [table])
+        row = cursor.fetchone()
+    # reltuples is -1 for a table that was never analyzed
+    return int(row[0]) if row and row[0] is not None and row[0] >= 0 else None
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator that estimates the count of large unfiltered querysets"""
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        query = getattr(queryset, 'query', None)
+        if query is not None and not query.where and not query.distinct:
+            estimate = estimated_row_count(queryset.model, queryset.db)
+            if estimate is not None and estimate >= getattr(settings, 'ADMIN_ESTIMATED_COUNT_THRESHOLD', 100000):
+                return estimate
+        return super().count
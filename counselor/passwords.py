@@ -0,0 +1,125 @@
+"""
+Password checks for CounselorUser logins and signups
+Hashing runs on a small dedicated thread pool (LOGIN_HASH_WORKERS):
+hashlib's PBKDF2 releases the GIL, so the pool caps how many cores a burst of
+logins can occupy and lesson requests on the same worker keep being served.
+At most LOGIN_HASH_QUEUE hashes wait for a thread; beyond that, and for
+logins not served within LOGIN_HASH_TIMEOUT, LoginBusy is raised at once
+instead of letting requests pile up. A hash whose login gave up is dropped
+if it has not started (a running one cannot be interrupted).
+Rows still holding a plaintext password (from before hashing) are verified
+once in constant time and replaced by a hash.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+from django.conf import settings
+from django.contrib.auth.hashers import (
+    check_password, get_hasher, identify_hasher, make_password
+)
+from django.utils.crypto import constant_time_compare
+
+
+class LoginBusy(Exception):
+    """No password hashing capacity left; the client should retry shortly"""
+
+
+class PasswordService:
+    """Hash and verify CounselorUser passwords on the bounded hashing pool"""
+
+    _executor = None
+    # Running plus queued hashes: LOGIN_HASH_WORKERS + LOGIN_HASH_QUEUE
+    _slots = None
+    _executor_lock = threading.Lock()
+
+    @classmethod
+    def executor(cls):
+        if cls._executor is None:
+            with cls._executor_lock:
+                if cls._executor is None:
+                    workers = max(1, getattr(settings, 'LOGIN_HASH_WORKERS', 2))
+                    cls._slots = threading.BoundedSemaphore(workers + max(0, getattr(settings, 'LOGIN_HASH_QUEUE', 8)))
+                    cls._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-hash')
+        return cls._executor
+
+    @classmethod
+    def reset_executor(cls):
+        """Drop the pool (e.g. after changing LOGIN_HASH_WORKERS)"""
+        with cls._executor_lock:
+            if cls._executor is not None:
+                cls._executor.shutdown(wait=True)
+            cls._executor = None
+            cls._slots = None
+
+    @classmethod
+    def _run(cls, func, *args):
+        executor = cls.executor()
+        slots = cls._slots
+        if not slots.acquire(blocking=False):
+            raise LoginBusy()
+        abandoned = threading.Event()
+
+        def task():
+            # cancel() cannot stop a hash a thread already picked up
+            if abandoned.is_set():
+                return None
+            return func(*args)
+
+        try:
+            future = executor.submit(task)
+        except BaseException:
+            slots.release()
+            raise
+        # Runs once the hash is done or cancelled, in either case freeing its slot
+        future.add_done_callback(lambda _: slots.release())
+        try:
+            return future.result(timeout=getattr(settings, 'LOGIN_HASH_TIMEOUT', 5))
+        except TimeoutError:
+            abandoned.set()
+            future.cancel()
+            raise LoginBusy()
+
+    @staticmethod
+    def is_hashed(encoded):
+        try:
+            identify_hasher(encoded)
+        except ValueError:
+            return False
+        return True
+
+    @staticmethod
+    def needs_upgrade(encoded):
+        """Hashed with another algorithm or work factor than the preferred hasher"""
+        preferred = get_hasher('default')
+        return identify_hasher(encoded).algorithm != preferred.algorithm or preferred.must_update(encoded)
+
+    @classmethod
+    def hash(cls, raw_password):
+        return cls._run(make_password, raw_password)
+
+    @classmethod
+    def verify(cls, user, raw_password):
+        """
+        True if raw_password is the user's password
+        Plaintext rows and outdated hashes are re-hashed and saved on success.
+        Raises LoginBusy when the hashing pool is saturated.
+        """
+        if not raw_password or not user.password:
+            return False
+
+        if not cls.is_hashed(user.password):
+            # Legacy plaintext row
+            if not constant_time_compare(raw_password, user.password):
+                return False
+        elif not cls._run(check_password, raw_password, user.password):
+            return False
+        elif not cls.needs_upgrade(user.password):
+            return True
+
+        try:
+            user.password = cls.hash(raw_password)
+        except LoginBusy:
+            return True  # The password is correct; upgrade it on a later login
+        user.save(update_fields=['password'])
+        return True
@@ -0,0 +1,100 @@
+"""
+Write-behind queue for part completion beacons
+With PROGRESS_WRITE_BEHIND enabled, update_part_status only appends a row to
+PendingPartCompletion and acknowledges; `manage.py flush_progress_queue`
+upserts the queued rows into CourseContentProgress in batches. Reads of
+completed parts overlay the pending rows so a learner sees their own
+completions before the flush.
+"""
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from .models import CourseContentProgress, PendingPartCompletion
+
+
+class ProgressQueue:
+    """Durable staging queue in front of CourseContentProgress"""
+
+    BATCH_SIZE = 500
+
+    @staticmethod
+    def enabled():
+        return getattr(settings, 'PROGRESS_WRITE_BEHIND', False)
+
+    @staticmethod
+    def enqueue(user_id, part_id):
+        """Queue a completion; raises IntegrityError for an unknown user or part"""
+        return PendingPartCompletion.objects.create(user_id=user_id, part_id=part_id)
+
+    @staticmethod
+    def enqueue_many(user_id, part_ids):
+        """Queue several completions for one user with a single INSERT"""
+        PendingPartCompletion.objects.bulk_create([
+            PendingPartCompletion(user_id=user_id, part_id=part_id) for part_id in part_ids
+        ])
+
+    @staticmethod
+    def upsert(completions):
+        """Mark (user_id, part_id) pairs complete in CourseContentProgress with one bulk upsert"""
+        upsert = {'update_conflicts': True, 'update_fields': ['completed']}
+        if connection.features.supports_update_conflicts_with_target:
+            upsert['unique_fields'] = ['user', 'part_id']  # MySQL infers the key itself
+        CourseContentProgress.objects.bulk_create(
+            [
+                CourseContentProgress(user_id=user_id, part_id_id=part_id, completed=True)
+                for user_id, part_id in completions
+            ],
+            **upsert
+        )
+
+    @classmethod
+    def record(cls, user_id, part_ids):
+        """Mark parts complete for a user: upserted now, or queued in write-behind mode"""
+        if cls.enabled():
+            cls.enqueue_many(user_id, part_ids)
+        else:
+            cls.upsert({(user_id, part_id) for part_id in part_ids})
+
+    @staticmethod
+    def completed_part_ids(user):
+        """
+        Completed part IDs for the user, including completions still in the queue
+        A single UNION query, so the overlay costs no extra round-trip
+        """
+        return CourseContentProgress.objects.filter(user=user).values_list(
+            'part_id', flat=True
+        ).union(
+            PendingPartCompletion.objects.filter(user=user).values_list('part_id', flat=True)
+        )
+
+    @classmethod
+    def flush(cls, batch_size=None):
+        """
+        Move one batch of queued completions into CourseContentProgress
+        Returns: number of queue rows consumed (0 when the queue is empty)
+        """
+        batch_size = batch_size or cls.BATCH_SIZE
+        with transaction.atomic():
+            pending = PendingPartCompletion.objects.order_by('id')
+            if connection.features.has_select_for_update_skip_locked:
+                # Lets several workers drain the queue without double-processing
+                pending = pending.select_for_update(skip_locked=True)
+            batch = list(pending.values_list('id', 'user_id', 'part_id')[:batch_size])
+            if not batch:
+                return 0
+
+            # One row per (user, part): the same beacon is often sent more than once
+            cls.upsert({(user_id, part_id) for _, user_id, part_id in batch})
+            PendingPartCompletion.objects.filter(id__in=[row[0] for row in batch]).delete()
+        return len(batch)
+
+    @classmethod
+    def drain(cls, batch_size=None):
+        """Flush until the queue is empty; returns the number of queue rows consumed"""
+        total = 0
+        while True:
+            flushed = cls.flush(batch_size)
+            if not flushed:
+                return total
+            total += flushed
@@ -0,0 +1,159 @@
+"""
+Offline quiz statistics (manage.py aggregate_quiz_stats)
+Answers only exist inside each learner's QuizResults.scores JSON
+(correct_option maps keyed ques_<id>), so the report streams every row with
+iterator(chunk_size) and counts into flat array accumulators: one slot per
+question and per part, assigned on first sight. Memory stays proportional to
+the number of questions and parts, not to the number of score entries.
+The result replaces QuestionStatistic / PartStatistic in one transaction.
+"""
+
+from array import array
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import PartStatistic, QuestionStatistic, QuizResults, UserQuizAttemptTrack
+from .views_v2 import QuizSubmissionService
+
+DEFAULT_CHUNK_SIZE = 2000
+
+
+class Slots:
+    """Dense slot numbers for ids, with parallel unsigned counters"""
+
+    def __init__(self, *counters):
+        self.index = {}
+        self.ids = array('q')
+        self.counters = {name: array('Q') for name in counters}
+
+    def slot(self, key):
+        slot = self.index.get(key)
+        if slot is None:
+            slot = self.index[key] = len(self.ids)
+            self.ids.append(key)
+            for values in self.counters.values():
+                values.append(0)
+        return slot
+
+    def __len__(self):
+        return len(self.ids)
+
+
+class QuizStatistics:
+    """Accumulates per-question and per-part counts over QuizResults rows"""
+
+    def __init__(self):
+        self.questions = Slots('answered', 'correct')
+        self.parts = Slots('learners', 'passed', 'failed_once', 'locked', 'failed_thrice')
+        # question slot -> (quiz_id, part_id, course_id); part slot -> course_id (first seen)
+        self.question_parents = {}
+        self.question_keys = {}  # 'ques_<id>' -> slot
+        self.part_course = {}
+        self.rows = 0
+        self.entries = 0
+
+    def question_slot(self, key, quiz_id, part_id, course_id):
+        """Slot for a 'ques_<id>' key, or None when the key is malformed"""
+        try:
+            question_id = int(key[5:])
+        except ValueError:
+            return None
+        slot = self.question_keys[key] = self.questions.slot(question_id)
+        self.question_parents.setdefault(slot, (quiz_id, part_id, course_id))
+        return slot
+
+    def add_scores(self, course_id, scores):
+        """Count one learner's QuizResults.scores for a course"""
+        if not isinstance(scores, list):
+            return  # Default {} or rows saved before scores were a list
+        self.rows += 1
+        # Hot loop: millions of answers, so locals and one dict lookup per answer
+        question_keys = self.question_keys
+        answered = self.questions.counters['answered']
+        correct = self.questions.counters['correct']
+        first_quiz = {}
+        for entry in scores:
+            self.entries += 1
+            part_id = entry.get('part_id')
+            first_quiz.setdefault(part_id, entry)
+            for key, answer in (entry.get('correct_option') or {}).items():
+                slot = question_keys.get(key)
+                if slot is None:
+                    slot = self.question_slot(key, entry.get('quiz_id'), part_id, course_id)
+                    if slot is None:
+                        continue
+                answered[slot] += 1
+                selected = answer.get('selected_ans')
+                if selected is not None and selected == answer.get('correct_ans'):
+                    correct[slot] += 1
+
+        learners = self.parts.counters['learners']
+        passed = self.parts.counters['passed']
+        for part_id, entry in first_quiz.items():
+            if part_id is None:
+                continue
+            slot = self.parts.slot(part_id)
+            self.part_course.setdefault(slot, course_id)
+            learners[slot] += 1
+            try:
+                passed[slot] += QuizSubmissionService.has_passed([entry])
+            except (KeyError, TypeError, ZeroDivisionError):
+                pass
+
+    def add_attempt(self, part_id, course_id, no_of_attempt):
+        counter = {1: 'failed_once', 2: 'locked', 3: 'failed_thrice'}.get(no_of_attempt)
+        if counter is None or part_id is None:
+            return
+        slot = self.parts.slot(part_id)
+        self.part_course.setdefault(slot, course_id)
+        self.parts.counters[counter][slot] += 1
+
+    def collect(self, course_ids=None, chunk_size=DEFAULT_CHUNK_SIZE):
+        """Stream QuizResults and attempt tracks (optionally for some courses only)"""
+        results = QuizResults.objects.values_list('course_id', 'scores')
+        attempts = UserQuizAttemptTrack.objects.values_list('part_id', 'course_id', 'no_of_attempt')
+        if course_ids is not None:
+            results = results.filter(course_id__in=course_ids)
+            attempts = attempts.filter(course_id__in=course_ids)
+        for course_id, scores in results.iterator(chunk_size=chunk_size):
+            self.add_scores(course_id, scores)
+        for part_id, course_id, no_of_attempt in attempts.iterator(chunk_size=chunk_size):
+            self.add_attempt(part_id, course_id, no_of_attempt)
+        return self
+
+    def question_rows(self, computed_at):
+        answered = self.questions.counters['answered']
+        correct = self.questions.counters['correct']
+        for slot, question_id in enumerate(self.questions.ids):
+            quiz_id, part_id, course_id = self.question_parents[slot]
+            yield QuestionStatistic(
+                question_id=question_id, quiz_id=quiz_id, part_id=part_id, course_id=course_id,
+                answered=answered[slot], correct=correct[slot], computed_at=computed_at
+            )
+
+    def part_rows(self, computed_at):
+        counters = self.parts.counters
+        for slot, part_id in enumerate(self.parts.ids):
+            yield PartStatistic(
+                part_id=part_id, course_id=self.part_course.get(slot), computed_at=computed_at,
+                **{name: values[slot] for name, values in counters.items()}
+            )
+
+    def save(self, course_ids=None):
+        """Replace the stored report (for the given courses only, when set)"""
+        computed_at = timezone.now()
+        with transaction.atomic():
+            for model, key, slots in (
+                (QuestionStatistic, 'question_id', self.questions),
+                (PartStatistic, 'part_id', self.parts),
+            ):
+                stale = model.objects.all()
+                if course_ids is not None:
+                    # Also rows filed under another course before content moved
+                    stale = stale.filter(Q(course_id__in=course_ids) | Q(**{f'{key}__in': list(slots.ids)}))
+                stale.delete()
+            QuestionStatistic.objects.bulk_create(self.question_rows(computed_at), batch_size=1000)
+            PartStatistic.objects.bulk_create(self.part_rows(computed_at), batch_size=1000)
+        return computed_at
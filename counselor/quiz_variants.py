@@ -0,0 +1,179 @@
+"""
+Per-learner quiz variants from a shared question bank
+The questions, answers and answer key of a part are cached once for
+everybody (in the course tree namespace, so content changes and bulk
+imports invalidate them together with the tree). Each learner is served a
+variant derived from a seed of (user, quiz): the question order, an
+optional subset of QUIZ_VARIANT_QUESTIONS questions and the answer order.
+The same learner always gets the same variant, so nothing per learner is
+stored, and grading a submission is a lookup in the shared answer key over
+the questions of that learner's variant.
+"""
+
+import hashlib
+import random
+from types import SimpleNamespace
+
+from django.conf import settings
+
+from .course_tree import CourseTree
+from .models import Question, Quiz, QuizAnswers
+
+
+class Rows:
+    """Stand-in for a prefetched related manager in templates (.all, .exists, .count)"""
+
+    def __init__(self, items):
+        self.items = list(items)
+
+    def all(self):
+        return self
+
+    def exists(self):
+        return bool(self.items)
+
+    def count(self):
+        return len(self.items)
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+
+class QuestionBank:
+    """
+    Quizzes of a part as plain data:
+    {'quizzes': [(quiz_id, [question_id, ...])],
+     'questions': {question_id: (text, [answer_id, ...])},
+     'answers': {answer_id: (question_id, text, is_correct)},
+     'key': {question_id: correct answer_id or None}}
+    """
+
+    @staticmethod
+    def build(part_id):
+        quizzes = {
+            quiz_id: [] for quiz_id in
+            Quiz.objects.filter(quiz_part_id=part_id).order_by('id').values_list('id', flat=True)
+        }
+        questions = {}
+        for question_id, quiz_id, text in Question.objects.filter(
+            quiz__quiz_part_id=part_id
+        ).order_by('id').values_list('id', 'quiz_id', 'question_text'):
+            quizzes[quiz_id].append(question_id)
+            questions[question_id] = (text, [])
+        answers = {}
+        key = dict.fromkeys(questions)
+        for answer_id, question_id, text, is_correct in QuizAnswers.objects.filter(
+            question__quiz__quiz_part_id=part_id
+        ).order_by('id').values_list('id', 'question_id', 'answer_text', 'is_correct'):
+            questions[question_id][1].append(answer_id)
+            answers[answer_id] = (question_id, text, is_correct)
+            if is_correct and key[question_id] is None:
+                key[question_id] = answer_id
+        return {'quizzes': list(quizzes.items()), 'questions': questions, 'answers': answers, 'key': key}
+
+    @classmethod
+    def get(cls, part_id):
+        return CourseTree.cache.get_or_set(
+            ('question_bank', part_id), lambda: cls.build(part_id), stale_grace=CourseTree.STALE_GRACE
+        )
+
+    @staticmethod
+    def cached(part_id):
+        return CourseTree.cache.contains(('question_bank', part_id))
+
+
+class QuizVariant:
+    """Deterministic per-learner question subset and order, answer order"""
+
+    @staticmethod
+    def rng(user_id, quiz_id):
+        # Keyed so learners cannot work out each other's variants
+        digest = hashlib.blake2b(
+            f'{user_id}:{quiz_id}'.encode(), key=settings.SECRET_KEY.encode()[:64], digest_size=8
+        ).digest()
+        return random.Random(int.from_bytes(digest, 'big'))
+
+    @classmethod
+    def layout(cls, bank, quiz_id, question_ids, user_id):
+        """[(question_id, [answer_id, ...]), ...] as served to the learner"""
+        if not getattr(settings, 'QUIZ_VARIANTS', True):
+            return [(question_id, bank['questions'][question_id][1]) for question_id in question_ids]
+        rng = cls.rng(user_id, quiz_id)
+        question_ids = list(question_ids)
+        rng.shuffle(question_ids)
+        size = getattr(settings, 'QUIZ_VARIANT_QUESTIONS', 0)
+        if size:
+            question_ids = question_ids[:size]
+        layout = []
+        for question_id in question_ids:
+            answer_ids = list(bank['questions'][question_id][1])
+            rng.shuffle(answer_ids)
+            layout.append((question_id, answer_ids))
+        return layout
+
+    @classmethod
+    def for_part(cls, part_id, user_id):
+        """The part's quizzes for the learner, shaped like Part.quizzes for the quiz templates"""
+        bank = QuestionBank.get(part_id)
+        quizzes = []
+        for quiz_id, question_ids in bank['quizzes']:
+            questions = [
+                SimpleNamespace(
+                    id=question_id,
+                    question_text=bank['questions'][question_id][0],
+                    answers=Rows(
+                        SimpleNamespace(id=answer_id, answer_text=bank['answers'][answer_id][1],
+                                        is_correct=bank['answers'][answer_id][2])
+                        for answer_id in answer_ids
+                    ),
+                )
+                for question_id, answer_ids in cls.layout(bank, quiz_id, question_ids, user_id)
+            ]
+            quizzes.append(SimpleNamespace(id=quiz_id, questions=Rows(questions)))
+        return SimpleNamespace(id=part_id, quizzes=Rows(quizzes))
+
+    @classmethod
+    def grade(cls, part_id, user_id, selected_answer_id):
+        """
+        Grade the learner's variant of every quiz of a part
+        selected_answer_id(question_id) returns the submitted answer id (or None)
+        Returns: score entries in the QuizResults.scores format
+        """
+        bank = QuestionBank.get(part_id)
+        answers, key = bank['answers'], bank['key']
+        scores = []
+        correct_count = 0
+        incorrect_count = 0
+        for quiz_id, question_ids in bank['quizzes']:
+            layout = cls.layout(bank, quiz_id, question_ids, user_id)
+            correct_answers_map = {}
+            for question_id, _ in layout:
+                answer_id = selected_answer_id(question_id)
+                answer_id = int(answer_id) if str(answer_id).isdigit() else None
+                # Only answers of this question count as an answer to it
+                selected = answers.get(answer_id)
+                if selected is not None and selected[0] != question_id:
+                    selected = None
+                correct_id = key.get(question_id)
+                if selected is not None and answer_id == correct_id:
+                    correct_count += 1
+                else:
+                    incorrect_count += 1
+                correct_answers_map[f'ques_{question_id}'] = {
+                    'correct_ans': answers[correct_id][1] if correct_id is not None else None,
+                    'selected_ans': selected[1] if selected is not None else None,
+                }
+            scores.append({
+                "part_id": part_id,
+                "quiz_id": quiz_id,
+                "total_questions_in_quiz": len(layout),
+                "correct_option": correct_answers_map,
+                "quiz_result": {
+                    "correct_answers": correct_count,
+                    "incorrect_answers": incorrect_count,
+                },
+            })
+        return scores
@@ -0,0 +1,203 @@
+"""
+Sliding-window rate limits for the credential forms
+Each rule allows `limit` attempts per `period` seconds for one client IP or
+one account. Counts live in the rate_limits cache, one counter per fixed
+window; the sliding count is the current window plus the previous window
+weighted by how much of it still overlaps the last `period` seconds, so a
+check costs one incr and one get. Concurrent attempts are only all counted
+when incr is atomic, i.e. with Redis shared by the workers (LocMem counts per
+process). When the cache backend fails, counts fall back to this process's
+memory instead of letting every attempt through.
+The @rate_limit decorator runs before the view, so rejected attempts never
+reach the database; rejected attempts still count, which keeps an ongoing
+attack locked out.
+"""
+
+import functools
+import hashlib
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.contrib import messages
+from django.http import HttpResponse
+from django.shortcuts import render
+
+from .cache import RATE_LIMITS, get_cache, record
+
+logger = logging.getLogger(__name__)
+
+
+class LocalCounters:
+    """In-process stand-in for the cache's add/incr/get, used when the cache fails"""
+
+    def __init__(self):
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def incr(self, key, timeout):
+        now = time.monotonic()
+        with self._lock:
+            count, expires_at = self._counts.get(key, (0, 0))
+            if expires_at <= now:
+                count = 0
+                if len(self._counts) > 10000:
+                    self._counts = {k: v for k, v in self._counts.items() if v[1] > now}
+            self._counts[key] = (count + 1, now + timeout)
+            return count + 1
+
+    def get(self, key):
+        with self._lock:
+            count, expires_at = self._counts.get(key, (0, 0))
+            return count if expires_at > time.monotonic() else 0
+
+    def clear(self):
+        with self._lock:
+            self._counts.clear()
+
+
+class SlidingWindowLimiter:
+    """Sliding-window counter for one scope, e.g. login attempts per IP"""
+
+    local = LocalCounters()
+    FALLBACK_WARNING_INTERVAL = 60
+    _warned_at = 0.0
+
+    def __init__(self, scope, limit, period):
+        self.scope = scope
+        self.limit = limit
+        self.period = period
+
+    def key(self, ident, window):
+        return f'rl:{self.scope}:{ident}:{window}'
+
+    def _incr_cached(self, cache, key):
+        try:
+            return cache.incr(key)
+        except ValueError:
+            # Keep each window for two periods so it can still weigh in as the previous one
+            if cache.add(key, 1, self.period * 2):
+                return 1
+            return cache.incr(key)
+
+    def _counts(self, ident, window):
+        current_key, previous_key = self.key(ident, window), self.key(ident, window - 1)
+        try:
+            cache = get_cache(RATE_LIMITS)
+            return self._incr_cached(cache, current_key), cache.get(previous_key, 0)
+        except Exception as exc:
+            if time.monotonic() - SlidingWindowLimiter._warned_at > self.FALLBACK_WARNING_INTERVAL:
+                SlidingWindowLimiter._warned_at = time.monotonic()
+                logger.warning(f'Rate limit cache unavailable ({exc!r}), counting in process')
+            record('rate_limit', 'local_fallback')
+            return self.local.incr(current_key, self.period * 2), self.local.get(previous_key)
+
+    def hit(self, ident, now=None):
+        """
+        Count an attempt by ident
+        Returns: (allowed, retry_after_seconds)
+        """
+        now = time.time() if now is None else now
+        window, offset = divmod(now, self.period)
+        elapsed = offset / self.period
+        current, previous = self._counts(ident, int(window))
+        if previous * (1 - elapsed) + current <= self.limit:
+            return True, 0
+        if current > self.limit or not previous:
+            retry_after = self.period - offset
+        else:
+            # When the previous window's weight has decayed enough
+            retry_after = (1 - (self.limit - current) / previous - elapsed) * self.period
+        return False, max(1, int(retry_after + 0.999))
+
+
+def client_ip(request):
+    """
+    Client address; behind a proxy, RATE_LIMIT_IP_HEADER names the header it sets
+    Empty when that header is missing: REMOTE_ADDR would then be the proxy's
+    address, shared by every client.
+    """
+    header = getattr(settings, 'RATE_LIMIT_IP_HEADER', 'REMOTE_ADDR')
+    return request.META.get(header, '').split(',')[0].strip()
+
+
+def post_field(name):
+    """Account identifier taken from a POST field (e.g. the login e-mail)"""
+    def account(request):
+        return request.POST.get(name, '').strip().lower() or None
+    return account
+
+
+def session_user(request):
+    """Account identifier for forms behind login: the session's user id"""
+    user_id = request.session.get('id')
+    return str(user_id) if user_id else None
+
+
+def _digest(value):
+    # Fixed-length, memcached-safe key part that does not store the e-mail itself
+    return hashlib.blake2b(value.encode(), digest_size=12).hexdigest()
+
+
+def check(scope, request, account=None):
+    """
+    Count the request against the scope's 'ip' and 'account' rules
+    Returns the seconds to wait when a rule is exceeded, else None
+    """
+    rules = getattr(settings, 'RATE_LIMIT_RULES', {}).get(scope, {})
+    idents = {}
+    ip = client_ip(request)
+    if ip:
+        idents['ip'] = _digest(ip)
+    else:
+        # Counting all address-less requests together would limit the whole site
+        record('rate_limit', 'no_client_ip')
+    if account is not None:
+        account_id = account(request)
+        if account_id:
+            idents['account'] = _digest(account_id)
+    retry_after = None
+    for kind, ident in idents.items():
+        if kind not in rules:
+            continue
+        limit, period = rules[kind]
+        allowed, wait = SlidingWindowLimiter(f'{scope}:{kind}', limit, period).hit(ident)
+        if not allowed:
+            record('rate_limit', f'rejected_{kind}')
+            retry_after = max(retry_after or 0, wait)
+    return retry_after
+
+
+def rate_limit(scope, account=None, template=None, context=None, methods=('POST',)):
+    """
+    Decorator for views that take credentials
+    account: callable request -> account identifier (post_field, session_user)
+    template/context: page rendered with an error message on rejection,
+    context(request, **view_kwargs) supplies its context without a query
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if not getattr(settings, 'RATE_LIMIT_ENABLED', True) or request.method not in methods:
+                return view(request, *args, **kwargs)
+            retry_after = check(scope, request, account)
+            if retry_after is None:
+                return view(request, *args, **kwargs)
+
+            minutes = max(1, round(retry_after / 60))
+            if template is None:
+                response = HttpResponse('Too many attempts. Please try again later.', status=429)
+            else:
+                messages.error(
+                    request,
+                    f"Too many attempts. Please try again in {minutes} minute{'s' if minutes != 1 else ''}."
+                )
+                list(messages.get_messages(request))
+                response = render(
+                    request, template, context(request, **kwargs) if context else {}, status=429
+                )
+            response['Retry-After'] = str(retry_after)
+            return response
+        return wrapper
+    return decorator
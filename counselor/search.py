@@ -0,0 +1,293 @@
+"""
+Full-text search over course content
+Lessons (part title and HTML-stripped text), chapter overview points and
+quiz questions (with their answers) are kept in a SQLite FTS5 index file,
+SEARCH_INDEX_PATH: an inverted index of porter-stemmed, diacritics-folded
+tokens, with each document's course and part stored alongside so results can
+be limited to one course. Documents are rewritten one by one from the content
+models' save/delete signals (after commit), course by course after bulk
+imports and clones, and `manage.py build_search_index` rebuilds everything.
+Queries are ranked with BM25 (titles weigh more than text) and never touch
+the content tables.
+The index file is local to the host: with several application servers, run
+build_search_index on the others after content changes made elsewhere.
+"""
+
+import html
+import logging
+import os
+import re
+import sqlite3
+import threading
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.utils.html import strip_tags
+
+from .models import Chapter, CourseOverviewPoints, Part, Question, Quiz, QuizAnswers
+
+logger = logging.getLogger(__name__)
+
+# Row ids encode the kind of document: rowid = object id * KINDS + kind
+PART, POINT, QUESTION = 1, 2, 3
+KINDS = 4
+KIND_NAMES = {PART: 'part', POINT: 'point', QUESTION: 'question'}
+
+SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS documents USING fts5(
+    course_id UNINDEXED, part_id UNINDEXED, title, body,
+    tokenize = 'porter unicode61 remove_diacritics 2'
+)
+"""
+# bm25() weights, one per column
+WEIGHTS = (0.0, 0.0, 4.0, 1.0)
+# Snippet markers, replaced by <mark> once the snippet is escaped
+MARK_START, MARK_END = '\x02', '\x03'
+
+_WHITESPACE = re.compile(r'\s+')
+_TOKEN = re.compile(r'\w+')
+
+
+def plain_text(markup):
+    """Visible text of lesson HTML"""
+    return _WHITESPACE.sub(' ', html.unescape(strip_tags(markup or ''))).strip()
+
+
+def rowid(kind, object_id):
+    return object_id * KINDS + kind
+
+
+def part_documents(parts):
+    for part_id, course_id, title, rendered in parts.values_list(
+        'id', 'chapter__course_id', 'title', 'rendered_description'
+    ).iterator(chunk_size=500):
+        yield rowid(PART, part_id), course_id, part_id, title, plain_text(rendered)
+
+
+def point_documents(points):
+    for point_id, course_id, chapter_title, text in points.values_list(
+        'id', 'chapter__course_id', 'chapter__title', 'points'
+    ).iterator(chunk_size=500):
+        yield rowid(POINT, point_id), course_id, None, chapter_title, plain_text(text)
+
+
+def question_documents(questions):
+    rows = list(questions.values_list('id', 'quiz__quiz_part__chapter__course_id', 'quiz__quiz_part_id', 'question_text'))
+    answers = {}
+    for question_id, text in QuizAnswers.objects.filter(
+        question_id__in=[row[0] for row in rows]
+    ).order_by('id').values_list('question_id', 'answer_text'):
+        answers.setdefault(question_id, []).append(text or '')
+    for question_id, course_id, part_id, text in rows:
+        yield rowid(QUESTION, question_id), course_id, part_id, text or '', ' '.join(answers.get(question_id, ()))
+
+
+class SearchIndex:
+    """The FTS5 index file: one connection per thread and process"""
+
+    _local = threading.local()
+
+    @staticmethod
+    def path():
+        return getattr(settings, 'SEARCH_INDEX_PATH', None)
+
+    @classmethod
+    def enabled(cls):
+        return bool(cls.path())
+
+    @classmethod
+    def connection(cls):
+        local = cls._local
+        if getattr(local, 'connection', None) is None or local.pid != os.getpid() or local.path != cls.path():
+            connection = sqlite3.connect(cls.path(), timeout=5, isolation_level=None)
+            connection.execute('PRAGMA journal_mode = WAL')
+            connection.execute(SCHEMA)
+            local.connection, local.pid, local.path = connection, os.getpid(), cls.path()
+        return local.connection
+
+    @classmethod
+    def write(cls, delete_sql, delete_params, documents):
+        """Delete the matching documents and insert new ones in one transaction; returns the count"""
+        connection = cls.connection()
+        count = 0
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            connection.execute(delete_sql, delete_params)
+            for document in documents:
+                connection.execute(
+                    'INSERT INTO documents (rowid, course_id, part_id, title, body) VALUES (?, ?, ?, ?, ?)',
+                    document
+                )
+                count += 1
+            connection.execute('COMMIT')
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        return count
+
+    @staticmethod
+    def course_documents(course_ids=None):
+        def scoped(queryset, path):
+            return queryset.filter(**{f'{path}__in': course_ids}) if course_ids is not None else queryset
+        yield from part_documents(scoped(Part.objects.order_by('id'), 'chapter__course_id'))
+        yield from point_documents(scoped(CourseOverviewPoints.objects.order_by('id'), 'chapter__course_id'))
+        yield from question_documents(scoped(Question.objects.order_by('id'), 'quiz__quiz_part__chapter__course_id'))
+
+    @classmethod
+    def rebuild(cls):
+        """Reindex all content; returns the number of documents"""
+        count = cls.write('DELETE FROM documents', (), cls.course_documents())
+        cls.connection().execute("INSERT INTO documents (documents) VALUES ('optimize')")
+        return count
+
+    @classmethod
+    def reindex_courses(cls, course_ids):
+        """Reindex whole courses (after bulk writes, which send no signals)"""
+        course_ids = list(course_ids)
+        placeholders = ', '.join('?' * len(course_ids))
+        return cls.write(
+            f'DELETE FROM documents WHERE course_id IN ({placeholders})', course_ids,
+            cls.course_documents(course_ids)
+        )
+
+    @classmethod
+    def reindex(cls, kind, object_ids):
+        """Rewrite the documents of some parts, points or questions (deleted ones are dropped)"""
+        object_ids = list(object_ids)
+        documents = {
+            PART: lambda: part_documents(Part.objects.filter(id__in=object_ids)),
+            POINT: lambda: point_documents(CourseOverviewPoints.objects.filter(id__in=object_ids)),
+            QUESTION: lambda: question_documents(Question.objects.filter(id__in=object_ids)),
+        }[kind]()
+        placeholders = ', '.join('?' * len(object_ids))
+        return cls.write(
+            f'DELETE FROM documents WHERE rowid IN ({placeholders})',
+            [rowid(kind, object_id) for object_id in object_ids], documents
+        )
+
+    @staticmethod
+    def match_expression(query):
+        """FTS5 query: any of the words, the last one also as a prefix (search as you type)"""
+        tokens = _TOKEN.findall(query.lower())[:12]
+        if not tokens:
+            return None
+        terms = [f'"{token}"' for token in tokens]
+        terms[-1] = f'({terms[-1]} OR {terms[-1]}*)'
+        return ' OR '.join(terms)
+
+    @classmethod
+    def search(cls, query, course_id=None, limit=20):
+        """
+        Ranked matches, best first
+        Returns: [{'kind', 'id', 'course_id', 'part_id', 'title', 'snippet'}]
+        (snippet is HTML with the matched words in <mark>)
+        """
+        expression = cls.match_expression(query)
+        if expression is None:
+            return []
+        sql = (
+            f"SELECT rowid, course_id, part_id, title, snippet(documents, 3, ?, ?, '…', 16) FROM documents "
+            f"WHERE documents MATCH ?{' AND course_id = ?' if course_id is not None else ''} "
+            f"ORDER BY bm25(documents, {', '.join(map(str, WEIGHTS))}) LIMIT ?"
+        )
+        params = [MARK_START, MARK_END, expression, *([course_id] if course_id is not None else []), limit]
+        results = []
+        for document_rowid, document_course_id, part_id, title, snippet in cls.connection().execute(sql, params):
+            object_id, kind = divmod(document_rowid, KINDS)
+            results.append({
+                'kind': KIND_NAMES[kind],
+                'id': object_id,
+                'course_id': document_course_id,
+                'part_id': part_id,
+                'title': title,
+                'snippet': html.escape(snippet).replace(MARK_START, '<mark>').replace(MARK_END, '</mark>'),
+            })
+        return results
+
+    # Signal handlers: collect the affected documents, rewrite them after commit
+
+    @classmethod
+    def schedule(cls, kind, object_ids):
+        if not cls.enabled() or not object_ids:
+            return
+        if getattr(cls._local, 'pending', None) is None:
+            cls._local.pending = {}
+        cls._local.pending.setdefault(kind, set()).update(object_ids)
+        # The first flush after commit writes everything collected so far (e.g. a
+        # whole cascade delete in one index transaction); the others find nothing
+        transaction.on_commit(cls.flush_pending)
+
+    @classmethod
+    def flush_pending(cls):
+        pending, cls._local.pending = getattr(cls._local, 'pending', None) or {}, None
+        # Ids left over from a rolled back transaction are reindexed too, which is harmless
+        for kind, object_ids in pending.items():
+            object_ids = sorted(object_ids)
+            try:
+                for start in range(0, len(object_ids), 500):
+                    cls.reindex(kind, object_ids[start:start + 500])
+            except Exception:
+                logger.exception(f'Search index update failed ({len(object_ids)} {KIND_NAMES[kind]} documents)')
+
+    @classmethod
+    def schedule_courses(cls, course_ids):
+        """Reindex courses after commit; for bulk writes, which send no signals"""
+        if not cls.enabled():
+            return
+
+        def run():
+            try:
+                cls.reindex_courses(course_ids)
+            except Exception:
+                logger.exception(f'Search index update failed (courses {course_ids})')
+        transaction.on_commit(run)
+
+    @classmethod
+    def part_changed(cls, sender, instance, **kwargs):
+        cls.schedule(PART, [instance.pk])
+
+    @classmethod
+    def point_changed(cls, sender, instance, **kwargs):
+        cls.schedule(POINT, [instance.pk])
+
+    @classmethod
+    def question_changed(cls, sender, instance, **kwargs):
+        cls.schedule(QUESTION, [instance.pk])
+
+    @classmethod
+    def answer_changed(cls, sender, instance, **kwargs):
+        if instance.question_id:
+            cls.schedule(QUESTION, [instance.question_id])
+
+    @classmethod
+    def quiz_saved(cls, sender, instance, created=False, **kwargs):
+        # A quiz moved to another part moves its questions along
+        if created or not cls.enabled():
+            return
+        cls.schedule(QUESTION, list(instance.questions.values_list('id', flat=True)))
+
+    @classmethod
+    def chapter_saved(cls, sender, instance, created=False, **kwargs):
+        # Points carry the chapter title; everything below follows the chapter's course
+        if created or not cls.enabled():
+            return
+        cls.schedule(POINT, list(instance.points.values_list('id', flat=True)))
+        cls.schedule(PART, list(instance.parts.values_list('id', flat=True)))
+        cls.schedule(QUESTION, list(
+            Question.objects.filter(quiz__quiz_part__chapter=instance).values_list('id', flat=True)
+        ))
+
+    @classmethod
+    def connect_signals(cls):
+        for model, handler, on_delete in (
+            (Part, cls.part_changed, True),
+            (CourseOverviewPoints, cls.point_changed, True),
+            (Question, cls.question_changed, True),
+            (QuizAnswers, cls.answer_changed, True),
+            (Quiz, cls.quiz_saved, False),
+            (Chapter, cls.chapter_saved, False),
+        ):
+            post_save.connect(handler, sender=model, dispatch_uid=f'search_save_{model.__name__}')
+            if on_delete:
+                post_delete.connect(handler, sender=model, dispatch_uid=f'search_delete_{model.__name__}')
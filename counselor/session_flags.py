@@ -0,0 +1,41 @@
+"""
+Compact per-course session flags
+All course flags live in one small session entry, {"<course id>": bitmask},
+instead of a key per course and feature. Flags are only written when they
+change, so reading them never marks the session modified and an unchanged
+session is never saved back to the session store.
+"""
+
+SESSION_KEY = 'cf'
+
+AUTOCOMPLETE = 1
+COURSE_AUTOCOMPLETE = 2
+
+# Per-course keys written before the compact schema, by flag
+LEGACY_KEYS = {
+    AUTOCOMPLETE: 'autocomplete_{title}',
+    COURSE_AUTOCOMPLETE: 'course_autocomplete_{title}',
+}
+
+
+class CourseSessionFlags:
+    """Read and set per-course flags on request.session"""
+
+    @staticmethod
+    def has(session, course, flag):
+        flags = session.get(SESSION_KEY, {}).get(str(course.id), 0)
+        if flags & flag:
+            return True
+        # Sessions created before the compact schema still carry the old keys
+        return bool(session.get(LEGACY_KEYS[flag].format(title=course.title)))
+
+    @staticmethod
+    def set(session, course, flag):
+        """Turn a flag on; the session is only modified if it was off"""
+        course_flags = session.get(SESSION_KEY, {})
+        current = course_flags.get(str(course.id), 0)
+        if current & flag:
+            return
+        # Assigning a new dict (rather than mutating) is what marks the session modified
+        session[SESSION_KEY] = {**course_flags, str(course.id): current | flag}
+        session.pop(LEGACY_KEYS[flag].format(title=course.title), None)
@@ -0,0 +1,44 @@
+"""
+Static file build configuration
+CounselorStaticFilesConfig is listed in INSTALLED_APPS in place of
+django.contrib.staticfiles so collectstatic skips duplicate asset trees;
+CounselorStaticFilesStorage is the production STORAGES["staticfiles"] backend.
+"""
+
+import logging
+
+from django.conf import settings
+from django.contrib.staticfiles.apps import StaticFilesConfig
+from whitenoise.storage import CompressedManifestStaticFilesStorage
+
+logger = logging.getLogger(__name__)
+
+
+class CounselorStaticFilesConfig(StaticFilesConfig):
+    """staticfiles with STATICFILES_EXCLUDE_DIRS added to the ignore patterns"""
+    ignore_patterns = StaticFilesConfig.ignore_patterns + list(
+        getattr(settings, 'STATICFILES_EXCLUDE_DIRS', [])
+    )
+
+
+class CounselorStaticFilesStorage(CompressedManifestStaticFilesStorage):
+    """
+    WhiteNoise's hashed + pre-compressed storage, tolerant of dangling url()
+    references in the vendored theme CSS (fonts that were never shipped):
+    those references are left as they are instead of failing the build
+    """
+    # A template referencing a file outside the build renders its plain URL instead of a 500
+    manifest_strict = False
+
+    def url(self, name, force=False):
+        # Several templates use Windows-style {% static 'a\\b.png' %} paths
+        return super().url(name.replace('\\', '/') if name else name, force)
+
+    def hashed_name(self, name, content=None, filename=None):
+        try:
+            return super().hashed_name(name, content, filename)
+        except ValueError as e:
+            if content is not None:
+                raise
+            logger.warning(f"Static reference left unhashed: {str(e).splitlines()[0]}")
+            return name
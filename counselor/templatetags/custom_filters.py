@@ -1,4 +1,7 @@
 from django import template
+from django.utils.safestring import mark_safe
+
+from counselor.image_derivatives import rewrite_images
 
 register = template.Library()
 
@@ -16,4 +19,10 @@ def get(dictionary, key):
     if isinstance(dictionary, dict):
         # Return the actual value, or None if key doesn't exist
         return dictionary.get(key, None)
-    return None
\ No newline at end of file
+    return None
+
+
+@register.filter
+def responsive_images(html):
+    """Render trusted lesson HTML with slide <img> tags pointing at their WebP/resized derivatives."""
+    return mark_safe(rewrite_images(html))
@@ -1,3 +1,303 @@
-from django.test import TestCase
+import threading
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, identify_hasher, make_password
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from .analytics import ATTEMPT_LOCKED, QUIZ_FAILED, EventLog
+from .attempt_state import QuizAttemptState
+from .cache import RATE_LIMITS, USER_PROGRESS, get_cache
+from .lesson_html import sanitize_html
+from .passwords import LoginBusy, PasswordService
+from .rate_limit import SlidingWindowLimiter
+from .models import (
+    Chapter, CounselorCourse, CounselorUser, LearnerEvent, Part, Question, Quiz, QuizAnswers,
+    UserQuizAttemptTrack
+)
+from .views_v2 import QuizSubmissionService
+
+
+def create_course(title='UK'):
+    """One chapter: an Introduction and a part with a single-question quiz"""
+    course = CounselorCourse.objects.create(title=title)
+    chapter = Chapter.objects.create(course=course, title='Chapter 1', index=0)
+    Part.objects.create(chapter=chapter, title='Introduction', index=0, description='<p>Welcome</p>')
+    part = Part.objects.create(chapter=chapter, title='Visas', index=1, description='<p>Visas</p>')
+    quiz = Quiz.objects.create(title='Visas quiz', quiz_part=part)
+    question = Question.objects.create(quiz=quiz, question_text='Which visa?')
+    QuizAnswers.objects.create(question=question, answer_text='Student', is_correct=True)
+    QuizAnswers.objects.create(question=question, answer_text='Tourist')
+    return course, part, question
+
+
+class CounselorTestCase(TestCase):
+    def setUp(self):
+        get_cache(USER_PROGRESS).clear()
+        self.course, self.part, self.question = create_course()
+        self.user = CounselorUser.objects.create(username='learner', email='learner@example.com', password='')
+        session = self.client.session
+        session['id'] = self.user.id
+        session.save()
+
+    def submit_quiz(self, correct):
+        answer = self.question.answers.get(is_correct=correct)
+        response = self.client.post(reverse('counselor:counselor_enrolled_course'), {
+            'part_id': self.part.id,
+            'course_name': self.course.title,
+            'show_part_id': self.part.id,
+            f'question_{self.question.id}': answer.id,
+        })
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+
+class QuizAttemptStateTests(CounselorTestCase):
+    def setUp(self):
+        super().setUp()
+        self.admin = User.objects.create_superuser('admin', 'admin@example.com', 'admin-password')
+        self.admin_client = self.client_class()
+        self.admin_client.force_login(self.admin)
+        # Two failed attempts lock the quiz and leave the state cached
+        self.submit_quiz(correct=False)
+        self.submit_quiz(correct=False)
+        self.track = UserQuizAttemptTrack.objects.get(user=self.user, part=self.part)
+        state = QuizAttemptState.load(self.user, self.course)
+        self.assertIn(self.part.id, state.locked_parts())
+
+    def test_admin_edit_shows_up_on_next_quiz_post(self):
+        response = self.admin_client.post(
+            reverse('admin:counselor_userquizattempttrack_change', args=[self.track.id]), {
+                'user': self.user.id,
+                'course': self.course.id,
+                'part': self.part.id,
+                'no_of_attempt': 1,
+                'window_closed_time_0': '',
+                'window_closed_time_1': '',
+            }
+        )
+        self.assertEqual(response.status_code, 302)
+        state = QuizAttemptState.load(self.user, self.course)
+        self.assertEqual(state.attempt_count(self.part.id), 1)
+        self.assertEqual(state.locked_parts(), {})
+
+        # Counted from the edited track: 1 -> 2, not 2 -> 3
+        result = self.submit_quiz(correct=False)
+        self.assertEqual(result['attempt_state']['attempts'], {str(self.part.id): 2})
+
+    def test_admin_delete_unlocks(self):
+        response = self.admin_client.post(
+            reverse('admin:counselor_userquizattempttrack_delete', args=[self.track.id]), {'post': 'yes'}
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(QuizAttemptState.load(self.user, self.course).attempts, {})
+
+    def test_cascade_delete_clears_state(self):
+        self.part.delete()
+        self.assertEqual(QuizAttemptState.load(self.user, self.course).attempts, {})
+
+
+class AttemptEventTests(CounselorTestCase):
+    def test_lockout_and_failure_are_logged_once(self):
+        EventLog._buffer.clear()
+        for _ in range(3):
+            with self.captureOnCommitCallbacks(execute=True):
+                QuizSubmissionService.record_attempts(self.user, self.course, {self.part.id: False})
+        while EventLog.flush():
+            pass
+        events = LearnerEvent.objects.filter(user_id=self.user.id, part_id=self.part.id)
+        self.assertEqual(
+            list(events.order_by('value').values_list('event', 'value')), [(ATTEMPT_LOCKED, 2), (QUIZ_FAILED, 3)]
+        )
+
+
+class SanitizeHTMLTests(SimpleTestCase):
+    def test_style_content_is_kept_verbatim(self):
+        html = '<style>ul > li a[href^="x"] { content: "&amp;" }</style><p>a > b</p>'
+        self.assertEqual(
+            sanitize_html(html), '<style>ul > li a[href^="x"] { content: "&amp;" }</style><p>a &gt; b</p>'
+        )
+
+    def test_scripts_and_handlers_are_dropped(self):
+        html = '<p onclick="steal()">Hi<script>alert(1)</script></p><a href=" javascript:x">link</a>'
+        self.assertEqual(sanitize_html(html), '<p>Hi</p><a>link</a>')
+
+
+class SlidingWindowLimiterTests(SimpleTestCase):
+    # Window starts are multiples of the period, so START is the start of a window
+    START = 1_200_000
+
+    def setUp(self):
+        get_cache(RATE_LIMITS).clear()
+        SlidingWindowLimiter.local.clear()
+
+    def hits(self, limiter, count, now):
+        return [limiter.hit('client', now=now) for _ in range(count)]
+
+    def test_limit_reached(self):
+        limiter = SlidingWindowLimiter('test', limit=3, period=60)
+        self.assertEqual(self.hits(limiter, 3, self.START + 1), [(True, 0)] * 3)
+        allowed, retry_after = limiter.hit('client', now=self.START + 1)
+        self.assertFalse(allowed)
+        # Rejected attempts count too
+        self.assertFalse(limiter.hit('client', now=self.START + 30)[0])
+        self.assertTrue(limiter.hit('other client', now=self.START + 30)[0])
+
+    def test_retry_after_is_end_of_window(self):
+        limiter = SlidingWindowLimiter('test', limit=3, period=60)
+        self.hits(limiter, 3, self.START + 15)
+        self.assertEqual(limiter.hit('client', now=self.START + 15), (False, 45))
+
+    def test_previous_window_weighting(self):
+        limiter = SlidingWindowLimiter('test', limit=10, period=100)
+        self.assertTrue(all(allowed for allowed, _ in self.hits(limiter, 10, self.START + 10)))
+        # Half-way through the next window the previous 10 attempts weigh 5
+        halfway = self.START + 150
+        self.assertTrue(all(allowed for allowed, _ in self.hits(limiter, 5, halfway)))
+        # 6 + 5 > 10 until the previous window weighs at most 4, 10 seconds later
+        self.assertEqual(limiter.hit('client', now=halfway), (False, 10))
+        # 7 + 10 * 0.3 = 10
+        self.assertTrue(limiter.hit('client', now=self.START + 170)[0])
+
+    def test_previous_window_expires(self):
+        limiter = SlidingWindowLimiter('test', limit=2, period=60)
+        self.hits(limiter, 5, self.START + 1)
+        self.assertFalse(limiter.hit('client', now=self.START + 61)[0])
+        self.assertTrue(limiter.hit('client', now=self.START + 121)[0])
+
+    def test_counts_in_process_when_cache_fails(self):
+        limiter = SlidingWindowLimiter('test', limit=2, period=60)
+        broken = mock.Mock(**{'incr.side_effect': ConnectionError, 'get.side_effect': ConnectionError})
+        with mock.patch('counselor.rate_limit.get_cache', return_value=broken):
+            self.assertEqual(self.hits(limiter, 2, self.START + 1), [(True, 0)] * 2)
+            self.assertEqual(limiter.hit('client', now=self.START + 1), (False, 59))
+
+
+@override_settings(RATE_LIMIT_ENABLED=True)
+class LoginRateLimitTests(TestCase):
+    def setUp(self):
+        get_cache(RATE_LIMITS).clear()
+
+    def test_login_attempts_per_account(self):
+        url = reverse('counselor:user_login')
+        data = {'Username': 'learner@example.com', 'password': 'wrong'}
+        limit, _ = settings.RATE_LIMIT_RULES['login']['account']
+        for _ in range(limit):
+            self.assertNotEqual(self.client.post(url, data).status_code, 429)
+        response = self.client.post(url, data)
+        self.assertEqual(response.status_code, 429)
+        self.assertGreater(int(response['Retry-After']), 0)
+
+    @override_settings(RATE_LIMIT_IP_HEADER='HTTP_X_REAL_IP', RATE_LIMIT_RULES={'login': {'ip': (2, 300)}})
+    def test_ip_rule_uses_proxy_header(self):
+        url = reverse('counselor:user_login')
+        for number in range(2):
+            data = {'Username': f'learner{number}@example.com', 'password': 'wrong'}
+            self.assertNotEqual(self.client.post(url, data, HTTP_X_REAL_IP='203.0.113.7').status_code, 429)
+        data = {'Username': 'learner2@example.com', 'password': 'wrong'}
+        self.assertEqual(self.client.post(url, data, HTTP_X_REAL_IP='203.0.113.7').status_code, 429)
+        self.assertNotEqual(self.client.post(url, data, HTTP_X_REAL_IP='203.0.113.8').status_code, 429)
+
+    @override_settings(RATE_LIMIT_IP_HEADER='HTTP_X_REAL_IP', RATE_LIMIT_RULES={'login': {'ip': (2, 300)}})
+    def test_ip_rule_skipped_without_client_address(self):
+        # Without the header every request would share the proxy's REMOTE_ADDR
+        url = reverse('counselor:user_login')
+        for number in range(5):
+            data = {'Username': f'learner{number}@example.com', 'password': 'wrong'}
+            self.assertNotEqual(self.client.post(url, data).status_code, 429)
+
+
+@override_settings(PASSWORD_HASH_ITERATIONS=1000, RATE_LIMIT_ENABLED=False)
+class PasswordServiceTests(TestCase):
+    def login(self, password):
+        return self.client.post(reverse('counselor:user_login'), {
+            'Username': 'learner@example.com', 'password': password
+        })
+
+    def create_user(self, password):
+        return CounselorUser.objects.create(username='learner', email='learner@example.com', password=password)
+
+    def test_plaintext_password_is_hashed_on_login(self):
+        user = self.create_user('secret-pw')
+        self.assertEqual(self.login('wrong').status_code, 200)
+        user.refresh_from_db()
+        self.assertEqual(user.password, 'secret-pw')
+
+        response = self.login('secret-pw')
+        self.assertRedirects(response, reverse('counselor:icef_view'), fetch_redirect_response=False)
+        user.refresh_from_db()
+        self.assertTrue(PasswordService.is_hashed(user.password))
+        self.assertTrue(check_password('secret-pw', user.password))
+        self.assertEqual(self.client.session['id'], user.id)
+
+    def test_outdated_hash_is_rehashed_on_login(self):
+        user = self.create_user(make_password('secret-pw'))
+        old_hash = user.password
+        with override_settings(PASSWORD_HASH_ITERATIONS=2000):
+            self.assertEqual(self.login('secret-pw').status_code, 302)
+        user.refresh_from_db()
+        self.assertNotEqual(user.password, old_hash)
+        self.assertEqual(identify_hasher(user.password).safe_summary(user.password)['iterations'], 2000)
+
+    def test_current_hash_is_kept(self):
+        user = self.create_user(make_password('secret-pw'))
+        old_hash = user.password
+        self.assertEqual(self.login('secret-pw').status_code, 302)
+        user.refresh_from_db()
+        self.assertEqual(user.password, old_hash)
+
+    def test_busy_hashing_pool_returns_503(self):
+        self.create_user(make_password('secret-pw'))
+        with mock.patch.object(PasswordService, '_run', side_effect=LoginBusy):
+            response = self.login('secret-pw')
+        self.assertEqual(response.status_code, 503)
+        self.assertNotIn('id', self.client.session)
+
+
+class PasswordPoolTests(SimpleTestCase):
+    def setUp(self):
+        PasswordService.reset_executor()
+        self.addCleanup(PasswordService.reset_executor)
+        self.release = threading.Event()
+        self.addCleanup(self.release.set)
+
+    def occupy(self):
+        """Start a hash that blocks the pool's only thread until self.release is set"""
+        started = threading.Event()
+
+        def blocking():
+            started.set()
+            self.release.wait(5)
+            return 'first'
+
+        def hold():
+            try:
+                PasswordService._run(blocking)
+            except LoginBusy:
+                pass  # With a short LOGIN_HASH_TIMEOUT this caller gives up too
+
+        thread = threading.Thread(target=hold)
+        thread.start()
+        self.addCleanup(thread.join)
+        self.assertTrue(started.wait(5))
+
+    @override_settings(LOGIN_HASH_WORKERS=1, LOGIN_HASH_QUEUE=0, LOGIN_HASH_TIMEOUT=5)
+    def test_full_queue_fails_fast(self):
+        self.occupy()
+        with self.assertRaises(LoginBusy):
+            PasswordService._run(lambda: 'second')
+        self.release.set()
+
+    @override_settings(LOGIN_HASH_WORKERS=1, LOGIN_HASH_QUEUE=1, LOGIN_HASH_TIMEOUT=0.05)
+    def test_abandoned_hash_is_dropped(self):
+        self.occupy()
+        ran = threading.Event()
+        with self.assertRaises(LoginBusy):
+            PasswordService._run(ran.set)
+        self.release.set()
+        # Its slot is free again and it never ran
+        with override_settings(LOGIN_HASH_TIMEOUT=5):
+            self.assertEqual(PasswordService._run(lambda: 'third'), 'third')
+        self.assertFalse(ran.is_set())
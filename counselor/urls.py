@@ -1,14 +1,38 @@
 
+from django.conf import settings
 from django.urls import path
 
-from counselor import views 
-from counselor.views import *
-# Import new production-ready views
-from counselor.views_v2 import (
-    CounselorEnrolledCourseViewV2,
-    FetchCurrentPartViewV2,
-    update_part_status as update_part_status_v2
-)
+from counselor.lazy_view import LazyView
+
+# View modules are imported on first use rather than when the URLconf loads
+login_view = LazyView('counselor.views.login_view')
+user_login = LazyView('counselor.views.user_login')
+signup_view = LazyView('counselor.views.signup_view')
+user_signup = LazyView('counselor.views.user_signup')
+user_logout = LazyView('counselor.views.user_logout')
+course_overview = LazyView('counselor.views.course_overview')
+quiz_autocomplete = LazyView('counselor.views.quiz_autocomplete')
+course_autocomplete = LazyView('counselor.views.course_autocomplete')
+update_part_status_v2 = LazyView('counselor.views_v2.update_part_status')
+batch_progress_update = LazyView('counselor.views_v2.batch_progress_update')
+search_content = LazyView('counselor.views_v2.search_content')
+stream_media = LazyView('counselor.views_media.stream_media')
+
+# Async (ASGI) variants of the read-heavy views, enabled with ASYNC_VIEWS=True.
+# Async views are imported eagerly: Django inspects them before the first call
+if getattr(settings, 'ASYNC_VIEWS', False):
+    from counselor.views_async import (
+        CounselorEnrolledCourseViewAsync,
+        FetchCurrentPartViewAsync,
+        icef_view_async as courses_view,
+    )
+    enrolled_course_view = CounselorEnrolledCourseViewAsync.as_view()
+    fetch_current_part_view = FetchCurrentPartViewAsync.as_view()
+else:
+    enrolled_course_view = LazyView('counselor.views_v2.CounselorEnrolledCourseViewV2', as_view=True)
+    fetch_current_part_view = LazyView('counselor.views_v2.FetchCurrentPartViewV2', as_view=True)
+    courses_view = LazyView('counselor.views.icef_view')
+
 app_name='counselor'
 
 urlpatterns = [
@@ -17,16 +41,19 @@ urlpatterns = [
     path('signup-page/', signup_view, name='signup_view'),
     path('user_signup/', user_signup, name='user_signup'),
     path('user_logout/', user_logout, name='user_logout'),
-    path('counsellor-courses/', icef_view, name='icef_view'),
+    path('counsellor-courses/', courses_view, name='icef_view'),
     path('course-overview/<str:course_name>/', course_overview, name='course_overview'),
     # Production-ready class-based views
-    path('counselor_enrolled_course/', CounselorEnrolledCourseViewV2.as_view(), name='counselor_enrolled_course'),
-    path('counselor_enrolled_course/<str:course_name>/', CounselorEnrolledCourseViewV2.as_view(), name='counselor_enrolled_course_param'),
+    path('counselor_enrolled_course/', enrolled_course_view, name='counselor_enrolled_course'),
+    path('counselor_enrolled_course/<str:course_name>/', enrolled_course_view, name='counselor_enrolled_course_param'),
     path('counselor_enrolled_course/<str:course_name>/autocomplete/', quiz_autocomplete, name='quiz_autocomplete'),
     path('counselor_enrolled_course/<str:course_name>/autocomplete-full/', course_autocomplete, name='course_autocomplete'),
     path('fetch_current_part/<str:course_name>/autocomplete/', quiz_autocomplete, name='quiz_autocomplete_activate'),
-    path('fetch_current_part/<str:course_name>/<int:current_part_id>/<int:part_or_quiz>/', FetchCurrentPartViewV2.as_view(), name='fetch_current_part'),
-    path('update_part_status/<int:part_id>/', update_part_status_v2, name='update_part_status')
+    path('fetch_current_part/<str:course_name>/<int:current_part_id>/<int:part_or_quiz>/', fetch_current_part_view, name='fetch_current_part'),
+    path('update_part_status/<int:part_id>/', update_part_status_v2, name='update_part_status'),
+    path('batch_progress/', batch_progress_update, name='batch_progress_update'),
+    path('search/', search_content, name='search_content'),
+    path('media-stream/<path:path>', stream_media, name='stream_media')
     # path('update_progress/', views.update_progress, name='update_progress'),  # Update progress
     # path('get_progress_and_duration/<str:video_id>/', views.get_progress_and_duration, name='get_progress_and_duration'),  # Get progress
 
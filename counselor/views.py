@@ -16,12 +16,21 @@ from django.views import View
 from django.contrib.auth import get_user_model
 from django.views.decorators.csrf import csrf_exempt
 from counselor.templatetags.custom_filters import get
+from .course_tree import CourseTree
+from .passwords import LoginBusy, PasswordService
+from .progress_queue import ProgressQueue
+from .rate_limit import post_field, rate_limit, session_user
+from . import session_flags
+from .session_flags import CourseSessionFlags
 import logging
 logger = logging.getLogger(__name__)
 from django.shortcuts import HttpResponse,HttpResponseRedirect
 from django.db.models import Prefetch
 User = get_user_model()
 
+# Country courses listed on the course selection page
+COURSE_LIST = ['Germany', 'UK', 'USA', 'Singapore', 'Newzealand', 'Ireland', 'France', 'Dubai', 'Canada', 'Australia']
+
 def login_view(request):
     return render(request, 'login.html')
 
@@ -41,12 +50,9 @@ def icef_view(request):
     user_id = request.session.get('id')
     user = CounselorUser.objects.only('id', 'username', 'email').get(id=user_id)
     
-    # List of all courses
-    course_list = ['Germany', 'UK', 'USA', 'Singapore', 'Newzealand', 'Ireland', 'France', 'Dubai', 'Canada', 'Australia']
-    
     # Calculate course status for each course
     course_statuses = {}
-    for course_name in course_list:
+    for course_name in COURSE_LIST:
         try:
             course = CounselorCourse.objects.only('id', 'title').get(title=course_name)
             
@@ -139,13 +145,14 @@ def update_part_status(request, part_id):
         logger.error(f"Error updating part status: {str(e)}")
         return JsonResponse({'success': False, 'message': 'Internal server error'}, status=500)
 
+@rate_limit('login', account=post_field('Username'), template='login.html')
 def user_login(request):
     if request.method == "POST":
         username = request.POST.get('Username')
         password = request.POST.get('password')
         try:
             user = CounselorUser.objects.get(email=username)
-            if user.password == password:  # Use Django's password hashing in production
+            if PasswordService.verify(user, password):
                 # print(user.id)    
                 request.session['id'] = user.id
                 # messages.success(request, "Login successful!")
@@ -154,6 +161,10 @@ def user_login(request):
                 messages.error(request, "Incorrect password!")
         except CounselorUser.DoesNotExist:
             messages.error(request, "Username not found.")
+        except LoginBusy:
+            messages.error(request, "Too many sign-ins right now. Please try again in a moment.")
+            list(messages.get_messages(request))
+            return render(request, 'login.html', status=503)
     list(messages.get_messages(request))
     return render(request, 'login.html')
 
@@ -169,63 +180,21 @@ def user_signup(request):
             return redirect('counselor:user_signup')
         # Save user details
         try:
-            user = CounselorUser(username=username, email=email, password=password)
+            user = CounselorUser(username=username, email=email, password=PasswordService.hash(password))
             user.save()
             messages.success(request, "Registration successful! Please log in.")
             return redirect('counselor:login_view')  # Redirect to login page after successful signup
         except IntegrityError:
             messages.error(request, "The email or username is already in use. Please try another.")
             return redirect('counselor:user_signup')
+        except LoginBusy:
+            messages.error(request, "Too many sign-ins right now. Please try again in a moment.")
+            return redirect('counselor:user_signup')
     return render(request, 'register.html')
 
 def get_course_with_related_data(course_name):
-    course_with_related_data = []
-    try:
-        # Prefetch parts, their quizzes, questions, and answers
-    #     course_with_related_data = CounselorCourse.objects.prefetch_related(
-    #     'chapters__parts__quizzes__questions__answers'
-    # ).filter(
-    #     title=course_name
-    # ).first()
-
-        course_with_related_data = CounselorCourse.objects.prefetch_related(
-            Prefetch(
-                'chapters',
-                queryset=Chapter.objects.order_by('index')  # full data (or required fields) for chapters
-            ),
-            Prefetch(
-                'chapters__parts',
-                queryset=Part.objects.only('id','title','index','chapter_id')
-            ),
-            Prefetch(
-                'chapters__parts__quizzes',
-                queryset=Quiz.objects.all()
-            ),
-            Prefetch(
-                'chapters__parts__quizzes__questions',
-                queryset=Question.objects.all()
-            ),
-            Prefetch(
-                'chapters__parts__quizzes__questions__answers',
-                queryset=QuizAnswers.objects.all()
-            )
-        ).only('id', 'title').filter(
-            title=course_name
-        ).first()
-
-        # course_with_related_data = CounselorCourse.objects.prefetch_related(
-        #     Prefetch(
-        #         'chapters',
-        #         queryset=Chapter.objects.order_by('index')  # <-- order chapters by index
-        #     ),
-        #     'chapters__parts__quizzes__questions__answers'
-        # ).filter(
-        #     title=course_name
-        # ).first()
-        
-    except Chapter.DoesNotExist:
-        course_with_related_data = []
-    return course_with_related_data
+    # Shared with the V2 views: cached per content version, see counselor.course_tree
+    return CourseTree.get(course_name)
 
 def getUserProgress(user,course_with_related_data,course_name):
     total_parts=0
@@ -249,7 +218,7 @@ def getUserProgress(user,course_with_related_data,course_name):
         part_ids = [part.id for chapter in course_with_related_data.chapters.all() for part in chapter.parts.all()]
         total_parts = len(part_ids)
         # OPTIMIZATION: Single query with values_list instead of multiple queries
-        user_progress = list(CourseContentProgress.objects.filter(user=user).values_list('part_id', flat=True))
+        user_progress = list(ProgressQueue.completed_part_ids(user))  # Includes queued completions
         user_progress_quiz = {}
         
     except Exception as e:
@@ -500,7 +469,7 @@ def fetch_current_part(request,course_name,current_part_id,part_or_quiz):
             ).first()
 
     # Check if autocomplete is enabled for this course
-    autocomplete_enabled = request.session.get(f'autocomplete_{course_name}', False)
+    autocomplete_enabled = CourseSessionFlags.has(request.session, course, session_flags.AUTOCOMPLETE)
 
     # Get next part after current part
     next_part = None
@@ -1060,7 +1029,7 @@ class CounselorEnrolledCourseView(View):
     
         # show_part_id = next(iter(found))
         # Check if autocomplete is enabled for this course
-        autocomplete_enabled = request.session.get(f'autocomplete_{course_name}', False)
+        autocomplete_enabled = CourseSessionFlags.has(request.session, course, session_flags.AUTOCOMPLETE)
         
         # OPTIMIZATION: Cache all_parts_ordered to avoid repeated iterations
         # Get next part after current part
@@ -1194,6 +1163,12 @@ class CounselorEnrolledCourseView(View):
         return render(request, self.template_name, context)
 
 
+def _autocomplete_context(request, course_name):
+    # Rejected attempts are answered without loading the course
+    return {'course_name': course_name, 'course': {'title': course_name}}
+
+
+@rate_limit('master_password', account=session_user, template='quiz-autocomplete.html', context=_autocomplete_context)
 def quiz_autocomplete(request, course_name):
     """
     Autocomplete functionality activation - sets session flag for course.
@@ -1221,9 +1196,7 @@ def quiz_autocomplete(request, course_name):
             })
         
         # Password is correct, set session flag for this course
-        session_key = f'autocomplete_{course_name}'
-        request.session[session_key] = True
-        request.session.modified = True
+        CourseSessionFlags.set(request.session, course, session_flags.AUTOCOMPLETE)
         
         messages.success(
             request, 
@@ -1239,6 +1212,7 @@ def quiz_autocomplete(request, course_name):
     })
 
 
+@rate_limit('master_password', account=session_user, template='course-autocomplete.html', context=_autocomplete_context)
 def course_autocomplete(request, course_name):
     """
     Full course autocomplete functionality - marks all parts as complete and completes all quizzes.
@@ -1350,9 +1324,7 @@ def course_autocomplete(request, course_name):
                                 quizzes_completed += 1
                 
                 # Set session flag for full course autocomplete
-                session_key = f'course_autocomplete_{course_name}'
-                request.session[session_key] = True
-                request.session.modified = True
+                CourseSessionFlags.set(request.session, course, session_flags.COURSE_AUTOCOMPLETE)
                 
                 messages.success(
                     request,
@@ -0,0 +1,254 @@
+"""
+Async (ASGI) variants of the read-heavy learner views
+Independent reads (user, course, course tree, progress, quiz results,
+certificate, attempt state) are issued together with asyncio.gather through
+Django's async ORM; the business logic and template context are shared with
+views_v2 so both paths render identical pages.
+
+Enable with ASYNC_VIEWS=True and serve counselor_project.asgi:application
+with uvicorn or daphne.
+"""
+
+import asyncio
+import logging
+
+from asgiref.sync import sync_to_async
+from django.contrib import messages
+from django.shortcuts import redirect, render
+from django.views import View
+
+from .attempt_state import QuizAttemptState
+from .course_tree import CourseTree
+from .models import (
+    CounselorCertification, CounselorCourse, CounselorUser, Part, QuizResults
+)
+from .progress_queue import ProgressQueue
+from .views import COURSE_LIST
+from .views_v2 import (
+    CounselorEnrolledCourseViewV2, FetchCurrentPartViewV2, UserProgressService
+)
+
+logger = logging.getLogger(__name__)
+
+
+# ============================================================================
+# ASYNC LOADERS
+# ============================================================================
+
+async def _alist(queryset):
+    return [row async for row in queryset]
+
+
+async def aget_course_with_related_data(course_name):
+    """Async counterpart of CourseDataService.get_course_with_related_data"""
+    try:
+        # The cache lock may wait on another worker's rebuild, so run it off the loop
+        return await sync_to_async(CourseTree.get)(course_name)
+    except Exception as e:
+        logger.error(f"Error fetching course data: {str(e)}")
+        return None
+
+
+async def aget_scores(user_id, course_name):
+    """Quiz scores for the user in a course, looked up by title so it needs no course row"""
+    scores = await QuizResults.objects.filter(
+        user_id=user_id, course__title=course_name
+    ).values_list('scores', flat=True).afirst()
+    return scores if isinstance(scores, list) else []
+
+
+async def load_course_page_data(user_id, course_name):
+    """
+    Fetch everything the course/part pages read, concurrently
+    Returns: (user, course, course_with_related_data, progress_data, attempt_state, certificate)
+    """
+    user, course, course_with_related_data, user_progress, scores, certificate = await asyncio.gather(
+        CounselorUser.objects.only('id', 'username', 'email').aget(id=user_id),
+        CounselorCourse.objects.only('id', 'title').aget(title=course_name),
+        aget_course_with_related_data(course_name),
+        _alist(ProgressQueue.completed_part_ids(user_id)),
+        aget_scores(user_id, course_name),
+        CounselorCertification.objects.filter(user_id=user_id, course__title=course_name).afirst(),
+    )
+    if not course_with_related_data:
+        return user, course, None, None, None, certificate
+
+    # The attempt state is keyed by course id, so it is the only dependent read
+    attempt_state = await QuizAttemptState.aload(user_id, course.id)
+    progress_data = UserProgressService.build_progress_data(
+        user_id, course_with_related_data, user_progress, scores
+    )
+    return user, course, course_with_related_data, progress_data, attempt_state, certificate
+
+
+# ============================================================================
+# VIEW CLASSES
+# ============================================================================
+
+class AsyncCourseViewMixin:
+    """
+    Async dispatch with the same session check as the V2 views, plus access
+    to the sync view whose context building is reused
+    """
+    sync_view_class = None
+
+    def get_sync_view(self, request, *args, **kwargs):
+        view = self.sync_view_class()
+        view.setup(request, *args, **kwargs)
+        return view
+
+    async def dispatch(self, request, *args, **kwargs):
+        if not await request.session.aget('id'):
+            return redirect('counselor:login_view')
+        return await super().dispatch(request, *args, **kwargs)
+
+
+class CounselorEnrolledCourseViewAsync(AsyncCourseViewMixin, View):
+    """Async GET of CounselorEnrolledCourseViewV2; POST (quiz submission) is delegated"""
+    sync_view_class = CounselorEnrolledCourseViewV2
+    template_name = CounselorEnrolledCourseViewV2.template_name
+
+    async def get(self, request, *args, **kwargs):
+        """Handle GET request - Display course content"""
+        course_name = kwargs.get('course_name')
+        if not course_name:
+            return redirect('counselor:icef_view')
+
+        sync_view = self.get_sync_view(request, *args, **kwargs)
+        try:
+            user_id = await request.session.aget('id')
+            user, course, course_with_related_data, progress_data, attempt_state, certificate = (
+                await load_course_page_data(user_id, course_name)
+            )
+            if not course_with_related_data:
+                messages.error(request, "Course not found")
+                return redirect('counselor:icef_view')
+
+            context = await sync_to_async(sync_view.build_context)(
+                request, course_name, user, course, course_with_related_data,
+                progress_data, attempt_state, certificate=certificate
+            )
+            return await sync_to_async(render)(request, self.template_name, context)
+
+        except CounselorUser.DoesNotExist:
+            messages.error(request, "User not found")
+            return redirect('counselor:login_view')
+        except CounselorCourse.DoesNotExist:
+            messages.error(request, "Course not found")
+            return redirect('counselor:icef_view')
+        except Exception as e:
+            logger.error(f"Error in CounselorEnrolledCourseViewAsync.get: {str(e)}")
+            messages.error(request, "An error occurred. Please try again.")
+            return redirect('counselor:icef_view')
+
+    async def post(self, request, *args, **kwargs):
+        """Quiz submission is write-heavy and stays on the sync implementation"""
+        sync_view = self.get_sync_view(request, *args, **kwargs)
+        return await sync_to_async(sync_view.post)(request, *args, **kwargs)
+
+
+class FetchCurrentPartViewAsync(AsyncCourseViewMixin, View):
+    """Async GET of FetchCurrentPartViewV2"""
+    sync_view_class = FetchCurrentPartViewV2
+    template_name = FetchCurrentPartViewV2.template_name
+
+    async def get(self, request, *args, **kwargs):
+        """Handle GET request - Display specific part/quiz"""
+        course_name = kwargs.get('course_name')
+        current_part_id = kwargs.get('current_part_id')
+        part_or_quiz = kwargs.get('part_or_quiz', 1)  # 1 = part, 0 = quiz
+
+        sync_view = self.get_sync_view(request, *args, **kwargs)
+        try:
+            user_id = await request.session.aget('id')
+            user, course, course_with_related_data, progress_data, attempt_state, certificate = (
+                await load_course_page_data(user_id, course_name)
+            )
+            if not course_with_related_data:
+                messages.error(request, "Course not found")
+                return redirect('counselor:icef_view')
+
+            response = sync_view.introduction_redirect(
+                course_name, current_part_id, course_with_related_data, progress_data
+            )
+            if response is not None:
+                return response
+
+            context = await sync_to_async(sync_view.build_context)(
+                request, course_name, current_part_id, part_or_quiz, user, course,
+                course_with_related_data, progress_data, attempt_state, certificate=certificate
+            )
+            return await sync_to_async(render)(request, self.template_name, context)
+
+        except Exception as e:
+            logger.error(f"Error in FetchCurrentPartViewAsync.get: {str(e)}")
+            messages.error(request, "An error occurred. Please try again.")
+            return redirect('counselor:counselor_enrolled_course_param', course_name=course_name)
+
+
+async def icef_view_async(request):
+    """
+    Async icef_view: one batch of concurrent reads for all country courses
+    instead of a course tree prefetch per course
+    """
+    user_id = await request.session.aget('id')
+    if not user_id:
+        return redirect('counselor:login_view')
+
+    user, courses, certificates, completed_part_ids, course_scores, course_parts = await asyncio.gather(
+        CounselorUser.objects.only('id', 'username', 'email').aget(id=user_id),
+        _alist(CounselorCourse.objects.filter(title__in=COURSE_LIST).values_list('title', flat=True)),
+        _alist(
+            CounselorCertification.objects.filter(user_id=user_id, course__title__in=COURSE_LIST)
+            .values_list('course__title', 'grade', 'certificate_code', 'created_at')
+        ),
+        _alist(ProgressQueue.completed_part_ids(user_id)),
+        _alist(
+            QuizResults.objects.filter(user_id=user_id, course__title__in=COURSE_LIST)
+            .values_list('course__title', 'scores')
+        ),
+        _alist(
+            Part.objects.filter(chapter__course__title__in=COURSE_LIST)
+            .values_list('chapter__course__title', 'id')
+        ),
+    )
+
+    certificate_by_course = {row[0]: row for row in certificates}
+    scores_by_course = {title: scores for title, scores in course_scores}
+    part_ids_by_course = {}
+    for title, part_id in course_parts:
+        part_ids_by_course.setdefault(title, set()).add(part_id)
+    completed_part_ids = set(completed_part_ids)
+
+    course_statuses = {}
+    for course_name in COURSE_LIST:
+        certificate = certificate_by_course.get(course_name)
+        if course_name in courses and certificate:
+            _, grade, certificate_code, created_at = certificate
+            course_statuses[course_name] = {
+                'status': 'complete',
+                'has_certificate': True,
+                'certificate_code': certificate_code,
+                'grade': grade,
+                'issued_date': created_at.strftime('%d-%m-%Y')
+            }
+            continue
+
+        course_part_ids = part_ids_by_course.get(course_name, set())
+        scores = scores_by_course.get(course_name)
+        scores = scores if isinstance(scores, list) else []
+        has_progress = bool(course_part_ids & completed_part_ids) or any(
+            isinstance(score, dict) and score.get('part_id') in course_part_ids
+            for score in scores
+        )
+        course_statuses[course_name] = {
+            'status': 'inprocess' if has_progress else 'not_started',
+            'has_certificate': False
+        }
+
+    context = {
+        'course_statuses': course_statuses,
+        'user': user  # Pass user info for avatar display
+    }
+
+    return await sync_to_async(render)(request, 'icef-course.html', context)
@@ -0,0 +1,159 @@
+"""
+Streaming view for course video/audio assets
+Serves files from the static and media roots with byte-range (206) support
+and ETag/Last-Modified validators so seeking in the player only fetches the
+requested bytes. With MEDIA_STREAM_OFFLOAD set, the transfer is handed to the
+front-end web server (X-Accel-Redirect for nginx, X-Sendfile for
+Apache/lighttpd) and the worker is released immediately.
+"""
+
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe
+from django.views.decorators.http import require_http_methods
+
+STREAMABLE_EXTENSIONS = ('.mp4', '.m4v', '.webm', '.ogv', '.mp3', '.m4a', '.vtt')
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+BLOCK_SIZE = 256 * 1024
+
+
+class FileRange:
+    """
+    File object limited to `length` bytes from its current position
+    Keeps fileno() so a WSGI server's sendfile path (bounded by Content-Length)
+    still applies; read() stops at the range end when iterated in Python
+    """
+
+    def __init__(self, file, length):
+        self.file = file
+        self.remaining = length
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b''
+        size = self.remaining if size is None or size < 0 else min(size, self.remaining)
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def close(self):
+        self.file.close()
+
+
+def stream_roots():
+    """Directories the view may serve from, in lookup order"""
+    roots = [settings.STATIC_ROOT, *settings.STATICFILES_DIRS, settings.MEDIA_ROOT]
+    return [str(root) for root in roots if root]
+
+
+def find_stream_file(path):
+    if not path.lower().endswith(STREAMABLE_EXTENSIONS):
+        return None
+    for root in stream_roots():
+        try:
+            full_path = safe_join(root, path)
+        except SuspiciousFileOperation:
+            return None
+        if os.path.isfile(full_path):
+            return full_path
+    return None
+
+
+def parse_range(header, size):
+    """
+    (start, end) of a single satisfiable byte range, None to send the whole
+    file (no/unsupported header), or False when the range is unsatisfiable
+    """
+    match = RANGE_RE.match(header.strip()) if header else None
+    if not match or match.groups() == ('', ''):
+        return None  # Multi-range and malformed headers get the full file
+    start, end = match.groups()
+    if start == '':
+        # Suffix range: the last N bytes
+        length = int(end)
+        if length == 0:
+            return False
+        return max(0, size - length), size - 1
+    start = int(start)
+    end = min(int(end), size - 1) if end else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+def if_range_matches(request, etag, last_modified):
+    """A Range is honoured only if If-Range (when sent) still matches the file"""
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if not if_range:
+        return True
+    if if_range.startswith(('"', 'W/')):
+        return if_range == etag
+    return parse_http_date_safe(if_range) == last_modified
+
+
+def offload_response(full_path, content_type):
+    """Hand the transfer (ranges included) to the front-end web server"""
+    response = HttpResponse(content_type=content_type)
+    if getattr(settings, 'MEDIA_STREAM_OFFLOAD', '') == 'x-accel-redirect':
+        prefix = getattr(settings, 'MEDIA_STREAM_ACCEL_PREFIX', '/protected-media/').rstrip('/')
+        response['X-Accel-Redirect'] = quote(f'{prefix}{full_path}')
+    else:
+        response['X-Sendfile'] = full_path
+    return response
+
+
+@require_http_methods(["GET", "HEAD"])
+def stream_media(request, path):
+    """Serve a video/audio/caption file with Range, validators and optional offload"""
+    full_path = find_stream_file(path)
+    if not full_path:
+        raise Http404("Media file not found")
+
+    stat = os.stat(full_path)
+    size = stat.st_size
+    last_modified = int(stat.st_mtime)
+    etag = f'"{stat.st_mtime_ns:x}-{size:x}"'
+    content_type = mimetypes.guess_type(full_path)[0] or 'application/octet-stream'
+
+    # 304 for a matching If-None-Match/If-Modified-Since, 412 for failed preconditions
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        if getattr(settings, 'MEDIA_STREAM_OFFLOAD', ''):
+            response = offload_response(full_path, content_type)
+        else:
+            byte_range = None
+            if if_range_matches(request, etag, last_modified):
+                byte_range = parse_range(request.META.get('HTTP_RANGE'), size)
+
+            if byte_range is False:
+                response = HttpResponse(status=416)
+                response['Content-Range'] = f'bytes */{size}'
+            elif byte_range is None:
+                response = FileResponse(open(full_path, 'rb'), content_type=content_type)
+                response.block_size = BLOCK_SIZE
+            else:
+                start, end = byte_range
+                file = open(full_path, 'rb')
+                file.seek(start)
+                response = FileResponse(FileRange(file, end - start + 1), content_type=content_type, status=206)
+                response.block_size = BLOCK_SIZE
+                response['Content-Length'] = str(end - start + 1)
+                response['Content-Range'] = f'bytes {start}-{end}/{size}'
+
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    max_age = getattr(settings, 'MEDIA_STREAM_MAX_AGE', 60 * 60 * 24)
+    response['Cache-Control'] = f'public, max-age={max_age}'
+    return response
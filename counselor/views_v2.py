@@ -3,13 +3,13 @@ Production-ready views for Counselor Training Platform
 Following COURSE_FLOW_DOCUMENTATION.md specifications
 """
 
-import ast
 import json
 import logging
 from datetime import timedelta
 from django.db import IntegrityError, transaction
 from django.http import JsonResponse
 from django.shortcuts import render, get_object_or_404, redirect
+from django.urls import reverse
 from django.utils import timezone
 from django.views import View
 from django.views.decorators.http import require_http_methods
@@ -22,11 +22,28 @@ from .models import (
     CounselorCertification, CounselorUser, CourseOverviewSummary,
     Question, Quiz, Chapter, Part, QuizAnswers, QuizResults,
     CourseContentProgress, CounselorCourse, UserProgressTrack,
-    UserQuizAttemptTrack
+    UserQuizAttemptTrack, score_percent
 )
+from . import analytics
+from .analytics import EventLog
+from .attempt_state import QuizAttemptState
+from .cache import USER_PROGRESS, get_cache
+from .course_tree import CourseTree
+from .lesson_html import LessonHTML
+from . import session_flags
+from .session_flags import CourseSessionFlags
+from .progress_queue import ProgressQueue
+from .quiz_variants import QuizVariant
+from .search import SearchIndex
 
 logger = logging.getLogger(__name__)
 
+# Marker for optional arguments that the caller has not fetched yet
+NOT_LOADED = object()
+
+# Upper bound on part completions + quiz submissions in one batch request
+BATCH_MAX_ITEMS = 200
+
 
 # ============================================================================
 # SERVICE CLASSES - Business Logic Separation
@@ -35,32 +52,16 @@ logger = logging.getLogger(__name__)
 class CourseDataService:
     """Service for fetching and managing course data with optimizations"""
     
+    @staticmethod
+    def course_queryset(course_name):
+        """Queryset for a course with its full chapter/part/quiz tree prefetched"""
+        return CourseTree.queryset(course_name)
+    
     @staticmethod
     def get_course_with_related_data(course_name):
-        """Fetch course with all related data using optimized prefetch"""
+        """Course tree from the course_content cache (rebuilt once per content version)"""
         try:
-            return CounselorCourse.objects.prefetch_related(
-                Prefetch(
-                    'chapters',
-                    queryset=Chapter.objects.order_by('index')
-                ),
-                Prefetch(
-                    'chapters__parts',
-                    queryset=Part.objects.only('id', 'title', 'index', 'chapter_id', 'description')
-                ),
-                Prefetch(
-                    'chapters__parts__quizzes',
-                    queryset=Quiz.objects.all()
-                ),
-                Prefetch(
-                    'chapters__parts__quizzes__questions',
-                    queryset=Question.objects.all()
-                ),
-                Prefetch(
-                    'chapters__parts__quizzes__questions__answers',
-                    queryset=QuizAnswers.objects.all()
-                )
-            ).only('id', 'title').filter(title=course_name).first()
+            return CourseTree.get(course_name)
         except Exception as e:
             logger.error(f"Error fetching course data: {str(e)}")
             return None
@@ -69,12 +70,90 @@ class CourseDataService:
 class UserProgressService:
     """Service for managing user progress calculations"""
     
+    # Server-side copy of the per-render state (found / introduction_id) that
+    # quiz submissions need, so it no longer round-trips through the form
+    SNAPSHOT_TIMEOUT = 60 * 60
+    
+    @staticmethod
+    def snapshot_key(user_id, course_id):
+        return f'progress_snapshot:{user_id}:{course_id}'
+    
+    @staticmethod
+    def store_snapshot(user_id, course_id, found, introduction_id):
+        get_cache(USER_PROGRESS).set(
+            UserProgressService.snapshot_key(user_id, course_id),
+            {'found': found, 'introduction_id': introduction_id},
+            UserProgressService.SNAPSHOT_TIMEOUT
+        )
+    
+    @staticmethod
+    def get_snapshot(user_id, course):
+        """
+        Return {'found': {part_id: bool}, 'introduction_id': [part_id]} as of the
+        learner's last render, rebuilding it with two light queries on a miss
+        """
+        snapshot = get_cache(USER_PROGRESS).get(UserProgressService.snapshot_key(user_id, course.id))
+        if snapshot is not None:
+            return snapshot
+        
+        scores = QuizResults.objects.filter(
+            user_id=user_id, course=course
+        ).values_list('scores', flat=True).first()
+        scored_part_ids = {
+            score.get('part_id') for score in scores if isinstance(score, dict)
+        } if isinstance(scores, list) else set()
+        
+        found = {}
+        introduction_id = []
+        parts = Part.objects.filter(chapter__course=course).order_by(
+            'chapter__index', 'chapter_id', 'id'
+        ).values_list('id', 'title')
+        for part_id, title in parts:
+            if title == 'Introduction':
+                introduction_id.append(part_id)
+                found[part_id] = False
+            else:
+                found[part_id] = part_id in scored_part_ids
+        
+        UserProgressService.store_snapshot(user_id, course.id, found, introduction_id)
+        return {'found': found, 'introduction_id': introduction_id}
+    
+    @staticmethod
+    def get_completed_part_ids(user):
+        """Part IDs the user has marked complete (across all courses), queued ones included"""
+        return list(ProgressQueue.completed_part_ids(user))
+    
+    @staticmethod
+    def get_scores(user, course_id):
+        """Stored quiz scores for the user in a course ([] when none)"""
+        scores = QuizResults.objects.filter(
+            user_id=user, course_id=course_id
+        ).values_list('scores', flat=True).first()
+        return scores if isinstance(scores, list) else []
+    
     @staticmethod
     def get_user_progress(user, course_with_related_data, course_name):
         """
         Calculate user progress following documentation specifications
         Returns: progress_data dict with all calculated values
         """
+        try:
+            user_progress = UserProgressService.get_completed_part_ids(user)
+            scores = UserProgressService.get_scores(user, course_with_related_data.id)
+        except Exception as e:
+            logger.error(f"Error fetching user progress: {str(e)}")
+            user_progress, scores = [], []
+        
+        return UserProgressService.build_progress_data(
+            user, course_with_related_data, user_progress, scores
+        )
+    
+    @staticmethod
+    def build_progress_data(user, course_with_related_data, user_progress, scores):
+        """
+        Calculate progress_data from already fetched progress rows and scores
+        Shared by the sync views and the async views (which fetch concurrently)
+        """
         progress_data = {
             'total_parts': 0,
             'part_ids': [],
@@ -101,27 +180,8 @@ class UserProgressService:
             ]
             progress_data['total_parts'] = len(part_ids)
             progress_data['part_ids'] = part_ids
-            
-            # Get user's completed parts
-            progress_data['user_progress'] = list(
-                CourseContentProgress.objects.filter(user=user)
-                .values_list('part_id', flat=True)
-            )
-            
-            # Get quiz results
-            try:
-                course = CounselorCourse.objects.get(title=course_name)
-                quiz_result = QuizResults.objects.only('scores', 'user_id', 'course_id').get(
-                    user_id=user, course=course
-                )
-                if quiz_result:
-                    progress_data['scores'] = (
-                        quiz_result.scores 
-                        if isinstance(quiz_result.scores, list) 
-                        else []
-                    )
-            except QuizResults.DoesNotExist:
-                progress_data['scores'] = []
+            progress_data['user_progress'] = user_progress
+            progress_data['scores'] = scores
             
             # Process each part
             for chapter in course_with_related_data.chapters.all():
@@ -221,6 +281,10 @@ class UserProgressService:
                         complete_status.append(part_id)
             
             progress_data['complete_status'] = complete_status
+            UserProgressService.store_snapshot(
+                user, course_with_related_data.id,
+                progress_data['found'], progress_data['introduction_id']
+            )
             # Debug logging for Introduction completion
             if introduction_completed:
                 print(f"Introduction Parts Completed: {introduction_completed}")
@@ -241,9 +305,12 @@ class QuizAttemptService:
     """Service for managing quiz attempt tracking"""
     
     @staticmethod
-    def get_reattempt_status(user, course, part_id, found, introduction_id, user_progress=None, scores=None):
+    def get_reattempt_status(user, course, part_id, found, introduction_id, user_progress=None, scores=None,
+                             attempt_state=None):
         """
         Determine quiz re-attempt status following documentation
+        Attempt tracks come from the cached QuizAttemptState, so no query is
+        issued unless the state was invalidated by a quiz submission
         Returns: (resume_id, time_difference, no_of_attempt, window_closed_time)
         """
         resume_id = -1
@@ -264,28 +331,21 @@ class QuizAttemptService:
         elif len(found) == 0:
             resume_id = part_id
         else:
-            # Prefetch all attempt tracks in single query
-            part_ids = list(found.keys())
-            attempt_tracks = {
-                track.part_id: track 
-                for track in UserQuizAttemptTrack.objects.filter(
-                    user=user, 
-                    course=course,
-                    part_id__in=part_ids
-                ).only('part_id', 'no_of_attempt', 'window_closed_time')
-            }
+            if attempt_state is None:
+                attempt_state = QuizAttemptState.load(user, course)
+            attempts = attempt_state.attempts
             
             for key, value in found.items():
-                attempt_track = attempt_tracks.get(key)
+                attempt = attempts.get(key)
                 
-                if attempt_track:
-                    resume_id = attempt_track.part_id
+                if attempt:
+                    resume_id = key
                     
-                    if attempt_track.no_of_attempt == 3:
+                    if attempt[0] == 3:
                         no_of_attempt = 3
                         continue
-                    elif attempt_track.no_of_attempt == 2:
-                        window_closed_time = attempt_track.window_closed_time
+                    elif attempt[0] == 2:
+                        window_closed_time = attempt[1]
                         no_of_attempt = 2
                         break
                     else:
@@ -328,25 +388,25 @@ class CertificateService:
             return 'C'
     
     @staticmethod
-    def check_and_generate_certificate(user, course, progress_data):
+    def check_and_generate_certificate(user, course, progress_data, certificate=NOT_LOADED):
         """
         Check if certificate should be granted and generate if needed
+        Pass certificate (instance or None) when it was already fetched
         Returns: (certificate_grant, grade, issued_date, certificate_code)
         """
         try:
             # Check if certificate already exists
-            try:
-                certificate = CounselorCertification.objects.select_related(
-                    'user', 'course'
-                ).get(user=user, course=course)
+            if certificate is NOT_LOADED:
+                certificate = CounselorCertification.objects.filter(
+                    user=user, course=course
+                ).first()
+            if certificate is not None:
                 return (
                     True,
                     certificate.grade,
                     certificate.created_at.strftime('%d-%m-%Y'),
                     certificate.certificate_code
                 )
-            except CounselorCertification.DoesNotExist:
-                pass
             
             # Calculate completion
             total_parts = progress_data['total_parts'] - len(progress_data['introduction_id'])
@@ -383,6 +443,10 @@ class CertificateService:
                 certificate = CounselorCertification.objects.create(
                     user=user, course=course, grade=grade
                 )
+                EventLog.emit(
+                    analytics.CERTIFICATE_ISSUED, certificate.user_id, course.id,
+                    value=int(correct_questions / total_questions * 100) if total_questions else 0
+                )
                 
                 return (
                     True,
@@ -517,12 +581,11 @@ class QuizStatusService:
         return quiz_pass_status
     
     @staticmethod
-    def calculate_has_passed_status(user, course, answers_data):
+    def calculate_has_passed_status(user, course, answers_data, attempt_state=None):
         """Check if user has passed quiz (attempt track deleted = passed)"""
-        attempt_track_part_ids = set(
-            UserQuizAttemptTrack.objects.filter(user=user, course=course)
-            .values_list('part_id', flat=True)
-        )
+        if attempt_state is None:
+            attempt_state = QuizAttemptState.load(user, course)
+        attempt_track_part_ids = set(attempt_state.attempts)
         
         has_passed_quiz_status = {}
         for part_id in answers_data.keys():
@@ -554,6 +617,108 @@ class QuizStatusService:
         return show_next_button, show_reattempt_button
 
 
+class QuizSubmissionService:
+    """Service for grading quiz submissions and recording their outcome"""
+    
+    PASS_PERCENT = QuizResults.PASS_PERCENT
+    
+    @staticmethod
+    def grade_part(part_id, user_id, selected_answer_id):
+        """
+        Grade the learner's variant of every quiz of a part (see QuizVariant)
+        selected_answer_id(question_id) returns the submitted answer id (or None)
+        Returns: score entries in the QuizResults.scores format
+        """
+        return QuizVariant.grade(part_id, user_id, selected_answer_id)
+    
+    @staticmethod
+    def has_passed(part_scores):
+        """Pass/fail is decided by the first quiz of the part (as in summarize_scores)"""
+        if not part_scores:
+            return False
+        return score_percent(part_scores[0]) >= QuizSubmissionService.PASS_PERCENT
+    
+    @staticmethod
+    def save_scores(user, course, new_scores):
+        """Merge new score entries into the user's QuizResults row (one read, one write)"""
+        quiz_results, created = QuizResults.objects.update_or_create(
+            user=user, course=course
+        )
+        
+        if isinstance(quiz_results.scores, str) or not isinstance(quiz_results.scores, list):
+            quiz_results.scores = []
+        
+        for new_score in new_scores:
+            part_id = new_score["part_id"]
+            quiz_id = new_score["quiz_id"]
+            existing_score = next(
+                (score for score in quiz_results.scores 
+                 if score.get("part_id") == part_id and score.get("quiz_id") == quiz_id),
+                None
+            )
+            if existing_score:
+                existing_score.update(new_score)
+            else:
+                quiz_results.scores.append(new_score)
+        
+        quiz_results.save()
+        return quiz_results
+    
+    @staticmethod
+    def record_attempts(user, course, outcomes):
+        """
+        Update attempt tracks for {part_id: passed} following documentation:
+        passed deletes the track, a failure moves 1 -> 2 (opens the lockout
+        window) -> 3, or creates the track at 1
+        Uses one DELETE, one SELECT and at most one bulk UPDATE and INSERT
+        """
+        passed_part_ids = [part_id for part_id, passed in outcomes.items() if passed]
+        failed_part_ids = [part_id for part_id, passed in outcomes.items() if not passed]
+        
+        if passed_part_ids:
+            UserQuizAttemptTrack.objects.filter(
+                user=user, course=course, part_id__in=passed_part_ids
+            ).delete()
+        
+        if failed_part_ids:
+            existing = {
+                attempt.part_id: attempt
+                for attempt in UserQuizAttemptTrack.objects.filter(
+                    user=user, course=course, part_id__in=failed_part_ids
+                )
+            }
+            to_update = []
+            to_create = []
+            for part_id in failed_part_ids:
+                attempt = existing.get(part_id)
+                if attempt is None:
+                    to_create.append(UserQuizAttemptTrack(
+                        user=user, course=course, part_id=part_id, no_of_attempt=1
+                    ))
+                elif attempt.no_of_attempt == 1:
+                    attempt.no_of_attempt = 2
+                    attempt.window_closed_time = timezone.now()
+                    to_update.append(attempt)
+                elif attempt.no_of_attempt == 2:
+                    attempt.no_of_attempt = 3
+                    to_update.append(attempt)
+            if to_update:
+                UserQuizAttemptTrack.objects.bulk_update(
+                    to_update, ['no_of_attempt', 'window_closed_time']
+                )
+                for attempt in to_update:
+                    # The second failure opens the lockout window, the third fails the quiz
+                    event = analytics.ATTEMPT_LOCKED if attempt.no_of_attempt == 2 else analytics.QUIZ_FAILED
+                    EventLog.emit(
+                        event, attempt.user_id, attempt.course_id, attempt.part_id, attempt.no_of_attempt
+                    )
+            if to_create:
+                UserQuizAttemptTrack.objects.bulk_create(to_create)
+        
+        # bulk_create/bulk_update send no signals (see QuizAttemptState.connect_signals)
+        QuizAttemptState.invalidate(user, course)
+
+
 # ============================================================================
 # VIEW CLASSES - Clean Request/Response Handling
 # ============================================================================
@@ -605,230 +770,12 @@ class CounselorEnrolledCourseViewV2(View):
                 user_id, course_with_related_data, course_name
             )
             
-            # Calculate completion percentage
-            total_parts = progress_data['total_parts'] - len(progress_data['introduction_id'])
-            completed_parts = list(set(progress_data['part_ids']) & set(progress_data['user_progress']))
-            number_of_completed_parts = len(
-                list(set(completed_parts) - set(progress_data['introduction_id']))
-            )
-            completed_percent_value = int((number_of_completed_parts / total_parts) * 100) if total_parts > 0 else 0
-            
-            # Log course status to server console
-            print("COURSE STATUS - User Reached Course Page")
-            print("="*80)
-            print(f"User: {user.username} (ID: {user.id}, Email: {user.email})")
-            print(f"Course: {course_name}")
-            print(f"Total Parts: {progress_data['total_parts']} (excluding {len(progress_data['introduction_id'])} Introduction parts)")
-            print(f"Completed Parts: {number_of_completed_parts}/{total_parts} ({completed_percent_value}%)")
-            print(f"Introduction Parts: {len(progress_data['introduction_id'])} parts (IDs: {progress_data['introduction_id']})")
-            print(f"Parts with Quizzes: {len(progress_data['parts_with_quizzes'])} parts")
-            print(f"Quiz Results Found: {sum(1 for v in progress_data['found'].values() if v)} quizzes completed")
-            print(f"Complete Status: {len(progress_data['complete_status'])} parts fully completed")
-            print("-"*80)
-            
-            # Determine starting part (Step 2 from documentation)
-            first_part = PartNavigationService.get_first_part(course_with_related_data)
-            print(f"First Part: ID={first_part.id if first_part else None}, Title='{first_part.title if first_part else None}'")
-            print(f"User Progress: {len(progress_data.get('user_progress', []))} parts")
-            print(f"Quiz Scores: {len(progress_data.get('scores', []))} scores")
-            print(f"Found (quiz results): {len([v for v in progress_data['found'].values() if v])} completed quizzes")
+            attempt_state = QuizAttemptState.load(user, course)
             
-            show_part_id = PartNavigationService.determine_starting_part(
-                progress_data['found'],
-                progress_data['introduction_id'],
-                first_part,
-                progress_data.get('user_progress', []),
-                progress_data.get('scores', [])
+            context = self.build_context(
+                request, course_name, user, course, course_with_related_data,
+                progress_data, attempt_state
             )
-            
-            # If determine_starting_part returned None (Introduction completed, no incomplete parts found),
-            # find the next part after Introduction
-            if show_part_id is None and first_part and first_part.id in progress_data['introduction_id']:
-                if first_part.id in progress_data.get('user_progress', []):
-                    # Introduction is completed - get next part
-                    next_part = PartNavigationService.get_next_part(course_with_related_data, first_part.id)
-                    if next_part:
-                        show_part_id = next_part.id
-                    else:
-                        # No next part - course might be completed, but still show Introduction
-                        show_part_id = first_part.id
-            
-            print(f"Determined Starting Part ID: {show_part_id}")
-            print(f"Is Starting Part an Introduction? {show_part_id in progress_data['introduction_id'] if show_part_id else 'N/A'}")
-            
-            # Initialize quiz display
-            show_quiz_id = -1
-            quiz_completed = False
-            
-            # Check if part is completed and quiz status
-            # Introduction parts never have quizzes - skip all quiz logic for them
-            if (show_part_id and 
-                show_part_id in progress_data['complete_status'] and
-                show_part_id not in progress_data['introduction_id']):
-                # Only check quiz completion for non-Introduction parts
-                if show_part_id in progress_data['found'] and progress_data['found'][show_part_id]:
-                    # Check if part actually has quizzes before showing quiz
-                    part = Part.objects.prefetch_related('quizzes').filter(id=show_part_id).first()
-                    if part and part.quizzes.exists():
-                        quiz_completed = True
-                        show_quiz_id = show_part_id
-                    else:
-                        # Part has no quiz - keep show_quiz_id as -1 to show part content
-                        show_quiz_id = -1
-            
-            # Update resume tracking
-            if show_part_id:
-                try:
-                    part_obj = Part.objects.select_related('chapter').get(id=show_part_id)
-                    UserProgressTrack.objects.update_or_create(
-                        user=user,
-                        course=course,
-                        defaults={'resume_part': part_obj}
-                    )
-                    resume_chapter_id = part_obj.chapter.id
-                except Part.DoesNotExist:
-                    resume_chapter_id = course_with_related_data.chapters.all()[0].id
-            else:
-                resume_chapter_id = course_with_related_data.chapters.all()[0].id
-            
-            # Get re-attempt status
-            resume_id, time_difference, no_of_attempt, window_closed_time = (
-                QuizAttemptService.get_reattempt_status(
-                    user, course, show_part_id,
-                    progress_data['found'],
-                    progress_data['introduction_id'],
-                    progress_data.get('user_progress', []),
-                    progress_data.get('scores', [])
-                )
-            )
-            
-            # Override with resume_id if different
-            # CRITICAL: Never override if show_part_id is an Introduction part that's not completed
-            # This ensures Introduction parts are always shown first when not completed
-            if resume_id != show_part_id and resume_id != -1:
-                # Check if show_part_id is an Introduction part that's not completed
-                show_part_is_intro = show_part_id in progress_data['introduction_id'] if show_part_id else False
-                show_part_completed = show_part_id in progress_data['user_progress'] if show_part_id else False
-                
-                # Don't override if show_part_id is an incomplete Introduction part
-                if show_part_is_intro and not show_part_completed:
-                    # Keep show_part_id as the Introduction part
-                    pass
-                # Check if the resume_id part is an Introduction part
-                elif resume_id not in progress_data['introduction_id']:
-                    show_part_id = resume_id
-                    # Check if part has quizzes before setting show_quiz_id
-                    part = Part.objects.prefetch_related('quizzes').filter(id=resume_id).first()
-                    if part and part.quizzes.exists() and resume_id in progress_data['found'] and progress_data['found'][resume_id]:
-                        show_quiz_id = resume_id
-                        quiz_completed = True
-                    else:
-                        # Part has no quiz or quiz not completed - show part content
-                        show_quiz_id = -1
-                else:
-                    # For Introduction parts, keep show_quiz_id as -1
-                    show_part_id = resume_id
-                    show_quiz_id = -1
-            
-            # Get part and quiz content
-            part_content_testing = None
-            quiz_content_testing = None
-            if show_part_id:
-                try:
-                    part_content_testing = Part.objects.only(
-                        'id', 'title', 'description', 'index'
-                    ).get(id=show_part_id)
-                    print(f"✓ Part content fetched successfully: ID={part_content_testing.id}, Title='{part_content_testing.title}', Index={part_content_testing.index}")
-                    quiz_content_testing = Part.objects.prefetch_related(
-                        'quizzes__questions__answers'
-                    ).only('id').filter(id=show_part_id).first()
-                except Part.DoesNotExist as e:
-                    print(f"✗ ERROR: Part not found for show_part_id={show_part_id}: {str(e)}")
-                except Exception as e:
-                    print(f"✗ ERROR: Failed to fetch part content for show_part_id={show_part_id}: {str(e)}")
-            else:
-                print("✗ ERROR: show_part_id is None/0, cannot fetch part content!")
-            
-            # Get next part
-            next_part = PartNavigationService.get_next_part(
-                course_with_related_data, show_part_id
-            )
-            next_part_for_quiz = next_part if quiz_completed else None
-            
-            # Calculate quiz status (exclude Introduction parts - they have no quizzes)
-            quiz_answers_data = {
-                part_id: data 
-                for part_id, data in progress_data['answers_data'].items()
-                if part_id not in progress_data['introduction_id']
-            }
-            quiz_pass_status = QuizStatusService.calculate_quiz_pass_status(
-                quiz_answers_data
-            )
-            has_passed_quiz_status = QuizStatusService.calculate_has_passed_status(
-                user, course, quiz_answers_data
-            )
-            show_next_button, show_reattempt_button = QuizStatusService.determine_button_display(
-                quiz_completed, show_quiz_id, show_part_id, has_passed_quiz_status
-            )
-            
-            # Check certificate
-            certificate_grant, grade, issued_date, certificate_code = (
-                CertificateService.check_and_generate_certificate(
-                    user, course, progress_data
-                )
-            )
-            
-            # Get course title
-            course_title = ''
-            if course_name == 'UK':
-                course_title = 'UK Agent and Counsellor Training Course'
-            elif course_name == 'Germany':
-                course_title = 'Germany Agent and Counsellor Training Course'
-            
-            # Check autocomplete
-            autocomplete_enabled = request.session.get(f'autocomplete_{course_name}', False)
-            
-            # Build context
-            context = {
-                'course': course_with_related_data,
-                'scores': progress_data['scores'],
-                'found': progress_data['found'],
-                'answers_data': progress_data['answers_data'],
-                'part_scores': progress_data['part_scores'],
-                'correct_answers': progress_data['correct_answers'],
-                'incorrect_answers': progress_data['incorrect_answers'],
-                'complete_status': progress_data['complete_status'],
-                'course_title': course_title,
-                'certificate_grant': certificate_grant,
-                'issued_date': issued_date,
-                'certificate_code': certificate_code,
-                'grade': grade,
-                'user': user,  # Pass full user object for avatar display
-                'user_name': user.username,
-                'show_part_id': show_part_id,
-                'show_quiz_id': show_quiz_id,  # Keep -1 for template logic (template checks show_quiz_id == -1)
-                'resume_chapter_id': resume_chapter_id,
-                'total_parts': total_parts,
-                'number_of_completed_parts': number_of_completed_parts,
-                'completed_percent_value': completed_percent_value,
-                'part_content_testing': part_content_testing,
-                'quiz_content_testing': quiz_content_testing,
-                'no_of_attempt': no_of_attempt,
-                'time_difference': time_difference,
-                'window_closed_time': window_closed_time,
-                'introduction_id': progress_data['introduction_id'],
-                'autocomplete_enabled': autocomplete_enabled,
-                'course_name': course_name,
-                'next_part': next_part,
-                'quiz_completed': quiz_completed,
-                'next_part_for_quiz': next_part_for_quiz,
-                'quiz_pass_status': quiz_pass_status,
-                'has_passed_quiz_status': has_passed_quiz_status,
-                'show_next_button': show_next_button,
-                'show_reattempt_button': show_reattempt_button,
-                'debug': settings.DEBUG,
-            }
-            
             return render(request, self.template_name, context)
             
         except CounselorUser.DoesNotExist:
@@ -842,6 +789,245 @@ class CounselorEnrolledCourseViewV2(View):
             messages.error(request, "An error occurred. Please try again.")
             return redirect('counselor:icef_view')
     
+    def build_context(self, request, course_name, user, course, course_with_related_data,
+                      progress_data, attempt_state, certificate=NOT_LOADED):
+        """
+        Build the template context once user, course tree, progress and attempt
+        state are loaded (also used by CounselorEnrolledCourseViewAsync)
+        """
+        # Calculate completion percentage
+        total_parts = progress_data['total_parts'] - len(progress_data['introduction_id'])
+        completed_parts = list(set(progress_data['part_ids']) & set(progress_data['user_progress']))
+        number_of_completed_parts = len(
+            list(set(completed_parts) - set(progress_data['introduction_id']))
+        )
+        completed_percent_value = int((number_of_completed_parts / total_parts) * 100) if total_parts > 0 else 0
+        
+        # Log course status to server console
+        print("COURSE STATUS - User Reached Course Page")
+        print("="*80)
+        print(f"User: {user.username} (ID: {user.id}, Email: {user.email})")
+        print(f"Course: {course_name}")
+        print(f"Total Parts: {progress_data['total_parts']} (excluding {len(progress_data['introduction_id'])} Introduction parts)")
+        print(f"Completed Parts: {number_of_completed_parts}/{total_parts} ({completed_percent_value}%)")
+        print(f"Introduction Parts: {len(progress_data['introduction_id'])} parts (IDs: {progress_data['introduction_id']})")
+        print(f"Parts with Quizzes: {len(progress_data['parts_with_quizzes'])} parts")
+        print(f"Quiz Results Found: {sum(1 for v in progress_data['found'].values() if v)} quizzes completed")
+        print(f"Complete Status: {len(progress_data['complete_status'])} parts fully completed")
+        print("-"*80)
+        
+        # Determine starting part (Step 2 from documentation)
+        first_part = PartNavigationService.get_first_part(course_with_related_data)
+        print(f"First Part: ID={first_part.id if first_part else None}, Title='{first_part.title if first_part else None}'")
+        print(f"User Progress: {len(progress_data.get('user_progress', []))} parts")
+        print(f"Quiz Scores: {len(progress_data.get('scores', []))} scores")
+        print(f"Found (quiz results): {len([v for v in progress_data['found'].values() if v])} completed quizzes")
+        
+        show_part_id = PartNavigationService.determine_starting_part(
+            progress_data['found'],
+            progress_data['introduction_id'],
+            first_part,
+            progress_data.get('user_progress', []),
+            progress_data.get('scores', [])
+        )
+        
+        # If determine_starting_part returned None (Introduction completed, no incomplete parts found),
+        # find the next part after Introduction
+        if show_part_id is None and first_part and first_part.id in progress_data['introduction_id']:
+            if first_part.id in progress_data.get('user_progress', []):
+                # Introduction is completed - get next part
+                next_part = PartNavigationService.get_next_part(course_with_related_data, first_part.id)
+                if next_part:
+                    show_part_id = next_part.id
+                else:
+                    # No next part - course might be completed, but still show Introduction
+                    show_part_id = first_part.id
+        
+        print(f"Determined Starting Part ID: {show_part_id}")
+        print(f"Is Starting Part an Introduction? {show_part_id in progress_data['introduction_id'] if show_part_id else 'N/A'}")
+        
+        # Initialize quiz display
+        show_quiz_id = -1
+        quiz_completed = False
+        
+        # Check if part is completed and quiz status
+        # Introduction parts never have quizzes - skip all quiz logic for them
+        if (show_part_id and 
+            show_part_id in progress_data['complete_status'] and
+            show_part_id not in progress_data['introduction_id']):
+            # Only check quiz completion for non-Introduction parts
+            if show_part_id in progress_data['found'] and progress_data['found'][show_part_id]:
+                # Check if part actually has quizzes before showing quiz
+                part = Part.objects.prefetch_related('quizzes').filter(id=show_part_id).first()
+                if part and part.quizzes.exists():
+                    quiz_completed = True
+                    show_quiz_id = show_part_id
+                else:
+                    # Part has no quiz - keep show_quiz_id as -1 to show part content
+                    show_quiz_id = -1
+        
+        # Update resume tracking (the part comes from the cached course tree, so
+        # no query loads the lesson columns here)
+        resume_part = next((
+            part for part in PartNavigationService.get_ordered_parts(course_with_related_data)
+            if part.id == show_part_id
+        ), None) if show_part_id else None
+        if resume_part is not None:
+            UserProgressTrack.objects.update_or_create(
+                user=user,
+                course=course,
+                defaults={'resume_part_id': resume_part.id}
+            )
+            resume_chapter_id = resume_part.chapter_id
+        else:
+            resume_chapter_id = course_with_related_data.chapters.all()[0].id
+        
+        # Get re-attempt status (cached attempt state, shared with quiz status below)
+        resume_id, time_difference, no_of_attempt, window_closed_time = (
+            QuizAttemptService.get_reattempt_status(
+                user, course, show_part_id,
+                progress_data['found'],
+                progress_data['introduction_id'],
+                progress_data.get('user_progress', []),
+                progress_data.get('scores', []),
+                attempt_state=attempt_state
+            )
+        )
+        unlock_at = QuizAttemptState.unlock_time(window_closed_time)
+        
+        # Override with resume_id if different
+        # CRITICAL: Never override if show_part_id is an Introduction part that's not completed
+        # This ensures Introduction parts are always shown first when not completed
+        if resume_id != show_part_id and resume_id != -1:
+            # Check if show_part_id is an Introduction part that's not completed
+            show_part_is_intro = show_part_id in progress_data['introduction_id'] if show_part_id else False
+            show_part_completed = show_part_id in progress_data['user_progress'] if show_part_id else False
+            
+            # Don't override if show_part_id is an incomplete Introduction part
+            if show_part_is_intro and not show_part_completed:
+                # Keep show_part_id as the Introduction part
+                pass
+            # Check if the resume_id part is an Introduction part
+            elif resume_id not in progress_data['introduction_id']:
+                show_part_id = resume_id
+                # Check if part has quizzes before setting show_quiz_id
+                part = Part.objects.prefetch_related('quizzes').filter(id=resume_id).first()
+                if part and part.quizzes.exists() and resume_id in progress_data['found'] and progress_data['found'][resume_id]:
+                    show_quiz_id = resume_id
+                    quiz_completed = True
+                else:
+                    # Part has no quiz or quiz not completed - show part content
+                    show_quiz_id = -1
+            else:
+                # For Introduction parts, keep show_quiz_id as -1
+                show_part_id = resume_id
+                show_quiz_id = -1
+        
+        # Get part and quiz content
+        part_content_testing = None
+        quiz_content_testing = None
+        if show_part_id:
+            try:
+                part_content_testing = Part.objects.only(
+                    'id', 'title', 'description_hash', 'index'
+                ).get(id=show_part_id)
+                print(f"✓ Part content fetched successfully: ID={part_content_testing.id}, Title='{part_content_testing.title}', Index={part_content_testing.index}")
+                # The learner's variant of the part's quizzes, from the cached question bank
+                quiz_content_testing = QuizVariant.for_part(show_part_id, user.id)
+            except Part.DoesNotExist as e:
+                print(f"✗ ERROR: Part not found for show_part_id={show_part_id}: {str(e)}")
+            except Exception as e:
+                print(f"✗ ERROR: Failed to fetch part content for show_part_id={show_part_id}: {str(e)}")
+        else:
+            print("✗ ERROR: show_part_id is None/0, cannot fetch part content!")
+        
+        # Get next part
+        next_part = PartNavigationService.get_next_part(
+            course_with_related_data, show_part_id
+        )
+        next_part_for_quiz = next_part if quiz_completed else None
+        
+        # Calculate quiz status (exclude Introduction parts - they have no quizzes)
+        quiz_answers_data = {
+            part_id: data 
+            for part_id, data in progress_data['answers_data'].items()
+            if part_id not in progress_data['introduction_id']
+        }
+        quiz_pass_status = QuizStatusService.calculate_quiz_pass_status(
+            quiz_answers_data
+        )
+        has_passed_quiz_status = QuizStatusService.calculate_has_passed_status(
+            user, course, quiz_answers_data, attempt_state=attempt_state
+        )
+        show_next_button, show_reattempt_button = QuizStatusService.determine_button_display(
+            quiz_completed, show_quiz_id, show_part_id, has_passed_quiz_status
+        )
+        
+        # Check certificate
+        certificate_grant, grade, issued_date, certificate_code = (
+            CertificateService.check_and_generate_certificate(
+                user, course, progress_data, certificate=certificate
+            )
+        )
+        
+        # Get course title
+        course_title = ''
+        if course_name == 'UK':
+            course_title = 'UK Agent and Counsellor Training Course'
+        elif course_name == 'Germany':
+            course_title = 'Germany Agent and Counsellor Training Course'
+        
+        # Check autocomplete
+        autocomplete_enabled = CourseSessionFlags.has(request.session, course, session_flags.AUTOCOMPLETE)
+        
+        # Build context
+        context = {
+            'course': course_with_related_data,
+            'scores': progress_data['scores'],
+            'found': progress_data['found'],
+            'answers_data': progress_data['answers_data'],
+            'part_scores': progress_data['part_scores'],
+            'correct_answers': progress_data['correct_answers'],
+            'incorrect_answers': progress_data['incorrect_answers'],
+            'complete_status': progress_data['complete_status'],
+            'course_title': course_title,
+            'certificate_grant': certificate_grant,
+            'issued_date': issued_date,
+            'certificate_code': certificate_code,
+            'grade': grade,
+            'user': user,  # Pass full user object for avatar display
+            'user_name': user.username,
+            'show_part_id': show_part_id,
+            'show_quiz_id': show_quiz_id,  # Keep -1 for template logic (template checks show_quiz_id == -1)
+            'resume_chapter_id': resume_chapter_id,
+            'total_parts': total_parts,
+            'number_of_completed_parts': number_of_completed_parts,
+            'completed_percent_value': completed_percent_value,
+            'part_content_testing': part_content_testing,
+            'part_html': LessonHTML.for_part(part_content_testing),
+            'quiz_content_testing': quiz_content_testing,
+            'no_of_attempt': no_of_attempt,
+            'time_difference': time_difference,
+            'window_closed_time': window_closed_time,
+            'unlock_at': unlock_at,
+            'attempt_state': attempt_state.as_dict(),
+            'introduction_id': progress_data['introduction_id'],
+            'autocomplete_enabled': autocomplete_enabled,
+            'course_name': course_name,
+            'next_part': next_part,
+            'quiz_completed': quiz_completed,
+            'next_part_for_quiz': next_part_for_quiz,
+            'quiz_pass_status': quiz_pass_status,
+            'has_passed_quiz_status': has_passed_quiz_status,
+            'show_next_button': show_next_button,
+            'show_reattempt_button': show_reattempt_button,
+            'debug': settings.DEBUG,
+        }
+        
+        if part_content_testing is not None and show_quiz_id == -1:
+            EventLog.emit(analytics.PART_VIEWED, user.id, course.id, part_content_testing.id)
+        return context
+    
     def post(self, request, *args, **kwargs):
         """Handle POST request - Process quiz submission"""
         try:
@@ -866,43 +1052,17 @@ class CounselorEnrolledCourseViewV2(View):
             if not course_name:
                 return JsonResponse({'success': False, 'message': 'Course name is required'}, status=400)
             
-            # Parse found and introduction_id
-            found = {}
-            found_str = request.POST.get('found', '{}')
-            if found_str and found_str.strip():
-                try:
-                    found = ast.literal_eval(found_str)
-                    if not isinstance(found, dict):
-                        found = {}
-                except (ValueError, SyntaxError):
-                    try:
-                        found = json.loads(found_str)
-                        if not isinstance(found, dict):
-                            found = {}
-                    except (ValueError, json.JSONDecodeError):
-                        found = {}
-            
-            introduction_id = []
-            introduction_id_list = request.POST.getlist('introduction_id')
-            if introduction_id_list and introduction_id_list[0]:
-                try:
-                    introduction_id = ast.literal_eval(introduction_id_list[0])
-                    if not isinstance(introduction_id, list):
-                        introduction_id = []
-                except (ValueError, SyntaxError, IndexError):
-                    try:
-                        introduction_id = json.loads(introduction_id_list[0])
-                        if not isinstance(introduction_id, list):
-                            introduction_id = []
-                    except (ValueError, json.JSONDecodeError, IndexError):
-                        introduction_id = []
-            
             # Get user and course
             user_id = request.session.get('id')
             user = get_object_or_404(CounselorUser, id=user_id)
             course = get_object_or_404(CounselorCourse, title=course_name)
             part = get_object_or_404(Part, id=part_id)
             
+            # found / introduction_id come from the server-side progress snapshot
+            snapshot = UserProgressService.get_snapshot(user_id, course)
+            found = snapshot['found']
+            introduction_id = snapshot['introduction_id']
+            
             # Validate: Introduction parts cannot have quizzes
             if part.title == 'Introduction':
                 return JsonResponse({
@@ -910,135 +1070,42 @@ class CounselorEnrolledCourseViewV2(View):
                     'message': 'Introduction parts do not have quizzes'
                 }, status=400)
             
-            # Process quiz answers
-            results = {}
-            results[part.id] = {'quiz_results': [], 'correct_count': 0, 'incorrect_count': 0}
-            
-            for quiz in part.quizzes.all():
-                total_questions_each_quiz = quiz.questions.count()
-                correct_answers_map = {}
-                
-                for question in quiz.questions.all():
-                    user_answer_id = request.POST.get(f'question_{question.id}')
-                    user_answer = None
-                    if user_answer_id:
-                        try:
-                            user_answer = QuizAnswers.objects.get(id=user_answer_id)
-                        except QuizAnswers.DoesNotExist:
-                            pass
-                    
-                    correct_answer = question.answers.filter(is_correct=True).first()
-                    is_correct = user_answer == correct_answer if user_answer else False
-                    
-                    if is_correct:
-                        results[part.id]['correct_count'] += 1
-                    else:
-                        results[part.id]['incorrect_count'] += 1
-                    
-                    correct_answers_map[f'ques_{question.id}'] = {
-                        'correct_ans': correct_answer.answer_text if correct_answer else None,
-                        'selected_ans': user_answer.answer_text if user_answer else None,
-                    }
-                
-                results[part.id]['quiz_results'].append({
-                    'quiz_id': quiz.id,
-                    'total_questions_in_quiz': total_questions_each_quiz,
-                    'correct_option': correct_answers_map,
-                    'quiz_result': {
-                        'correct_answers': results[part.id]['correct_count'],
-                        'incorrect_answers': results[part.id]['incorrect_count'],
-                    }
-                })
-            
-            # Save quiz results
+            # Grade the learner's quiz variant against the cached answer key
+            part_scores = QuizSubmissionService.grade_part(
+                part.id, user.id, lambda question_id: request.POST.get(f'question_{question_id}')
+            )
             data = {
                 "userId": user_id,
-                "scores": []
+                "scores": part_scores
             }
             
-            for part_id, part_results in results.items():
-                for quiz in part_results['quiz_results']:
-                    score_info = {
-                        "part_id": part_id,
-                        "quiz_id": quiz["quiz_id"],
-                        "total_questions_in_quiz": quiz["total_questions_in_quiz"],
-                        "correct_option": quiz["correct_option"],
-                        "quiz_result": {
-                            "correct_answers": quiz['quiz_result']['correct_answers'],
-                            "incorrect_answers": quiz['quiz_result']['incorrect_answers'],
-                        },
-                    }
-                    data['scores'].append(score_info)
-            
-            quiz_results, created = QuizResults.objects.update_or_create(
-                user=user, course=course
+            # Save quiz results and handle attempt tracking (following documentation)
+            QuizSubmissionService.save_scores(user, course, data['scores'])
+            QuizSubmissionService.record_attempts(
+                user, course, {part.id: QuizSubmissionService.has_passed(part_scores)}
+            )
+            EventLog.emit(
+                analytics.QUIZ_SUBMITTED, user.id, course.id, part.id, analytics.score_percent(part_scores)
             )
-            
-            if isinstance(quiz_results.scores, str) or not isinstance(quiz_results.scores, list):
-                quiz_results.scores = []
-            
-            for new_score in data["scores"]:
-                part_id = new_score["part_id"]
-                quiz_id = new_score["quiz_id"]
-                existing_score = next(
-                    (score for score in quiz_results.scores 
-                     if score.get("part_id") == part_id and score.get("quiz_id") == quiz_id),
-                    None
-                )
-                if existing_score:
-                    existing_score.update(new_score)
-                else:
-                    quiz_results.scores.append(new_score)
-            
-            quiz_results.save()
-            
-            # Calculate pass/fail
-            quiz = results[part.id]['quiz_results'][0] if results[part.id]['quiz_results'] else {}
-            score_percent = 0
-            if quiz:
-                score_percent = int((
-                    quiz['quiz_result']['correct_answers'] / 
-                    quiz["total_questions_in_quiz"]
-                ) * 100)
-            
-            score_pass = 1 if score_percent >= 60 else 0
-            
-            # Handle attempt tracking (following documentation)
-            if score_pass == 1:
-                # Passed: delete attempt track
-                UserQuizAttemptTrack.objects.filter(
-                    user=user, course=course, part=part
-                ).delete()
-            else:
-                # Failed: update or create attempt track
-                try:
-                    attempt = UserQuizAttemptTrack.objects.get(
-                        user=user, course=course, part=part
-                    )
-                    if attempt.no_of_attempt == 1:
-                        attempt.no_of_attempt = 2
-                        attempt.window_closed_time = timezone.now()
-                    elif attempt.no_of_attempt == 2:
-                        attempt.no_of_attempt = 3
-                    attempt.save()
-                except UserQuizAttemptTrack.DoesNotExist:
-                    UserQuizAttemptTrack.objects.create(
-                        user=user, course=course, part=part, no_of_attempt=1
-                    )
             
             # Get re-attempt status
             show_part_id = int(request.POST.get('show_part_id', 0))
+            attempt_state = QuizAttemptState.load(user, course)
             resume_id, time_difference, no_of_attempt, window_closed_time = (
                 QuizAttemptService.get_reattempt_status(
-                    user, course, show_part_id, found, introduction_id
+                    user, course, show_part_id, found, introduction_id,
+                    attempt_state=attempt_state
                 )
             )
             
+            unlock_at = QuizAttemptState.unlock_time(window_closed_time)
             response_data = {
                 'scores': data['scores'],
                 'no_of_attempt': no_of_attempt,
                 'time_difference': time_difference.total_seconds() if time_difference else None,
                 'window_closed_time': window_closed_time.isoformat() if window_closed_time else None,
+                'unlock_at': unlock_at.isoformat() if unlock_at else None,
+                'attempt_state': attempt_state.as_dict(),
                 'success': True
             }
             
@@ -1099,239 +1166,270 @@ class FetchCurrentPartViewV2(View):
                 user_id, course_with_related_data, course_name
             )
             
-            # Calculate completion
-            total_parts = progress_data['total_parts'] - len(progress_data['introduction_id'])
-            completed_parts = list(set(progress_data['part_ids']) & set(progress_data['user_progress']))
-            number_of_completed_parts = len(
-                list(set(completed_parts) - set(progress_data['introduction_id']))
+            # Completed Introduction parts redirect to the next part
+            response = self.introduction_redirect(
+                course_name, current_part_id, course_with_related_data, progress_data
             )
-            completed_percent_value = int((number_of_completed_parts / total_parts) * 100) if total_parts > 0 else 0
-            
-            # Log course status to server console
-            print("COURSE STATUS - User Navigated to Part")
-            print("="*80)
-            print(f"User: {user.username} (ID: {user.id}, Email: {user.email})")
-            print(f"Course: {course_name}")
-            print(f"Navigating to Part ID: {current_part_id}, part_or_quiz: {part_or_quiz} ({'Quiz' if part_or_quiz == 0 else 'Content'})")
-            print(f"Total Parts: {progress_data['total_parts']} (excluding {len(progress_data['introduction_id'])} Introduction parts)")
-            print(f"Completed Parts: {number_of_completed_parts}/{total_parts} ({completed_percent_value}%)")
-            print("-"*80)
+            if response is not None:
+                return response
             
-            # Check if user is trying to access a completed Introduction part
-            # If so, redirect to the next part instead
-            is_introduction = current_part_id in progress_data['introduction_id']
-            if is_introduction:
-                introduction_completed = current_part_id in progress_data.get('user_progress', [])
-                if introduction_completed:
-                    # Introduction is completed - get next part and redirect
-                    next_part = PartNavigationService.get_next_part(
-                        course_with_related_data, current_part_id
-                    )
-                    if next_part:
-                        # Redirect to next part
-                        return redirect('counselor:fetch_current_part', 
-                                      course_name=course_name,
-                                      current_part_id=next_part.id,
-                                      part_or_quiz=1)
-                    else:
-                        # No next part - redirect to course overview
-                        return redirect('counselor:counselor_enrolled_course_param', course_name=course_name)
-            
-            # Determine what to show
-            show_part_id = current_part_id
-            show_quiz_id = -1
-            quiz_completed = False
+            attempt_state = QuizAttemptState.load(user, course)
             
-            # Handle part_or_quiz parameter (Step 5 from documentation)
-            # Introduction parts never have quizzes, so skip quiz logic for them
-            
-            # Check if quiz is completed (only for non-Introduction parts)
-            if not is_introduction and current_part_id in progress_data['found'] and progress_data['found'][current_part_id]:
-                quiz_completed = True
+            context = self.build_context(
+                request, course_name, current_part_id, part_or_quiz, user, course,
+                course_with_related_data, progress_data, attempt_state
+            )
+            return render(request, self.template_name, context)
             
-            if part_or_quiz == 0:  # Accessing quiz
-                if not is_introduction and current_part_id in progress_data['complete_status']:
-                    # Check if part actually has quizzes before showing quiz
-                    part = Part.objects.prefetch_related('quizzes').filter(id=current_part_id).first()
-                    if part and part.quizzes.exists():
-                        # Part completed and has quiz - quiz accessible
-                        show_quiz_id = current_part_id
-                    else:
-                        # Part has no quiz - show part content instead
-                        show_quiz_id = -1
-                        show_part_id = current_part_id
+        except Exception as e:
+            logger.error(f"Error in FetchCurrentPartViewV2.get: {str(e)}")
+            messages.error(request, "An error occurred. Please try again.")
+            return redirect('counselor:counselor_enrolled_course_param', course_name=course_name)
+    
+    @staticmethod
+    def introduction_redirect(course_name, current_part_id, course_with_related_data, progress_data):
+        """Redirect away from an already completed Introduction part, else None"""
+        if current_part_id in progress_data['introduction_id']:
+            introduction_completed = current_part_id in progress_data.get('user_progress', [])
+            if introduction_completed:
+                # Introduction is completed - get next part and redirect
+                next_part = PartNavigationService.get_next_part(
+                    course_with_related_data, current_part_id
+                )
+                if next_part:
+                    # Redirect to next part
+                    return redirect('counselor:fetch_current_part', 
+                                  course_name=course_name,
+                                  current_part_id=next_part.id,
+                                  part_or_quiz=1)
+                else:
+                    # No next part - redirect to course overview
+                    return redirect('counselor:counselor_enrolled_course_param', course_name=course_name)
+        return None
+    
+    def build_context(self, request, course_name, current_part_id, part_or_quiz, user, course,
+                      course_with_related_data, progress_data, attempt_state, certificate=NOT_LOADED):
+        """
+        Build the template context once user, course tree, progress and attempt
+        state are loaded (also used by FetchCurrentPartViewAsync)
+        """
+        # Calculate completion
+        total_parts = progress_data['total_parts'] - len(progress_data['introduction_id'])
+        completed_parts = list(set(progress_data['part_ids']) & set(progress_data['user_progress']))
+        number_of_completed_parts = len(
+            list(set(completed_parts) - set(progress_data['introduction_id']))
+        )
+        completed_percent_value = int((number_of_completed_parts / total_parts) * 100) if total_parts > 0 else 0
+        
+        # Log course status to server console
+        print("COURSE STATUS - User Navigated to Part")
+        print("="*80)
+        print(f"User: {user.username} (ID: {user.id}, Email: {user.email})")
+        print(f"Course: {course_name}")
+        print(f"Navigating to Part ID: {current_part_id}, part_or_quiz: {part_or_quiz} ({'Quiz' if part_or_quiz == 0 else 'Content'})")
+        print(f"Total Parts: {progress_data['total_parts']} (excluding {len(progress_data['introduction_id'])} Introduction parts)")
+        print(f"Completed Parts: {number_of_completed_parts}/{total_parts} ({completed_percent_value}%)")
+        print("-"*80)
+        
+        is_introduction = current_part_id in progress_data['introduction_id']
+        
+        # Determine what to show
+        show_part_id = current_part_id
+        show_quiz_id = -1
+        quiz_completed = False
+        
+        # Handle part_or_quiz parameter (Step 5 from documentation)
+        # Introduction parts never have quizzes, so skip quiz logic for them
+        
+        # Check if quiz is completed (only for non-Introduction parts)
+        if not is_introduction and current_part_id in progress_data['found'] and progress_data['found'][current_part_id]:
+            quiz_completed = True
+        
+        if part_or_quiz == 0:  # Accessing quiz
+            if not is_introduction and current_part_id in progress_data['complete_status']:
+                # Check if part actually has quizzes before showing quiz
+                part = Part.objects.prefetch_related('quizzes').filter(id=current_part_id).first()
+                if part and part.quizzes.exists():
+                    # Part completed and has quiz - quiz accessible
+                    show_quiz_id = current_part_id
                 else:
-                    # Quiz locked or Introduction part, show part content
+                    # Part has no quiz - show part content instead
                     show_quiz_id = -1
                     show_part_id = current_part_id
-            else:  # Viewing part content (part_or_quiz=1)
-                # When viewing part content, always show part content first
-                # Only show quiz if explicitly requested (part_or_quiz=0)
-                # For Introduction parts, always keep show_quiz_id as -1
-                if not is_introduction:
-                    # Check if part has quiz and is completed
-                    part = Part.objects.prefetch_related('quizzes').filter(id=current_part_id).first()
-                    # Only auto-show quiz if part is completed AND has quiz AND quiz is already completed
-                    # Otherwise, show part content (show_quiz_id stays -1)
-                    if part and part.quizzes.exists() and current_part_id in progress_data['complete_status'] and quiz_completed:
-                        # Part completed, has quiz, and quiz is completed - show quiz results
-                        show_quiz_id = current_part_id
-                    else:
-                        # Show part content (not quiz)
-                        show_quiz_id = -1
-                # For Introduction parts, always keep show_quiz_id as -1
-            
-            # Get part and quiz content
-            part_content_testing = None
-            quiz_content_testing = None
-            
-            if show_part_id:
-                try:
-                    # Fetch part with chapter relationship and required fields for template
-                    # Use select_related to get chapter, but don't use .only() to ensure all fields are available
-                    part_content_testing = Part.objects.select_related('chapter').get(id=show_part_id)
-                    resume_chapter_id = part_content_testing.chapter.id
-                except Part.DoesNotExist:
-                    resume_chapter_id = course_with_related_data.chapters.all()[0].id
-                    part_content_testing = None
-                
-                quiz_content_testing = Part.objects.prefetch_related(
-                    'quizzes__questions__answers'
-                ).only('id').filter(id=show_part_id).first()
             else:
+                # Quiz locked or Introduction part, show part content
+                show_quiz_id = -1
+                show_part_id = current_part_id
+        else:  # Viewing part content (part_or_quiz=1)
+            # When viewing part content, always show part content first
+            # Only show quiz if explicitly requested (part_or_quiz=0)
+            # For Introduction parts, always keep show_quiz_id as -1
+            if not is_introduction:
+                # Check if part has quiz and is completed
+                part = Part.objects.prefetch_related('quizzes').filter(id=current_part_id).first()
+                # Only auto-show quiz if part is completed AND has quiz AND quiz is already completed
+                # Otherwise, show part content (show_quiz_id stays -1)
+                if part and part.quizzes.exists() and current_part_id in progress_data['complete_status'] and quiz_completed:
+                    # Part completed, has quiz, and quiz is completed - show quiz results
+                    show_quiz_id = current_part_id
+                else:
+                    # Show part content (not quiz)
+                    show_quiz_id = -1
+            # For Introduction parts, always keep show_quiz_id as -1
+        
+        # Get part and quiz content
+        part_content_testing = None
+        quiz_content_testing = None
+        
+        if show_part_id:
+            try:
+                # Fetch part with chapter relationship and required fields for template
+                # The description columns are deferred: the lesson body comes from LessonHTML
+                part_content_testing = Part.objects.select_related('chapter').defer(
+                    'description', 'rendered_description'
+                ).get(id=show_part_id)
+                resume_chapter_id = part_content_testing.chapter.id
+            except Part.DoesNotExist:
                 resume_chapter_id = course_with_related_data.chapters.all()[0].id
+                part_content_testing = None
             
-            # Get re-attempt status
-            resume_id, time_difference, no_of_attempt, window_closed_time = (
-                QuizAttemptService.get_reattempt_status(
-                    user, course, current_part_id,
-                    progress_data['found'],
-                    progress_data['introduction_id'],
-                    progress_data.get('user_progress', []),
-                    progress_data.get('scores', [])
-                )
-            )
-            
-            # Get next part
-            next_part = PartNavigationService.get_next_part(
-                course_with_related_data, show_part_id
+            quiz_content_testing = QuizVariant.for_part(show_part_id, user.id)
+        else:
+            resume_chapter_id = course_with_related_data.chapters.all()[0].id
+        
+        # Get re-attempt status (cached attempt state, shared with quiz status below)
+        resume_id, time_difference, no_of_attempt, window_closed_time = (
+            QuizAttemptService.get_reattempt_status(
+                user, course, current_part_id,
+                progress_data['found'],
+                progress_data['introduction_id'],
+                progress_data.get('user_progress', []),
+                progress_data.get('scores', []),
+                attempt_state=attempt_state
             )
-            next_part_for_quiz = next_part if quiz_completed else None
-            
-            # Log current part and next part information
-            print(f"Final show_part_id: {show_part_id}")
-            print(f"Final show_quiz_id: {show_quiz_id}")
-            
-            if show_part_id:
+        )
+        unlock_at = QuizAttemptState.unlock_time(window_closed_time)
+        
+        # Get next part
+        next_part = PartNavigationService.get_next_part(
+            course_with_related_data, show_part_id
+        )
+        next_part_for_quiz = next_part if quiz_completed else None
+        
+        # Log current part and next part information
+        print(f"Final show_part_id: {show_part_id}")
+        print(f"Final show_quiz_id: {show_quiz_id}")
+        
+        if show_part_id:
+            try:
+                current_part = Part.objects.only('id', 'title').get(id=show_part_id)
+                is_intro = show_part_id in progress_data['introduction_id']
+                print(f"Current Part: ID={show_part_id}, Title='{current_part.title}' ({'Introduction' if is_intro else 'Regular'})")
+                
+                # Check if part_content_testing will be available
                 try:
-                    current_part = Part.objects.only('id', 'title').get(id=show_part_id)
-                    is_intro = show_part_id in progress_data['introduction_id']
-                    print(f"Current Part: ID={show_part_id}, Title='{current_part.title}' ({'Introduction' if is_intro else 'Regular'})")
-                    
-                    # Check if part_content_testing will be available
-                    try:
-                        part_test = Part.objects.only('id', 'title', 'description', 'index').get(id=show_part_id)
-                        print(f"Part Content Available: Yes (Title: '{part_test.title}', Index: {part_test.index}, Description: {bool(part_test.description)})")
-                    except Exception as e:
-                        print(f"Part Content Available: No - {str(e)}")
+                    part_test = Part.objects.only('id', 'title', 'description_hash', 'index').get(id=show_part_id)
+                    print(f"Part Content Available: Yes (Title: '{part_test.title}', Index: {part_test.index}, Description: {bool(part_test.description_hash)})")
                 except Exception as e:
-                    print(f"Current Part: ID={show_part_id} (details not available - {str(e)})")
-            else:
-                print("ERROR: show_part_id is None or 0 - No part will be displayed!")
-            
-            if next_part:
-                print(f"Next Part: ID={next_part.id}, Title='{next_part.title}'")
-            else:
-                print("Next Part: None (course completed or last part)")
-            
-            # Log quiz status if applicable
-            if show_quiz_id != -1:
-                print(f"Quiz Status: Showing quiz for part ID={show_quiz_id}, Completed={quiz_completed}")
-            else:
-                print(f"Quiz Status: No quiz (show_quiz_id={show_quiz_id})")
-            
-            print("="*80 + "\n")
-            
-            # Calculate quiz status (exclude Introduction parts - they have no quizzes)
-            quiz_answers_data = {
-                part_id: data 
-                for part_id, data in progress_data['answers_data'].items()
-                if part_id not in progress_data['introduction_id']
-            }
-            quiz_pass_status = QuizStatusService.calculate_quiz_pass_status(
-                quiz_answers_data
-            )
-            has_passed_quiz_status = QuizStatusService.calculate_has_passed_status(
-                user, course, quiz_answers_data
-            )
-            show_next_button, show_reattempt_button = QuizStatusService.determine_button_display(
-                quiz_completed, show_quiz_id, show_part_id, has_passed_quiz_status
-            )
-            
-            # Check certificate
-            certificate_grant, grade, issued_date, certificate_code = (
-                CertificateService.check_and_generate_certificate(
-                    user, course, progress_data
-                )
+                    print(f"Part Content Available: No - {str(e)}")
+            except Exception as e:
+                print(f"Current Part: ID={show_part_id} (details not available - {str(e)})")
+        else:
+            print("ERROR: show_part_id is None or 0 - No part will be displayed!")
+        
+        if next_part:
+            print(f"Next Part: ID={next_part.id}, Title='{next_part.title}'")
+        else:
+            print("Next Part: None (course completed or last part)")
+        
+        # Log quiz status if applicable
+        if show_quiz_id != -1:
+            print(f"Quiz Status: Showing quiz for part ID={show_quiz_id}, Completed={quiz_completed}")
+        else:
+            print(f"Quiz Status: No quiz (show_quiz_id={show_quiz_id})")
+        
+        print("="*80 + "\n")
+        
+        # Calculate quiz status (exclude Introduction parts - they have no quizzes)
+        quiz_answers_data = {
+            part_id: data 
+            for part_id, data in progress_data['answers_data'].items()
+            if part_id not in progress_data['introduction_id']
+        }
+        quiz_pass_status = QuizStatusService.calculate_quiz_pass_status(
+            quiz_answers_data
+        )
+        has_passed_quiz_status = QuizStatusService.calculate_has_passed_status(
+            user, course, quiz_answers_data, attempt_state=attempt_state
+        )
+        show_next_button, show_reattempt_button = QuizStatusService.determine_button_display(
+            quiz_completed, show_quiz_id, show_part_id, has_passed_quiz_status
+        )
+        
+        # Check certificate
+        certificate_grant, grade, issued_date, certificate_code = (
+            CertificateService.check_and_generate_certificate(
+                user, course, progress_data, certificate=certificate
             )
-            
-            # Get course title
-            course_title = ''
-            if course_name == 'UK':
-                course_title = 'UK Agent and Counsellor Training Course'
-            elif course_name == 'Germany':
-                course_title = 'Germany Agent and Counsellor Training Course'
-            
-            # Check autocomplete
-            autocomplete_enabled = request.session.get(f'autocomplete_{course_name}', False)
-            
-            # Build context
-            context = {
-                'course': course_with_related_data,
-                'scores': progress_data['scores'],
-                'found': progress_data['found'],
-                'answers_data': progress_data['answers_data'],
-                'part_scores': progress_data['part_scores'],
-                'correct_answers': progress_data['correct_answers'],
-                'incorrect_answers': progress_data['incorrect_answers'],
-                'complete_status': progress_data['complete_status'],
-                'course_title': course_title,
-                'certificate_grant': certificate_grant,
-                'issued_date': issued_date,
-                'certificate_code': certificate_code,
-                'grade': grade,
-                'user': user,  # Pass full user object for avatar display
-                'user_name': user.username,
-                'show_part_id': show_part_id,
-                'show_quiz_id': show_quiz_id,  # Keep -1 for template logic (template checks show_quiz_id == -1)
-                'resume_chapter_id': resume_chapter_id,
-                'total_parts': total_parts,
-                'number_of_completed_parts': number_of_completed_parts,
-                'completed_percent_value': completed_percent_value,
-                'part_content_testing': part_content_testing,
-                'quiz_content_testing': quiz_content_testing,
-                'no_of_attempt': no_of_attempt,
-                'time_difference': time_difference,
-                'window_closed_time': window_closed_time,
-                'introduction_id': progress_data['introduction_id'],
-                'autocomplete_enabled': autocomplete_enabled,
-                'course_name': course_name,
-                'next_part': next_part,
-                'quiz_completed': quiz_completed,
-                'next_part_for_quiz': next_part_for_quiz,
-                'quiz_pass_status': quiz_pass_status,
-                'has_passed_quiz_status': has_passed_quiz_status,
-                'show_next_button': show_next_button,
-                'show_reattempt_button': show_reattempt_button,
-                'debug': settings.DEBUG,
-            }
-            
-            return render(request, self.template_name, context)
-            
-        except Exception as e:
-            logger.error(f"Error in FetchCurrentPartViewV2.get: {str(e)}")
-            messages.error(request, "An error occurred. Please try again.")
-            return redirect('counselor:counselor_enrolled_course_param', course_name=course_name)
+        )
+        
+        # Get course title
+        course_title = ''
+        if course_name == 'UK':
+            course_title = 'UK Agent and Counsellor Training Course'
+        elif course_name == 'Germany':
+            course_title = 'Germany Agent and Counsellor Training Course'
+        
+        # Check autocomplete
+        autocomplete_enabled = CourseSessionFlags.has(request.session, course, session_flags.AUTOCOMPLETE)
+        
+        # Build context
+        context = {
+            'course': course_with_related_data,
+            'scores': progress_data['scores'],
+            'found': progress_data['found'],
+            'answers_data': progress_data['answers_data'],
+            'part_scores': progress_data['part_scores'],
+            'correct_answers': progress_data['correct_answers'],
+            'incorrect_answers': progress_data['incorrect_answers'],
+            'complete_status': progress_data['complete_status'],
+            'course_title': course_title,
+            'certificate_grant': certificate_grant,
+            'issued_date': issued_date,
+            'certificate_code': certificate_code,
+            'grade': grade,
+            'user': user,  # Pass full user object for avatar display
+            'user_name': user.username,
+            'show_part_id': show_part_id,
+            'show_quiz_id': show_quiz_id,  # Keep -1 for template logic (template checks show_quiz_id == -1)
+            'resume_chapter_id': resume_chapter_id,
+            'total_parts': total_parts,
+            'number_of_completed_parts': number_of_completed_parts,
+            'completed_percent_value': completed_percent_value,
+            'part_content_testing': part_content_testing,
+            'part_html': LessonHTML.for_part(part_content_testing),
+            'quiz_content_testing': quiz_content_testing,
+            'no_of_attempt': no_of_attempt,
+            'time_difference': time_difference,
+            'window_closed_time': window_closed_time,
+            'unlock_at': unlock_at,
+            'attempt_state': attempt_state.as_dict(),
+            'introduction_id': progress_data['introduction_id'],
+            'autocomplete_enabled': autocomplete_enabled,
+            'course_name': course_name,
+            'next_part': next_part,
+            'quiz_completed': quiz_completed,
+            'next_part_for_quiz': next_part_for_quiz,
+            'quiz_pass_status': quiz_pass_status,
+            'has_passed_quiz_status': has_passed_quiz_status,
+            'show_next_button': show_next_button,
+            'show_reattempt_button': show_reattempt_button,
+            'debug': settings.DEBUG,
+        }
+        
+        if part_content_testing is not None and show_quiz_id == -1:
+            EventLog.emit(analytics.PART_VIEWED, user.id, course.id, part_content_testing.id)
+        return context
 
 
 # Keep existing utility functions for backward compatibility
@@ -1355,8 +1453,17 @@ def update_part_status(request, part_id):
     if not request.session.get('id'):
         return JsonResponse({'success': False, 'message': 'Unauthorized'}, status=403)
     
+    user_id = request.session.get('id')
+    if ProgressQueue.enabled():
+        # Write-behind: acknowledge now, flush_progress_queue upserts later
+        try:
+            ProgressQueue.enqueue(user_id, part_id)
+        except IntegrityError:
+            return JsonResponse({'success': False, 'message': 'Part not found'}, status=404)
+        EventLog.emit(analytics.PART_COMPLETED, user_id, part_id=part_id)
+        return JsonResponse({'success': True, 'message': 'Part marked as complete', 'queued': True})
+    
     try:
-        user_id = request.session.get('id')
         Counselor_user = CounselorUser.objects.get(id=user_id)
         part = Part.objects.get(id=part_id)
         
@@ -1372,6 +1479,7 @@ def update_part_status(request, part_id):
         )
         
         print(f"Progress Entry: {'Created' if created else 'Updated'}, completed={progress.completed}")
+        EventLog.emit(analytics.PART_COMPLETED, user_id, part_id=part.id)
         
         # Verify it was saved
         saved = CourseContentProgress.objects.filter(user=Counselor_user, part_id=part).first()
@@ -1391,3 +1499,162 @@ def update_part_status(request, part_id):
         print(f"✗ ERROR: Exception occurred: {str(e)}")
         logger.error(f"Error updating part status: {str(e)}")
         return JsonResponse({'success': False, 'message': 'Internal server error'}, status=500)
+
+
+@require_http_methods(["POST"])
+def batch_progress_update(request):
+    """
+    Apply several part completions and quiz submissions in one request
+    Body (JSON):
+        {"course_name": "UK",
+         "completed_parts": [12, 13],
+         "quizzes": [{"part_id": 14, "answers": {"<question_id>": <answer_id>}}]}
+    Everything is written in one transaction with bulk statements; the
+    response carries per-quiz results and the updated progress summary
+    """
+    if not request.session.get('id'):
+        return JsonResponse({'success': False, 'message': 'Unauthorized'}, status=403)
+    
+    try:
+        payload = json.loads(request.body or b'{}')
+        course_name = payload.get('course_name', '')
+        completed_part_ids = {int(part_id) for part_id in payload.get('completed_parts', [])}
+        quiz_submissions = {
+            int(submission['part_id']): dict(submission.get('answers') or {})
+            for submission in payload.get('quizzes', [])
+        }
+    except (ValueError, TypeError, KeyError, AttributeError):
+        return JsonResponse({'success': False, 'message': 'Invalid request data'}, status=400)
+    
+    if not course_name:
+        return JsonResponse({'success': False, 'message': 'Course name is required'}, status=400)
+    if len(completed_part_ids) + len(quiz_submissions) > BATCH_MAX_ITEMS:
+        return JsonResponse({
+            'success': False,
+            'message': f'At most {BATCH_MAX_ITEMS} items per batch'
+        }, status=400)
+    
+    user_id = request.session.get('id')
+    user = get_object_or_404(CounselorUser, id=user_id)
+    course = CounselorCourse.objects.filter(title=course_name).first()
+    if course is None:
+        return JsonResponse({'success': False, 'message': 'Course not found'}, status=404)
+    
+    try:
+        # One query validates every referenced part against the course
+        course_parts = dict(
+            Part.objects.filter(chapter__course=course).values_list('id', 'title')
+        )
+        unknown_part_ids = (completed_part_ids | set(quiz_submissions)) - set(course_parts)
+        if unknown_part_ids:
+            return JsonResponse({
+                'success': False,
+                'message': 'Parts not found in this course',
+                'part_ids': sorted(unknown_part_ids)
+            }, status=404)
+        if any(course_parts[part_id] == 'Introduction' for part_id in quiz_submissions):
+            return JsonResponse({
+                'success': False,
+                'message': 'Introduction parts do not have quizzes'
+            }, status=400)
+        
+        quiz_results = []
+        with transaction.atomic():
+            if completed_part_ids:
+                ProgressQueue.record(user_id, completed_part_ids)
+                EventLog.emit_many(analytics.PART_COMPLETED, user_id, completed_part_ids, course.id)
+            
+            if quiz_submissions:
+                new_scores = []
+                outcomes = {}
+                for part_id in sorted(quiz_submissions):
+                    answers = quiz_submissions[part_id]
+                    part_scores = QuizSubmissionService.grade_part(
+                        part_id, user_id, lambda question_id: answers.get(str(question_id))
+                    )
+                    outcomes[part_id] = QuizSubmissionService.has_passed(part_scores)
+                    new_scores.extend(part_scores)
+                    EventLog.emit(
+                        analytics.QUIZ_SUBMITTED, user_id, course.id, part_id,
+                        analytics.score_percent(part_scores)
+                    )
+                    quiz_results.append({
+                        'part_id': part_id,
+                        'passed': outcomes[part_id],
+                        'scores': part_scores,
+                    })
+                
+                QuizSubmissionService.save_scores(user, course, new_scores)
+                QuizSubmissionService.record_attempts(user, course, outcomes)
+        
+        # Progress summary, computed the same way as the course page
+        introduction_ids = {part_id for part_id, title in course_parts.items() if title == 'Introduction'}
+        total_parts = len(course_parts) - len(introduction_ids)
+        completed_parts = (
+            set(UserProgressService.get_completed_part_ids(user_id)) & set(course_parts)
+        ) - introduction_ids
+        attempt_state = QuizAttemptState.load(user, course)
+        
+        return JsonResponse({
+            'success': True,
+            'completed_parts': sorted(completed_part_ids),
+            'quizzes': quiz_results,
+            'progress': {
+                'total_parts': total_parts,
+                'number_of_completed_parts': len(completed_parts),
+                'completed_percent_value': int((len(completed_parts) / total_parts) * 100) if total_parts > 0 else 0,
+            },
+            'attempt_state': attempt_state.as_dict(),
+        })
+    except Exception as e:
+        logger.error(f"Error in batch_progress_update: {str(e)}")
+        return JsonResponse({'success': False, 'message': 'Internal server error'}, status=500)
+
+
+@require_http_methods(["GET"])
+def search_content(request):
+    """
+    Full-text search over lessons, overview points and quiz questions
+    GET ?q=visa financial requirements[&course=UK][&limit=20]
+    """
+    if not request.session.get('id'):
+        return JsonResponse({'success': False, 'message': 'Unauthorized'}, status=403)
+    if not SearchIndex.enabled():
+        return JsonResponse({'success': False, 'message': 'Search is not available'}, status=503)
+    
+    query = request.GET.get('q', '').strip()
+    try:
+        limit = min(max(int(request.GET.get('limit', 20)), 1), 50)
+    except ValueError:
+        limit = 20
+    course_id = None
+    course_name = request.GET.get('course')
+    if course_name:
+        course_id = CounselorCourse.objects.filter(title=course_name).values_list('id', flat=True).first()
+        if course_id is None:
+            return JsonResponse({'success': False, 'message': 'Course not found'}, status=404)
+    
+    try:
+        results = SearchIndex.search(query, course_id=course_id, limit=limit)
+    except Exception as e:
+        logger.error(f"Error in search_content: {str(e)}")
+        return JsonResponse({'success': False, 'message': 'Search is not available'}, status=503)
+    
+    # Links into the course pages; one query for the course titles
+    titles = dict(
+        CounselorCourse.objects.filter(id__in={result['course_id'] for result in results}).values_list('id', 'title')
+    )
+    for result in results:
+        course_title = titles.get(result['course_id'])
+        result['course'] = course_title
+        if course_title is None:
+            result['url'] = None
+        elif result['part_id'] is None:
+            result['url'] = reverse('counselor:course_overview', args=[course_title])
+        else:
+            # part_or_quiz: 1 opens the lesson, 0 its quiz
+            result['url'] = reverse(
+                'counselor:fetch_current_part',
+                args=[course_title, result['part_id'], 0 if result['kind'] == 'question' else 1]
+            )
+    return JsonResponse({'success': True, 'query': query, 'results': results})
@@ -45,6 +45,38 @@ ALLOWED_HOSTS = config('ALLOWED_HOSTS', default='*').split(',')
 # Master Password for Quiz Autocomplete
 MASTER_PASSWORD = config('MASTER_PASSWORD', default='admin123')
 
+# Serve the async variants of the course views (run under uvicorn/daphne)
+ASYNC_VIEWS = config('ASYNC_VIEWS', default=False, cast=bool)
+
+# Queue update_part_status beacons and upsert them in batches
+# (drain with `python manage.py flush_progress_queue --interval 2`)
+PROGRESS_WRITE_BEHIND = config('PROGRESS_WRITE_BEHIND', default=False, cast=bool)
+
+# Learner analytics events (counselor.analytics): buffered per worker and written
+# to LearnerEvent by a background thread every ANALYTICS_FLUSH_INTERVAL seconds
+# or once ANALYTICS_BATCH_SIZE events are waiting
+ANALYTICS_ENABLED = config('ANALYTICS_ENABLED', default=True, cast=bool)
+ANALYTICS_BATCH_SIZE = config('ANALYTICS_BATCH_SIZE', default=500, cast=int)
+ANALYTICS_FLUSH_INTERVAL = config('ANALYTICS_FLUSH_INTERVAL', default=5, cast=float)
+ANALYTICS_BUFFER_MAX = config('ANALYTICS_BUFFER_MAX', default=50000, cast=int)
+
+# Video/caption streaming (counselor:stream_media): Range requests are served by
+# Django unless offloaded to the web server with 'x-accel-redirect' (nginx,
+# needs `location <prefix> { internal; alias /; }`) or 'x-sendfile'
+MEDIA_STREAM_OFFLOAD = config('MEDIA_STREAM_OFFLOAD', default='')
+MEDIA_STREAM_ACCEL_PREFIX = config('MEDIA_STREAM_ACCEL_PREFIX', default='/protected-media/')
+MEDIA_STREAM_MAX_AGE = config('MEDIA_STREAM_MAX_AGE', default=60 * 60 * 24, cast=int)
+
+# Sessions: 'cached_db' serves reads from the cache and only writes the session
+# row when the session changes; 'cache' skips the database entirely (needs a
+# shared cache such as Redis when running more than one process)
+SESSION_ENGINE = config('SESSION_ENGINE', default='django.contrib.sessions.backends.cached_db')
+SESSION_CACHE_ALIAS = config('SESSION_CACHE_ALIAS', default='default')
+
+# Preload course trees and lesson HTML in each WSGI/ASGI worker at startup
+# (deploys with Redis can run `manage.py warm_caches` once instead)
+WARM_CACHES_ON_STARTUP = config('WARM_CACHES_ON_STARTUP', default=False, cast=bool)
+
 
 # Application definition
 
@@ -54,7 +86,7 @@ INSTALLED_APPS = [
     'django.contrib.contenttypes',
     'django.contrib.sessions',
     'django.contrib.messages',
-    'django.contrib.staticfiles',
+    'counselor.staticfiles.CounselorStaticFilesConfig',  # django.contrib.staticfiles + excludes
     'counselor',
     'nested_admin',
     'ckeditor',
@@ -120,9 +152,69 @@ DATABASES = {
         'PASSWORD': config('DB_PASSWORD', default='User_001'),
         'HOST': config('DB_HOST', default='43.205.138.85'),
         'PORT': config('DB_PORT', default='3306'),
+        # Reuse connections across requests (seconds; 0 closes after every
+        # request) and ping a reused connection once per request, so a
+        # connection dropped by MySQL's wait_timeout is replaced, not surfaced
+        'CONN_MAX_AGE': config('DB_CONN_MAX_AGE', default=60, cast=int),
+        'CONN_HEALTH_CHECKS': config('DB_CONN_HEALTH_CHECKS', default=True, cast=bool),
     }
 }
 
+# In-process connection pool (pip install django-db-connection-pool[mysql]).
+# Use it under ASGI, where the ORM runs in executor threads and per-thread
+# persistent connections are not reliably reused or closed
+if config('DB_POOL', default=False, cast=bool):
+    DATABASES['default'].update({
+        'ENGINE': 'dj_db_conn_pool.backends.mysql',
+        'CONN_MAX_AGE': 0,  # Connections go back to the pool after each request
+        'POOL_OPTIONS': {
+            'POOL_SIZE': config('DB_POOL_SIZE', default=10, cast=int),
+            'MAX_OVERFLOW': config('DB_POOL_MAX_OVERFLOW', default=10, cast=int),
+            'RECYCLE': config('DB_POOL_RECYCLE', default=60 * 30, cast=int),
+            'PRE_PING': config('DB_CONN_HEALTH_CHECKS', default=True, cast=bool),
+        },
+    })
+
+# Caches: one per kind of data so they can be sized, expired and cleared
+# independently (counselor.cache). CACHE_BACKEND is 'redis' (CACHE_LOCATION=
+# redis://host:6379/1, needs the redis package) or 'locmem' (per process).
+# More than one worker or host needs Redis: cache locks, namespace version
+# bumps and rate-limit counters rely on its atomic add/incr, and with a
+# noeviction or volatile-* maxmemory-policy it never evicts the keys stored
+# without a timeout (namespace versions). 'file' is for a single process only:
+# its add/incr are read-then-write and it culls random entries past MAX_ENTRIES
+CACHE_BACKEND = config('CACHE_BACKEND', default='locmem')
+CACHE_LOCATION = config('CACHE_LOCATION', default=(
+    'redis://127.0.0.1:6379/1' if CACHE_BACKEND == 'redis' else os.path.join(BASE_DIR, 'django_cache')
+))
+CACHE_BACKENDS = {
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    'file': 'django.core.cache.backends.filebased.FileBasedCache',
+    'redis': 'django.core.cache.backends.redis.RedisCache',
+}
+CACHE_TIMEOUTS = {
+    'default': 60 * 5,
+    'course_content': 60 * 60,
+    'user_progress': 60 * 60,
+    'fragments': 60 * 60 * 24,
+    'rate_limits': 60 * 15,
+}
+CACHES = {}
+for alias, timeout in CACHE_TIMEOUTS.items():
+    CACHES[alias] = {
+        'BACKEND': CACHE_BACKENDS[CACHE_BACKEND],
+        'TIMEOUT': timeout,
+        'KEY_PREFIX': alias,
+    }
+    if CACHE_BACKEND == 'locmem':
+        CACHES[alias]['LOCATION'] = alias
+        CACHES[alias]['OPTIONS'] = {'MAX_ENTRIES': 5000}
+    elif CACHE_BACKEND == 'file':
+        CACHES[alias]['LOCATION'] = os.path.join(CACHE_LOCATION, alias)
+        CACHES[alias]['OPTIONS'] = {'MAX_ENTRIES': 5000}
+    else:
+        CACHES[alias]['LOCATION'] = CACHE_LOCATION
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -142,6 +234,52 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Password hashing (counselor.hashers / counselor.passwords). The work factor
+# is tunable per deployment; `python -m benchmarks.bench_login` prints the
+# cost per hash. Hashes with another work factor are upgraded on login.
+# Django's own pbkdf2_sha256 hasher is deliberately not listed: it shares the
+# algorithm name and its fixed iteration count would win hash lookups.
+PASSWORD_HASHERS = [
+    'counselor.hashers.CounselorPBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+PASSWORD_HASH_ITERATIONS = config('PASSWORD_HASH_ITERATIONS', default=600000, cast=int)
+# Threads per process that hash passwords; logins wait at most LOGIN_HASH_TIMEOUT
+# seconds for one, and at most LOGIN_HASH_QUEUE wait at a time, before getting
+# a "try again" page
+LOGIN_HASH_WORKERS = config('LOGIN_HASH_WORKERS', default=2, cast=int)
+LOGIN_HASH_QUEUE = config('LOGIN_HASH_QUEUE', default=8, cast=int)
+LOGIN_HASH_TIMEOUT = config('LOGIN_HASH_TIMEOUT', default=5, cast=float)
+
+# Sliding-window limits on the credential forms, checked before the view runs:
+# (attempts, period in seconds) per client IP and per account, counted in the
+# rate_limits cache. Counts are only exact across workers with Redis (atomic
+# INCR): with locmem, and while the cache is down, each worker counts on its
+# own, so a client spreading attempts over N workers gets up to N x the limit
+RATE_LIMIT_ENABLED = config('RATE_LIMIT_ENABLED', default=True, cast=bool)
+RATE_LIMIT_RULES = {
+    'login': {'ip': (30, 300), 'account': (10, 900)},
+    'master_password': {'ip': (10, 300), 'account': (5, 900)},
+}
+# Behind a reverse proxy, the request header it sets to the client address
+# (HTTP_X_REAL_IP with nginx's `proxy_set_header X-Real-IP $remote_addr;`);
+# without the header the per-IP rules are skipped
+RATE_LIMIT_IP_HEADER = config('RATE_LIMIT_IP_HEADER', default='REMOTE_ADDR')
+
+# Admin changelists of the large learner tables show the table statistics'
+# row estimate instead of COUNT(*) when unfiltered and at least this big
+ADMIN_ESTIMATED_COUNT_THRESHOLD = config('ADMIN_ESTIMATED_COUNT_THRESHOLD', default=100000, cast=int)
+
+# Quiz variants: each learner gets the questions (and answers) in their own
+# seeded order; QUIZ_VARIANT_QUESTIONS > 0 also serves only that many of them
+QUIZ_VARIANTS = config('QUIZ_VARIANTS', default=True, cast=bool)
+QUIZ_VARIANT_QUESTIONS = config('QUIZ_VARIANT_QUESTIONS', default=0, cast=int)
+
+# Full-text search index over course content (SQLite FTS5 file, local to each
+# host; `manage.py build_search_index` builds it). Empty disables indexing.
+SEARCH_INDEX_PATH = config('SEARCH_INDEX_PATH', default=os.path.join(BASE_DIR, 'search_index.sqlite3'))
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/5.1/topics/i18n/
@@ -168,6 +306,8 @@ MEDIA_URL = f'{FORCE_SCRIPT_NAME}/media/' if FORCE_SCRIPT_NAME else '/media/'
 STATICFILES_DIRS = [
     os.path.join(BASE_DIR, 'static'),
 ]
+# Duplicate asset trees left out of collectstatic and the image derivatives build
+STATICFILES_EXCLUDE_DIRS = ['UK - Copy']
 # Add this line for production static file collection
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 
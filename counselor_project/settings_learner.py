@@ -0,0 +1,21 @@
+"""
+Learner-only worker profile
+settings.py without the admin stack (django.contrib.admin, nested_admin,
+ckeditor): workers boot without importing the admin site, the ckeditor
+widgets or nested_admin, and serve only counselor.urls. Keep a separate,
+smaller pool of workers on the full settings for /admin/.
+
+    DJANGO_SETTINGS_MODULE=counselor_project.settings_learner gunicorn counselor_project.wsgi
+"""
+
+from .settings import *  # noqa: F401,F403
+from .settings import INSTALLED_APPS, config
+
+ADMIN_ONLY_APPS = ['django.contrib.admin', 'nested_admin', 'ckeditor', 'ckeditor_uploader']
+
+INSTALLED_APPS = [app for app in INSTALLED_APPS if app not in ADMIN_ONLY_APPS]
+
+ROOT_URLCONF = 'counselor_project.urls_learner'
+
+# Path the learner pages are mounted under ('counselor_project/' in production)
+LEARNER_URL_PREFIX = config('LEARNER_URL_PREFIX', default='')
@@ -0,0 +1,15 @@
+"""
+URL configuration for learner-only workers (settings_learner)
+Only the counselor app is routed; /admin/ and the ckeditor uploader are
+served by the workers running the full settings.
+"""
+from django.urls import path, include
+from django.conf import settings
+from django.conf.urls.static import static
+
+urlpatterns = [
+    path(settings.LEARNER_URL_PREFIX, include('counselor.urls')),
+]
+
+if settings.DEBUG:
+    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
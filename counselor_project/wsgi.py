@@ -14,3 +14,10 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'counselor_project.settings')
 
 application = get_wsgi_application()
+
+# Warm this worker's caches in the background (WARM_CACHES_ON_STARTUP)
+from django.conf import settings  # noqa: E402
+
+if getattr(settings, 'WARM_CACHES_ON_STARTUP', False):
+    from counselor.cache_warmup import warm_caches_in_background
+    warm_caches_in_background()
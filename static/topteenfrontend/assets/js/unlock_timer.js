@@ -2,17 +2,17 @@ document.addEventListener('DOMContentLoaded', function() {
     console.log("DOM fully loaded and parsed");
     
     // Find all buttons with the required data attributes
-    const buttons = document.querySelectorAll('[data-window-closed-time][data-part-id]');
+    const buttons = document.querySelectorAll('[data-unlock-at][data-part-id]');
     
     buttons.forEach(function(button) {
         console.log("Processing button for part");
         
-        const windowClosedTime = button.getAttribute('data-window-closed-time');
-        if (!windowClosedTime) return; // Skip if no window closed time
+        // The server (QuizAttemptState) knows when the lockout window ends
+        const unlockAt = button.getAttribute('data-unlock-at');
+        if (!unlockAt) return; // Skip if the quiz is not locked
         
         const partId = button.getAttribute('data-part-id');
-        const closedTime = new Date(windowClosedTime);
-        const unlockTime = new Date(closedTime.getTime() + (5*60 * 1000)); // Add 5 minutes
+        const unlockTime = new Date(unlockAt);
         
         function updateCountdown() {
             const now = new Date();